@@ -0,0 +1,69 @@
+-- Appointment reminders
+-- Run this in your Supabase SQL Editor after DATABASE_SCHEMA.sql and EMAIL_OUTBOX.sql
+--
+-- The worker in lib/reminders.js claims appointments that start within the
+-- next few minutes, queues a reminder email to both participants through the
+-- email outbox and then marks them reminded.
+
+ALTER TABLE appointments ADD COLUMN IF NOT EXISTS reminder_sent_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE appointments ADD COLUMN IF NOT EXISTS reminder_claimed_until TIMESTAMP WITH TIME ZONE;
+
+-- Due appointments are found by a range scan on (date, start_time) within
+-- status = 'scheduled'; reminded rows drop out of the index
+CREATE INDEX IF NOT EXISTS idx_appointments_reminder_due
+  ON appointments(status, date, start_time)
+  WHERE reminder_sent_at IS NULL;
+
+-- Claim up to p_limit scheduled appointments starting in the next
+-- p_lead_minutes (date and start_time are wall-clock times in p_timezone).
+-- SKIP LOCKED lets every app instance run the worker without two of them
+-- claiming the same appointment; a claim is a lease, so appointments whose
+-- worker died before marking them reminded are picked up again.
+CREATE OR REPLACE FUNCTION claim_appointment_reminders(
+  p_lead_minutes INTEGER DEFAULT 15,
+  p_limit INTEGER DEFAULT 50,
+  p_lease_seconds INTEGER DEFAULT 120,
+  p_timezone TEXT DEFAULT 'UTC'
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_now TIMESTAMP := NOW() AT TIME ZONE p_timezone;
+  v_until TIMESTAMP := (NOW() AT TIME ZONE p_timezone) + make_interval(mins => p_lead_minutes);
+  v_claimed JSONB;
+BEGIN
+  WITH due AS (
+    SELECT id FROM appointments
+     WHERE status = 'scheduled'
+       AND reminder_sent_at IS NULL
+       AND (date, start_time) >= (v_now::date, to_char(v_now, 'HH24:MI'))
+       AND (date, start_time) <= (v_until::date, to_char(v_until, 'HH24:MI'))
+       AND (reminder_claimed_until IS NULL OR reminder_claimed_until < NOW())
+     ORDER BY date, start_time
+     LIMIT p_limit
+     FOR UPDATE SKIP LOCKED
+  ), claimed AS (
+    UPDATE appointments a
+       SET reminder_claimed_until = NOW() + make_interval(secs => p_lease_seconds)
+      FROM due
+     WHERE a.id = due.id
+    RETURNING a.*
+  )
+  SELECT COALESCE(jsonb_agg(to_jsonb(c) || jsonb_build_object(
+           'doctor', jsonb_build_object('id', d.id, 'name', d.name, 'email', d.email),
+           'patient', jsonb_build_object('id', p.id, 'name', p.name, 'email', p.email)
+         ) ORDER BY c.date, c.start_time), '[]'::jsonb)
+    INTO v_claimed
+    FROM claimed c
+    JOIN users d ON d.id = c.doctor_id
+    JOIN users p ON p.id = c.patient_id;
+
+  RETURN v_claimed;
+END;
+$$;
+
+-- Claiming returns both participants' email addresses and takes reminder
+-- leases, so only the service role may call it (as with claim_email_jobs)
+REVOKE EXECUTE ON FUNCTION claim_appointment_reminders(INTEGER, INTEGER, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_appointment_reminders(INTEGER, INTEGER, INTEGER, TEXT) TO service_role;
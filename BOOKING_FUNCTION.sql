@@ -0,0 +1,98 @@
+-- Atomic appointment booking
+-- Run this in your Supabase SQL Editor after DATABASE_SCHEMA.sql
+--
+-- POST /api/appointments calls this through supabase.rpc('book_appointment', ...)
+-- so claiming the slot, creating the appointment and writing both notifications
+-- is a single round-trip and a single transaction.
+
+-- At most one live appointment per slot, even if a caller bypasses the function
+CREATE UNIQUE INDEX IF NOT EXISTS idx_appointments_active_slot
+  ON appointments(time_slot_id)
+  WHERE status <> 'cancelled';
+
+-- Replaces the version that took TEXT ids (before COMPACT_IDS.sql)
+DROP FUNCTION IF EXISTS book_appointment(TEXT, TEXT, TEXT, TEXT, TEXT, TEXT[]);
+
+CREATE OR REPLACE FUNCTION book_appointment(
+  p_slot_id UUID,
+  p_patient_id UUID,
+  p_notes TEXT,
+  p_appointment_id UUID,
+  p_video_room_id TEXT,
+  p_notification_ids UUID[]
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_slot time_slots%ROWTYPE;
+  v_doctor users%ROWTYPE;
+  v_patient users%ROWTYPE;
+  v_appointment appointments%ROWTYPE;
+  v_notifications JSONB;
+BEGIN
+  -- Claim the slot. The row lock taken by UPDATE serialises concurrent bookers:
+  -- the second one re-checks is_available after the first commits and gets no row.
+  UPDATE time_slots
+     SET is_available = false
+   WHERE id = p_slot_id
+     AND is_available
+  RETURNING * INTO v_slot;
+
+  IF NOT FOUND THEN
+    IF EXISTS (SELECT 1 FROM time_slots WHERE id = p_slot_id) THEN
+      RAISE EXCEPTION 'Slot not available' USING ERRCODE = 'P0001';
+    END IF;
+    RAISE EXCEPTION 'Slot not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  SELECT * INTO v_doctor FROM users WHERE id = v_slot.doctor_id;
+  SELECT * INTO v_patient FROM users WHERE id = p_patient_id;
+
+  INSERT INTO appointments (
+    id, doctor_id, patient_id, time_slot_id, date, start_time, end_time,
+    status, notes, video_room_id, created_at
+  ) VALUES (
+    p_appointment_id, v_slot.doctor_id, p_patient_id, v_slot.id, v_slot.date,
+    v_slot.start_time, v_slot.end_time, 'scheduled', COALESCE(p_notes, ''),
+    p_video_room_id, NOW()
+  )
+  RETURNING * INTO v_appointment;
+
+  -- Returned so the API can push them to open notification streams
+  WITH inserted AS (
+    INSERT INTO notifications (id, user_id, message, type, created_at) VALUES
+      (p_notification_ids[1], v_slot.doctor_id,
+       'New appointment booked with ' || v_patient.name || ' on ' || v_slot.date || ' at ' || v_slot.start_time,
+       'success', NOW()),
+      (p_notification_ids[2], p_patient_id,
+       'Appointment confirmed with Dr. ' || v_doctor.name || ' on ' || v_slot.date || ' at ' || v_slot.start_time,
+       'success', NOW())
+    RETURNING *
+  )
+  SELECT jsonb_agg(to_jsonb(inserted)) INTO v_notifications FROM inserted;
+
+  -- The API returns the appointment to the caller as it is, so it has the
+  -- columns the listings return (APPOINTMENT_FIELDS in lib/data.js) and no
+  -- bookkeeping ones. The addresses are for the confirmation emails only.
+  RETURN jsonb_build_object(
+    'appointment', jsonb_build_object(
+      'id', v_appointment.id,
+      'doctor_id', v_appointment.doctor_id,
+      'patient_id', v_appointment.patient_id,
+      'time_slot_id', v_appointment.time_slot_id,
+      'date', v_appointment.date,
+      'start_time', v_appointment.start_time,
+      'end_time', v_appointment.end_time,
+      'status', v_appointment.status,
+      'notes', v_appointment.notes,
+      'video_room_id', v_appointment.video_room_id,
+      'created_at', v_appointment.created_at,
+      'doctor', jsonb_build_object('id', v_doctor.id, 'name', v_doctor.name),
+      'patient', jsonb_build_object('id', v_patient.id, 'name', v_patient.name)
+    ),
+    'contacts', jsonb_build_object('doctor', v_doctor.email, 'patient', v_patient.email),
+    'notifications', v_notifications
+  );
+END;
+$$;
@@ -0,0 +1,43 @@
+-- Bulk time-slot creation
+-- Run this in your Supabase SQL Editor after DATABASE_SCHEMA.sql
+--
+-- POST /api/time-slots/bulk expands a recurrence rule in lib/slots.js and
+-- hands the rows to create_time_slots(), which rejects any overlap with the
+-- doctor's existing slots and inserts the whole batch in one statement.
+
+-- Replaces the version that took a TEXT doctor id (before COMPACT_IDS.sql)
+DROP FUNCTION IF EXISTS create_time_slots(TEXT, JSONB);
+
+CREATE OR REPLACE FUNCTION create_time_slots(p_doctor_id UUID, p_slots JSONB)
+RETURNS SETOF time_slots
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_conflict RECORD;
+BEGIN
+  -- Two bulk requests for the same doctor could each pass the overlap check
+  -- before either inserts; serialise them per doctor for this transaction.
+  PERFORM pg_advisory_xact_lock(hashtext('time_slots:' || p_doctor_id::text));
+
+  -- Probes idx_time_slots_doctor_schedule on (doctor_id, date) per requested day
+  SELECT s.date, s.start_time INTO v_conflict
+    FROM jsonb_to_recordset(p_slots) AS s(id UUID, date DATE, start_time TEXT, end_time TEXT, duration INTEGER)
+    JOIN time_slots t
+      ON t.doctor_id = p_doctor_id
+     AND t.date = s.date
+     AND t.start_time < s.end_time
+     AND t.end_time > s.start_time
+   LIMIT 1;
+
+  IF FOUND THEN
+    RAISE EXCEPTION 'Overlaps an existing slot on % at %', v_conflict.date, v_conflict.start_time
+      USING ERRCODE = 'P0001';
+  END IF;
+
+  RETURN QUERY
+  INSERT INTO time_slots (id, doctor_id, date, start_time, end_time, duration, is_available, created_at)
+  SELECT s.id, p_doctor_id, s.date, s.start_time, s.end_time, s.duration, true, NOW()
+    FROM jsonb_to_recordset(p_slots) AS s(id UUID, date DATE, start_time TEXT, end_time TEXT, duration INTEGER)
+  RETURNING *;
+END;
+$$;
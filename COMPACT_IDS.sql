@@ -0,0 +1,145 @@
+-- Compact time-ordered ids
+-- Run this in your Supabase SQL Editor on a database created with TEXT ids
+-- (after EMAIL_OUTBOX.sql), then re-run BOOKING_FUNCTION.sql and
+-- BULK_SLOTS.sql, which take UUIDs now.
+--
+-- Converts every primary and foreign key of users, doctor_profiles,
+-- time_slots, appointments and notifications (and email_outbox, on databases
+-- that created it with TEXT ids) from TEXT ('user_1712345678901_k3j4h5g6f')
+-- to a 16-byte UUID. Existing rows get a
+-- UUIDv7 stamped with their created_at, so old and new rows sort together by
+-- time and new inserts keep appending to the right of each index.
+--
+-- Every id changes, so signed-in sessions become invalid: rotate
+-- SESSION_SECRET when deploying. id_migration_map keeps old -> new ids for
+-- support lookups and can be dropped once nothing refers to the old form.
+-- The conversion is a single DO block, so it applies completely or not at
+-- all, and it does nothing if users.id is already a UUID.
+
+-- UUIDv7 for a given instant: a v4 uuid with the first 48 bits replaced by
+-- the millisecond timestamp and the version nibble set to 7
+CREATE OR REPLACE FUNCTION uuid_v7(p_at TIMESTAMP WITH TIME ZONE DEFAULT clock_timestamp())
+RETURNS UUID
+LANGUAGE sql
+VOLATILE
+AS $$
+  SELECT encode(
+    set_bit(
+      set_bit(
+        overlay(uuid_send(gen_random_uuid())
+                placing substring(int8send(floor(extract(epoch FROM p_at) * 1000)::bigint) FROM 3)
+                FROM 1 FOR 6),
+        52, 1),
+      53, 1),
+    'hex')::uuid;
+$$;
+
+CREATE TABLE IF NOT EXISTS id_migration_map (
+  old_id TEXT PRIMARY KEY,
+  new_id UUID NOT NULL UNIQUE
+);
+
+CREATE OR REPLACE FUNCTION migrated_id(p_old_id TEXT)
+RETURNS UUID
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT new_id FROM id_migration_map WHERE old_id = p_old_id;
+$$;
+
+DO $$
+DECLARE
+  v_constraint RECORD;
+  v_outbox_text BOOLEAN;
+BEGIN
+  IF (SELECT data_type FROM information_schema.columns
+       WHERE table_schema = 'public' AND table_name = 'users' AND column_name = 'id') = 'uuid' THEN
+    RAISE NOTICE 'Ids are already UUIDs, nothing to do';
+    RETURN;
+  END IF;
+
+  -- EMAIL_OUTBOX.sql creates email_outbox with UUID ids; only older copies
+  -- of the table need converting
+  v_outbox_text := (SELECT data_type FROM information_schema.columns
+                     WHERE table_schema = 'public' AND table_name = 'email_outbox' AND column_name = 'id') = 'text';
+
+  -- Old ids carry a table prefix, so one map covers every table. Rows created
+  -- in the same millisecond still get distinct ids from the random bits.
+  INSERT INTO id_migration_map (old_id, new_id)
+  SELECT id, uuid_v7(COALESCE(created_at, NOW()))
+    FROM (
+      SELECT id::text AS id, created_at FROM users
+      UNION ALL SELECT id::text, created_at FROM doctor_profiles
+      UNION ALL SELECT id::text, created_at FROM time_slots
+      UNION ALL SELECT id::text, created_at FROM appointments
+      UNION ALL SELECT id::text, created_at FROM notifications
+      UNION ALL SELECT id::text, created_at FROM email_outbox WHERE v_outbox_text
+    ) AS old_ids
+  ON CONFLICT (old_id) DO NOTHING;
+
+  -- Foreign keys cannot span a TEXT and a UUID column, so they are dropped
+  -- for the conversion and recreated below
+  FOR v_constraint IN
+    SELECT conrelid::regclass AS table_name, conname
+      FROM pg_constraint
+     WHERE contype = 'f'
+       AND confrelid IN ('users'::regclass, 'time_slots'::regclass)
+  LOOP
+    EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', v_constraint.table_name, v_constraint.conname);
+  END LOOP;
+
+  -- ALTER COLUMN ... TYPE rewrites each table once and rebuilds its indexes
+  -- (primary keys, idx_*_schedule, idx_appointments_active_slot, ...) in place
+  ALTER TABLE users
+    ALTER COLUMN id TYPE UUID USING migrated_id(id);
+  ALTER TABLE doctor_profiles
+    ALTER COLUMN id TYPE UUID USING migrated_id(id),
+    ALTER COLUMN user_id TYPE UUID USING migrated_id(user_id);
+  ALTER TABLE time_slots
+    ALTER COLUMN id TYPE UUID USING migrated_id(id),
+    ALTER COLUMN doctor_id TYPE UUID USING migrated_id(doctor_id);
+  ALTER TABLE appointments
+    ALTER COLUMN id TYPE UUID USING migrated_id(id),
+    ALTER COLUMN doctor_id TYPE UUID USING migrated_id(doctor_id),
+    ALTER COLUMN patient_id TYPE UUID USING migrated_id(patient_id),
+    ALTER COLUMN time_slot_id TYPE UUID USING migrated_id(time_slot_id);
+  ALTER TABLE notifications
+    ALTER COLUMN id TYPE UUID USING migrated_id(id),
+    ALTER COLUMN user_id TYPE UUID USING migrated_id(user_id);
+  IF v_outbox_text THEN
+    ALTER TABLE email_outbox
+      ALTER COLUMN id TYPE UUID USING migrated_id(id);
+  END IF;
+
+  ALTER TABLE doctor_profiles
+    ADD CONSTRAINT doctor_profiles_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE;
+  ALTER TABLE time_slots
+    ADD CONSTRAINT time_slots_doctor_id_fkey FOREIGN KEY (doctor_id) REFERENCES users(id) ON DELETE CASCADE;
+  ALTER TABLE appointments
+    ADD CONSTRAINT appointments_doctor_id_fkey FOREIGN KEY (doctor_id) REFERENCES users(id) ON DELETE CASCADE,
+    ADD CONSTRAINT appointments_patient_id_fkey FOREIGN KEY (patient_id) REFERENCES users(id) ON DELETE CASCADE,
+    ADD CONSTRAINT appointments_time_slot_id_fkey FOREIGN KEY (time_slot_id) REFERENCES time_slots(id) ON DELETE CASCADE;
+  ALTER TABLE notifications
+    ADD CONSTRAINT notifications_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE;
+
+  -- Text columns that hold user ids (no foreign key) follow the same mapping
+  IF to_regclass('sync_deletions') IS NOT NULL THEN
+    UPDATE sync_deletions
+       SET record_id = COALESCE(migrated_id(record_id)::text, record_id),
+           scope_id = COALESCE(migrated_id(scope_id)::text, scope_id);
+  END IF;
+  IF to_regclass('room_participants') IS NOT NULL THEN
+    UPDATE room_participants
+       SET user_id = migrated_id(user_id)::text
+     WHERE migrated_id(user_id) IS NOT NULL;
+  END IF;
+
+  -- The functions that took TEXT ids; BOOKING_FUNCTION.sql and BULK_SLOTS.sql
+  -- recreate them with UUID parameters
+  DROP FUNCTION IF EXISTS book_appointment(TEXT, TEXT, TEXT, TEXT, TEXT, TEXT[]);
+  DROP FUNCTION IF EXISTS create_time_slots(TEXT, JSONB);
+END;
+$$;
+
+-- Planner statistics for the rewritten tables
+ANALYZE users, doctor_profiles, time_slots, appointments, notifications, email_outbox;
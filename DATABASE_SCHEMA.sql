@@ -1,5 +1,8 @@
 -- Video Appointments Database Schema
 -- Run this in your Supabase SQL Editor
+--
+-- Ids are UUIDv7 strings generated by lib/ids.js; databases created with the
+-- older TEXT ids are converted by COMPACT_IDS.sql.
 
 -- Drop existing tables if recreating
 DROP TABLE IF EXISTS notifications;
@@ -10,7 +13,7 @@ DROP TABLE IF EXISTS users;
 
 -- Users table
 CREATE TABLE users (
-  id TEXT PRIMARY KEY,
+  id UUID PRIMARY KEY,
   email TEXT UNIQUE NOT NULL,
   password_hash TEXT NOT NULL,
   name TEXT NOT NULL,
@@ -21,8 +24,8 @@ CREATE TABLE users (
 
 -- Doctor profiles table
 CREATE TABLE doctor_profiles (
-  id TEXT PRIMARY KEY,
-  user_id TEXT NOT NULL UNIQUE,
+  id UUID PRIMARY KEY,
+  user_id UUID NOT NULL UNIQUE,
   specialization TEXT,
   bio TEXT,
   experience INTEGER,
@@ -32,8 +35,8 @@ CREATE TABLE doctor_profiles (
 
 -- Time slots table
 CREATE TABLE time_slots (
-  id TEXT PRIMARY KEY,
-  doctor_id TEXT NOT NULL,
+  id UUID PRIMARY KEY,
+  doctor_id UUID NOT NULL,
   date DATE NOT NULL,
   start_time TEXT NOT NULL,
   end_time TEXT NOT NULL,
@@ -45,10 +48,10 @@ CREATE TABLE time_slots (
 
 -- Appointments table
 CREATE TABLE appointments (
-  id TEXT PRIMARY KEY,
-  doctor_id TEXT NOT NULL,
-  patient_id TEXT NOT NULL,
-  time_slot_id TEXT NOT NULL,
+  id UUID PRIMARY KEY,
+  doctor_id UUID NOT NULL,
+  patient_id UUID NOT NULL,
+  time_slot_id UUID NOT NULL,
   date DATE NOT NULL,
   start_time TEXT NOT NULL,
   end_time TEXT NOT NULL,
@@ -63,8 +66,8 @@ CREATE TABLE appointments (
 
 -- Notifications table
 CREATE TABLE notifications (
-  id TEXT PRIMARY KEY,
-  user_id TEXT NOT NULL,
+  id UUID PRIMARY KEY,
+  user_id UUID NOT NULL,
   message TEXT NOT NULL,
   type TEXT DEFAULT 'info' CHECK (type IN ('info', 'success', 'warning', 'error')),
   read BOOLEAN DEFAULT false,
@@ -109,12 +112,22 @@ CREATE POLICY "Allow public delete" ON notifications FOR DELETE USING (true);
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_role ON users(role);
 CREATE INDEX idx_doctor_profiles_user ON doctor_profiles(user_id);
-CREATE INDEX idx_time_slots_doctor ON time_slots(doctor_id);
 CREATE INDEX idx_time_slots_date ON time_slots(date);
-CREATE INDEX idx_time_slots_available ON time_slots(is_available);
-CREATE INDEX idx_appointments_doctor ON appointments(doctor_id);
-CREATE INDEX idx_appointments_patient ON appointments(patient_id);
 CREATE INDEX idx_appointments_date ON appointments(date);
 CREATE INDEX idx_appointments_status ON appointments(status);
-CREATE INDEX idx_notifications_user ON notifications(user_id);
 CREATE INDEX idx_notifications_read ON notifications(read);
+
+-- Keyset pagination: one index per list endpoint, matching its ORDER BY
+-- (id is the tiebreaker in the cursor). Safe to run on an existing database.
+CREATE INDEX IF NOT EXISTS idx_time_slots_doctor_schedule ON time_slots(doctor_id, date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_schedule ON appointments(doctor_id, date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_appointments_patient_schedule ON appointments(patient_id, date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at DESC, id DESC);
+
+-- Availability search (GET /api/availability): open slots in time order.
+-- Booked slots drop out of the index, so it only holds bookable rows.
+CREATE INDEX IF NOT EXISTS idx_time_slots_open ON time_slots(date, start_time, id) WHERE is_available;
+
+-- Unread notification counts (GET /api/notifications/unread, mark-read).
+-- Read rows drop out of the index, so it stays as small as the unread backlog.
+CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications(user_id) WHERE read = false;
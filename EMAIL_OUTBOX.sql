@@ -0,0 +1,62 @@
+-- Email Outbox
+-- Run this in your Supabase SQL Editor
+--
+-- Request handlers insert rows here instead of talking to SMTP; the worker in
+-- lib/email-outbox.js claims pending rows in batches and sends them. Both
+-- need SUPABASE_SERVICE_ROLE_KEY on the server.
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+  id UUID PRIMARY KEY,
+  to_address TEXT NOT NULL,
+  subject TEXT NOT NULL,
+  html TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'dead')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  locked_until TIMESTAMP WITH TIME ZONE,
+  sent_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Queued mail holds recipient addresses and message bodies, so the anon key
+-- gets no access at all: RLS is on with no policies, and only the server
+-- (lib/email-outbox.js, using SUPABASE_SERVICE_ROLE_KEY) reads or writes it.
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read" ON email_outbox;
+DROP POLICY IF EXISTS "Allow public insert" ON email_outbox;
+DROP POLICY IF EXISTS "Allow public update" ON email_outbox;
+REVOKE ALL ON email_outbox FROM anon, authenticated;
+
+-- Only unfinished jobs are ever scanned by the worker
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+  ON email_outbox(next_attempt_at)
+  WHERE status IN ('pending', 'sending');
+
+-- Claim up to p_limit due jobs. SKIP LOCKED lets several workers drain the
+-- queue without sending the same email twice; jobs whose lease expired (the
+-- worker died mid-send) become claimable again.
+CREATE OR REPLACE FUNCTION claim_email_jobs(p_limit INTEGER, p_lease_seconds INTEGER DEFAULT 60)
+RETURNS SETOF email_outbox
+LANGUAGE sql
+AS $$
+  UPDATE email_outbox
+     SET status = 'sending',
+         attempts = attempts + 1,
+         locked_until = NOW() + make_interval(secs => p_lease_seconds)
+   WHERE id IN (
+     SELECT id FROM email_outbox
+      WHERE (status = 'pending' AND next_attempt_at <= NOW())
+         OR (status = 'sending' AND locked_until < NOW())
+      ORDER BY next_attempt_at
+      LIMIT p_limit
+      FOR UPDATE SKIP LOCKED
+   )
+  RETURNING *;
+$$;
+
+-- Supabase grants EXECUTE on new functions to anon; claiming returns the
+-- queued mail, so only the service role may call it
+REVOKE EXECUTE ON FUNCTION claim_email_jobs(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_email_jobs(INTEGER, INTEGER) TO service_role;
@@ -0,0 +1,65 @@
+-- Partitioned webrtc_signals (optional)
+-- Run this in your Supabase SQL Editor instead of CREATE_SIGNALS_TABLE.sql,
+-- after SIGNALING_RETENTION.sql
+--
+-- Each day's signals go into their own partition. Expired days are dropped
+-- as a whole, which frees their space immediately and leaves no dead tuples
+-- for vacuum. purge_signaling() keeps working and trims the current day.
+-- Signals are transient, so the existing table is dropped and recreated.
+
+DROP TABLE IF EXISTS webrtc_signals CASCADE;
+
+CREATE TABLE webrtc_signals (
+  id TEXT NOT NULL,
+  appointment_id TEXT NOT NULL,
+  from_role TEXT NOT NULL,
+  to_role TEXT NOT NULL,
+  signal_type TEXT NOT NULL,
+  signal_data JSONB NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  -- The partition key has to be part of the primary key
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX IF NOT EXISTS idx_signals_appointment ON webrtc_signals(appointment_id, to_role);
+CREATE INDEX IF NOT EXISTS idx_signals_created ON webrtc_signals(created_at);
+
+ALTER TABLE webrtc_signals ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable all access for webrtc_signals" ON webrtc_signals
+FOR ALL USING (true);
+
+-- Create partitions for today and the next p_days_ahead days, and drop
+-- partitions that ended more than p_keep_days ago
+CREATE OR REPLACE FUNCTION rotate_signal_partitions(p_days_ahead INTEGER DEFAULT 2, p_keep_days INTEGER DEFAULT 1)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_day DATE;
+  v_partition RECORD;
+BEGIN
+  FOR i IN 0..p_days_ahead LOOP
+    v_day := CURRENT_DATE + i;
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF webrtc_signals FOR VALUES FROM (%L) TO (%L)',
+      'webrtc_signals_' || to_char(v_day, 'YYYYMMDD'), v_day, v_day + 1
+    );
+  END LOOP;
+
+  FOR v_partition IN
+    SELECT c.relname
+      FROM pg_inherits i
+      JOIN pg_class c ON c.oid = i.inhrelid
+     WHERE i.inhparent = 'webrtc_signals'::regclass
+       AND to_date(right(c.relname, 8), 'YYYYMMDD') < CURRENT_DATE - p_keep_days
+  LOOP
+    EXECUTE format('DROP TABLE %I', v_partition.relname);
+  END LOOP;
+END;
+$$;
+
+SELECT rotate_signal_partitions();
+
+-- Schedule with pg_cron if available:
+-- SELECT cron.schedule('rotate-signal-partitions', '0 * * * *', $$SELECT rotate_signal_partitions()$$);
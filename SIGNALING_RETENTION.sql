@@ -0,0 +1,93 @@
+-- Signaling Retention
+-- Run this in your Supabase SQL Editor after CREATE_SIGNALS_TABLE.sql / WEBRTC_SIGNALING.sql
+--
+-- Signals are only useful while a call is being set up and participants
+-- only while they keep sending heartbeats. Rows left behind by abandoned
+-- calls are purged here instead of accumulating forever.
+-- signaling_maintenance.py runs a purge on demand and reports table bloat.
+
+-- The purge scans these; created_at is already indexed on webrtc_signals
+CREATE INDEX IF NOT EXISTS idx_room_participants_last_seen ON room_participants(last_seen);
+
+-- Delete signals older than p_signal_ttl_minutes and participants not seen for
+-- p_participant_ttl_minutes. Deletes run in batches of p_batch_size rows so a
+-- large backlog never holds long locks or produces one huge WAL burst.
+CREATE OR REPLACE FUNCTION purge_signaling(
+  p_signal_ttl_minutes INTEGER DEFAULT 10,
+  p_participant_ttl_minutes INTEGER DEFAULT 5,
+  p_batch_size INTEGER DEFAULT 5000
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_signals BIGINT := 0;
+  v_participants BIGINT := 0;
+  v_deleted BIGINT;
+BEGIN
+  LOOP
+    DELETE FROM webrtc_signals
+     WHERE id IN (
+       SELECT id FROM webrtc_signals
+        WHERE created_at < NOW() - make_interval(mins => p_signal_ttl_minutes)
+        LIMIT p_batch_size
+     );
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    v_signals := v_signals + v_deleted;
+    EXIT WHEN v_deleted < p_batch_size;
+  END LOOP;
+
+  LOOP
+    DELETE FROM room_participants
+     WHERE id IN (
+       SELECT id FROM room_participants
+        WHERE last_seen < NOW() - make_interval(mins => p_participant_ttl_minutes)
+        LIMIT p_batch_size
+     );
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    v_participants := v_participants + v_deleted;
+    EXIT WHEN v_deleted < p_batch_size;
+  END LOOP;
+
+  RETURN jsonb_build_object('signals_deleted', v_signals, 'participants_deleted', v_participants);
+END;
+$$;
+
+-- Live/dead tuple counts and on-disk size for the signaling tables, so bloat
+-- can be checked through the REST API without database credentials
+CREATE OR REPLACE FUNCTION signaling_table_stats()
+RETURNS TABLE (
+  table_name TEXT,
+  live_rows BIGINT,
+  dead_rows BIGINT,
+  total_bytes BIGINT,
+  last_autovacuum TIMESTAMP WITH TIME ZONE
+)
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT relname::TEXT,
+         n_live_tup,
+         n_dead_tup,
+         pg_total_relation_size(relid),
+         last_autovacuum
+    FROM pg_stat_user_tables
+   WHERE relname IN ('webrtc_signals', 'room_participants')
+   ORDER BY relname;
+$$;
+
+-- Both tables churn constantly; vacuum them well before the 20% default
+ALTER TABLE webrtc_signals SET (autovacuum_vacuum_scale_factor = 0.01, autovacuum_vacuum_threshold = 1000);
+ALTER TABLE room_participants SET (autovacuum_vacuum_scale_factor = 0.05);
+
+-- Schedule with pg_cron if available:
+-- SELECT cron.schedule('purge-signaling', '*/5 * * * *', $$SELECT purge_signaling()$$);
+
+-- Optional: signals are disposable, so the table can skip the WAL entirely.
+-- An unlogged table is emptied after a crash and is not replicated, which
+-- also means Supabase Realtime cannot stream it - only use this when no
+-- component subscribes to webrtc_signals changes.
+-- ALTER TABLE webrtc_signals SET UNLOGGED;
+
+-- Optional: for very high call volume, SIGNALING_PARTITIONS.sql recreates
+-- webrtc_signals partitioned by day so old data is dropped, not deleted.
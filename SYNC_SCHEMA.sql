@@ -0,0 +1,84 @@
+-- Dashboard Delta Sync
+-- Run this in your Supabase SQL Editor after DATABASE_SCHEMA.sql
+--
+-- GET /api/sync?since=<cursor> returns only rows whose updated_at moved past
+-- the cursor, plus tombstones for deleted time slots.
+
+-- updated_at on every table the dashboard reads
+ALTER TABLE users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE doctor_profiles ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE time_slots ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE appointments ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_users_updated_at ON users;
+CREATE TRIGGER trg_users_updated_at BEFORE UPDATE ON users
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_doctor_profiles_updated_at ON doctor_profiles;
+CREATE TRIGGER trg_doctor_profiles_updated_at BEFORE UPDATE ON doctor_profiles
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_time_slots_updated_at ON time_slots;
+CREATE TRIGGER trg_time_slots_updated_at BEFORE UPDATE ON time_slots
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_appointments_updated_at ON appointments;
+CREATE TRIGGER trg_appointments_updated_at BEFORE UPDATE ON appointments
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_notifications_updated_at ON notifications;
+CREATE TRIGGER trg_notifications_updated_at BEFORE UPDATE ON notifications
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Tombstones so clients can drop rows that were deleted since their cursor
+CREATE TABLE IF NOT EXISTS sync_deletions (
+  id BIGSERIAL PRIMARY KEY,
+  table_name TEXT NOT NULL,
+  record_id TEXT NOT NULL,
+  scope_id TEXT NOT NULL,
+  deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE sync_deletions ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Allow public read" ON sync_deletions FOR SELECT USING (true);
+
+CREATE OR REPLACE FUNCTION record_time_slot_deletion()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO sync_deletions (table_name, record_id, scope_id)
+  VALUES ('time_slots', OLD.id, OLD.doctor_id);
+  RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_time_slots_deleted ON time_slots;
+CREATE TRIGGER trg_time_slots_deleted AFTER DELETE ON time_slots
+  FOR EACH ROW EXECUTE FUNCTION record_time_slot_deletion();
+
+-- Indexes for the "changed since" scans
+CREATE INDEX IF NOT EXISTS idx_users_role_updated ON users(role, updated_at);
+CREATE INDEX IF NOT EXISTS idx_doctor_profiles_updated ON doctor_profiles(updated_at);
+CREATE INDEX IF NOT EXISTS idx_time_slots_doctor_updated ON time_slots(doctor_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_updated ON appointments(doctor_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_appointments_patient_updated ON appointments(patient_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_updated ON notifications(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_sync_deletions_scope ON sync_deletions(scope_id, deleted_at);
+
+-- Tombstones older than the sync retention window (SYNC_RETENTION_DAYS, 30 by
+-- default) are never read; clients with an older cursor get a full sync.
+-- Schedule with pg_cron if available:
+-- SELECT cron.schedule('purge-sync-deletions', '0 3 * * *',
+--   $$DELETE FROM sync_deletions WHERE deleted_at < NOW() - INTERVAL '30 days'$$);
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+MedMeet API benchmark with stored baselines
+Times the core flows (register, login, auth/me, slot creation, booking,
+appointment and notification listing, signal round-trip) and counts the
+database round-trips each one makes, from the Server-Timing header that
+route.js adds to every response.
+
+Run it against the app backed by the local stand-in (local_supabase.py),
+which is emptied before every run so results are comparable:
+    python local_supabase.py
+    NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=local yarn start
+    python api_benchmark.py --save          # record benchmarks/api_baseline.json
+    python api_benchmark.py                 # compare; exits 1 on a regression
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from backend_test import percentile
+from medmeet_client import API_BASE, BASE_URL, new_session
+from medmeet_client.config import SUPABASE_URL
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'api_baseline.json')
+PASSWORD = "BenchPass123!"
+DB_QUERIES = re.compile(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"')
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def db_queries(response):
+    """Database round-trips reported in the Server-Timing header, or None"""
+    match = DB_QUERIES.search(response.headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+class ApiBenchmark:
+    """Runs the flow `iterations` times after `warmup` untimed passes"""
+
+    def __init__(self, iterations=30, warmup=3):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.run_id = uuid.uuid4().hex[:8]
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.recording = False
+
+    def measure(self, step, call):
+        """Time one step (one or more requests); every response must succeed"""
+        start = time.perf_counter()
+        responses = call()
+        elapsed = (time.perf_counter() - start) * 1000
+        responses = responses if isinstance(responses, (list, tuple)) else [responses]
+
+        for response in responses:
+            if response.status_code >= 400:
+                raise BenchmarkError(f"{step}: HTTP {response.status_code} {response.text[:200]}")
+        if self.recording:
+            self.latencies[step].append(elapsed)
+            counts = [db_queries(r) for r in responses]
+            if None not in counts:
+                self.queries[step].append(sum(counts))
+        return responses[0]
+
+    def register(self, session, role, n):
+        user = {
+            "email": f"bench.{self.run_id}.{role}.{n}@medmeet.com",
+            "password": PASSWORD,
+            "name": f"Bench {role.title()} {n}",
+            "role": role,
+        }
+        if role == 'doctor':
+            user["specialization"] = "Cardiology"
+        return self.measure('register', lambda: session.post(f"{API_BASE}/auth/register", json=user)).json()['user']
+
+    def login(self, session, user):
+        self.measure('login', lambda: session.post(f"{API_BASE}/auth/login", json={
+            "email": user['email'], "password": PASSWORD,
+        }))
+
+    def iteration(self, n):
+        doctor, patient = new_session(), new_session()
+        doctor_user = self.register(doctor, 'doctor', n)
+        patient_user = self.register(patient, 'patient', n)
+        self.login(doctor, doctor_user)
+        self.login(patient, patient_user)
+        self.measure('auth_me', lambda: patient.get(f"{API_BASE}/auth/me"))
+
+        day = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        slot = self.measure('create_slot', lambda: doctor.post(f"{API_BASE}/time-slots", json={
+            "date": day, "startTime": "09:00", "endTime": "09:30", "duration": 30,
+        })).json()['slot']
+        appointment = self.measure('book', lambda: patient.post(f"{API_BASE}/appointments", json={
+            "slotId": slot['id'], "notes": "Benchmark appointment",
+        })).json()['appointment']
+
+        self.measure('list_appointments', lambda: patient.get(f"{API_BASE}/appointments"))
+        self.measure('list_notifications', lambda: patient.get(f"{API_BASE}/notifications"))
+
+        # Offer from the patient, fetched and acknowledged by the doctor
+        room = appointment['video_room_id']
+
+        def round_trip():
+            sent = patient.post(f"{API_BASE}/signals", json={"appointmentId": room, "type": "offer", "data": {"n": n}})
+            fetched = doctor.get(f"{API_BASE}/signals", params={"appointmentId": room})
+            acked = doctor.post(f"{API_BASE}/signals/ack", json={"appointmentId": room, "cursor": sent.json()['cursor']})
+            return [sent, fetched, acked]
+
+        self.measure('signal_round_trip', round_trip)
+
+    def run(self):
+        for n in range(self.warmup):
+            self.iteration(f"w{n}")
+        self.recording = True
+        for n in range(self.iterations):
+            self.iteration(n)
+        return self.results()
+
+    def results(self):
+        steps = {}
+        for step, samples in self.latencies.items():
+            ordered = sorted(samples)
+            queries = self.queries.get(step)
+            steps[step] = {
+                'count': len(ordered),
+                'p50_ms': round(percentile(ordered, 50), 2),
+                'p95_ms': round(percentile(ordered, 95), 2),
+                'db_calls': round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        return steps
+
+
+def compare(baseline, current, p95_tolerance=0.25, p95_slack_ms=2.0, db_tolerance=0.0):
+    """Regressions of `current` against `baseline` step results, as messages.
+
+    p95 regresses when it is more than `p95_tolerance` (a fraction) and
+    `p95_slack_ms` above the baseline; db_calls when it grows by more than
+    `db_tolerance`. Steps missing from either side are reported too.
+    """
+    problems = []
+    for step, base in sorted(baseline.items()):
+        now = current.get(step)
+        if now is None:
+            problems.append(f"{step}: missing from this run")
+            continue
+        limit = max(base['p95_ms'] * (1 + p95_tolerance), base['p95_ms'] + p95_slack_ms)
+        if now['p95_ms'] > limit:
+            problems.append(f"{step}: p95 {now['p95_ms']:.1f} ms > {limit:.1f} ms (baseline {base['p95_ms']:.1f} ms)")
+        if base.get('db_calls') is not None and now.get('db_calls') is not None \
+                and now['db_calls'] > base['db_calls'] + db_tolerance:
+            problems.append(f"{step}: {now['db_calls']:g} db calls per request (baseline {base['db_calls']:g})")
+    for step in sorted(set(current) - set(baseline)):
+        problems.append(f"{step}: not in the baseline, re-record it with --save")
+    return problems
+
+
+def reset_stand_in(supabase_url):
+    response = requests.post(f"{supabase_url}/__reset", timeout=10)
+    response.raise_for_status()
+
+
+def print_results(steps, baseline=None):
+    print(f"\n{'Step':<22}{'n':>5}{'p50':>9}{'p95':>9}{'base p95':>10}{'db':>6}{'base db':>9}")
+    for step in sorted(steps):
+        s, b = steps[step], (baseline or {}).get(step, {})
+        base_p95 = f"{b['p95_ms']:.1f}" if 'p95_ms' in b else '-'
+        base_db = f"{b['db_calls']:g}" if b.get('db_calls') is not None else '-'
+        db = f"{s['db_calls']:g}" if s['db_calls'] is not None else '-'
+        print(f"{step:<22}{s['count']:>5}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{base_p95:>10}{db:>6}{base_db:>9}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark core API flows against a stored baseline')
+    parser.add_argument('--iterations', type=int, default=30, help='timed passes through the flow')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed passes first (route compilation, caches)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='write this run as the new baseline')
+    parser.add_argument('--p95-tolerance', type=float, default=0.25, help='allowed p95 growth as a fraction')
+    parser.add_argument('--p95-slack-ms', type=float, default=2.0, help='p95 growth always allowed, in ms')
+    parser.add_argument('--db-tolerance', type=float, default=0.0, help='allowed growth in db calls per request')
+    parser.add_argument('--supabase-url', default=SUPABASE_URL, help='stand-in to reset before the run')
+    parser.add_argument('--no-reset', action='store_true', help='keep existing stand-in data')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"⏱️  API benchmark against {BASE_URL}: {args.iterations} iterations after {args.warmup} warmup")
+
+    if not args.no_reset:
+        reset_stand_in(args.supabase_url)
+    try:
+        steps = ApiBenchmark(args.iterations, args.warmup).run()
+    except BenchmarkError as e:
+        print(f"❌ Flow failed: {e}")
+        return 2
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'recorded_at': datetime.now(timezone.utc).isoformat(),
+                'base_url': BASE_URL,
+                'iterations': args.iterations,
+                'steps': steps,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print_results(steps)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print_results(steps)
+        print(f"\n⚠️  No baseline at {args.baseline}; record one with --save")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['steps']
+    print_results(steps, baseline)
+    problems = compare(baseline, steps, args.p95_tolerance, args.p95_slack_ms, args.db_tolerance)
+    if problems:
+        print("\n❌ Regressions:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print("\n✅ Within baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,36 @@
+import crypto from 'crypto'
 import { NextResponse } from 'next/server'
 import { supabase } from '../../../lib/supabase'
-import { createUser, findUserByEmail, verifyPassword, findUserById } from '../../../lib/auth'
-import { sendEmail, getAppointmentConfirmationEmail } from '../../../lib/email'
+import { newId } from '../../../lib/ids'
+import { PROFILE_COLUMNS, createUser, findUserByEmail, verifyPassword, upgradePasswordHash, findUserById, findDoctorProfile, invalidateUser } from '../../../lib/auth'
+import { HashPoolBusyError } from '../../../lib/hash-pool'
+import { SESSION_COOKIE, setSessionCookie, verifySessionToken } from '../../../lib/session'
+import { getAppointmentConfirmationEmail } from '../../../lib/email'
+import { enqueueEmail, enqueueEmails } from '../../../lib/email-outbox'
+import { loadDashboardChanges } from '../../../lib/sync'
+import { PaginationError, pageSize, pageRows, listFields, parseDate } from '../../../lib/pagination'
+import {
+  SCHEDULE_KEYS, NEWEST_KEYS, TIME_SLOT_FIELDS, APPOINTMENT_FIELDS, NOTIFICATION_FIELDS, TIME_SLOT_COLUMNS, APPOINTMENT_COLUMNS,
+  listTimeSlots, listAppointments, listNotifications, bookAppointment
+} from '../../../lib/data'
+import { AVAILABILITY_KEYS, AVAILABILITY_FIELDS, findOpenSlots } from '../../../lib/availability'
+import { DIRECTORY_KEYS, getDoctorDirectory, listDoctors, invalidateDoctorDirectory } from '../../../lib/directory'
+import { SlotRuleError, expandSlotRule } from '../../../lib/slots'
+import { roomRole, publish, pending, acknowledge, subscribe } from '../../../lib/signaling'
+import { MAX_MARK_READ, unreadCount, notificationsCreated, createNotification, markRead, subscribe as subscribeNotifications } from '../../../lib/notifications'
+import { HEARTBEAT_INTERVAL_MS, heartbeat, leave, disconnect, subscribe as subscribePresence } from '../../../lib/presence'
+import { createRouter } from '../../../lib/router'
+import { measureRequest, renderMetrics } from '../../../lib/metrics'
+import { compressResponse } from '../../../lib/compression'
 import Cookies from 'js-cookie'
 
-// Helper to get user from cookie
+const MAX_SIGNAL_BATCH = 100
+
+// Postgres invalid_text_representation: an id that is not a uuid (see
+// COMPACT_IDS.sql), e.g. a stale link or a session from before the migration
+const INVALID_ID = '22P02'
+
+// Helper to get { userId, role } from the signed session cookie
 function getUserFromRequest(request) {
   const cookieHeader = request.headers.get('cookie') || ''
   if (!cookieHeader) return null
@@ -17,620 +43,772 @@ function getUserFromRequest(request) {
     }
   })
   
-  return cookies.userId ? { userId: cookies.userId } : null
+  return verifySessionToken(cookies[SESSION_COOKIE])
 }
 
+const router = createRouter({ authenticate: getUserFromRequest })
+
 // Auth Routes
-export async function POST(request) {
-  const url = new URL(request.url)
-  const path = url.pathname
+// Register
+router.post('/api/auth/register', { json: true }, async (request, { body }) => {
+  const { email, password, name, role, phone, specialization, bio, experience } = body
+  
+  // Check if user exists
+  const existingUser = await findUserByEmail(email)
+  if (existingUser) {
+    return NextResponse.json({ error: 'Email already registered' }, { status: 400 })
+  }
+  
+  // Create user
+  const user = await createUser(email, password, name, role, phone)
+  
+  // If doctor, create profile
+  if (role === 'doctor') {
+    const profileId = newId()
+    await supabase.from('doctor_profiles').insert([{
+      id: profileId,
+      user_id: user.id,
+      specialization: specialization || '',
+      bio: bio || '',
+      experience: experience || 0
+    }])
+    invalidateDoctorDirectory()
+  }
+  
+  const response = NextResponse.json({ success: true, user: { id: user.id, email: user.email, name: user.name, role: user.role } })
+  return setSessionCookie(response, user)
+})
 
-  try {
-    // Register
-    if (path === '/api/auth/register') {
-      const { email, password, name, role, phone, specialization, bio, experience } = await request.json()
-      
-      // Check if user exists
-      const existingUser = await findUserByEmail(email)
-      if (existingUser) {
-        return NextResponse.json({ error: 'Email already registered' }, { status: 400 })
-      }
-      
-      // Create user
-      const user = await createUser(email, password, name, role, phone)
-      
-      // If doctor, create profile
-      if (role === 'doctor') {
-        const profileId = `profile_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-        await supabase.from('doctor_profiles').insert([{
-          id: profileId,
-          user_id: user.id,
-          specialization: specialization || '',
-          bio: bio || '',
-          experience: experience || 0
-        }])
-      }
-      
-      const response = NextResponse.json({ success: true, user: { id: user.id, email: user.email, name: user.name, role: user.role } })
-      response.cookies.set('userId', user.id, { 
-        httpOnly: true, 
-        maxAge: 60 * 60 * 24 * 7,
-        sameSite: 'lax',
-        path: '/'
-      })
-      return response
-    }
+// Login
+router.post('/api/auth/login', { json: true }, async (request, { body }) => {
+  const { email, password } = body
+  
+  const user = await findUserByEmail(email)
+  if (!user) {
+    return NextResponse.json({ error: 'Invalid credentials' }, { status: 401 })
+  }
+  
+  const isValid = await verifyPassword(password, user.password_hash)
+  if (!isValid) {
+    return NextResponse.json({ error: 'Invalid credentials' }, { status: 401 })
+  }
+  await upgradePasswordHash(user, password)
+  
+  const response = NextResponse.json({ 
+    success: true, 
+    user: { id: user.id, email: user.email, name: user.name, role: user.role } 
+  })
+  return setSessionCookie(response, user)
+})
+
+// Logout
+router.post('/api/auth/logout', async () => {
+  const response = NextResponse.json({ success: true })
+  response.cookies.delete(SESSION_COOKIE)
+  return response
+})
+
+// Get current user
+router.get('/api/auth/me', { auth: true }, async (request, { auth }) => {
+  const user = await findUserById(auth.userId)
+  if (!user) {
+    return NextResponse.json({ error: 'User not found' }, { status: 404 })
+  }
+  
+  const profile = user.role === 'doctor' ? await findDoctorProfile(user.id) : null
+  
+  return NextResponse.json({ 
+    user: { id: user.id, email: user.email, name: user.name, role: user.role, phone: user.phone },
+    profile
+  })
+})
+
+// Get all doctors
+router.get('/api/doctors', async (request, { url }) => {
+  // Served from the in-memory directory (lib/directory.js); ?view=compact
+  // drops bio and contact details, ?specialization= filters
+  const directory = await getDoctorDirectory()
+  const doctors = listDoctors(directory, {
+    view: url.searchParams.get('view'),
+    specialization: url.searchParams.get('specialization')
+  })
+  const { items, nextCursor } = pageRows(doctors, {
+    keys: DIRECTORY_KEYS,
+    cursor: url.searchParams.get('cursor'),
+    limit: pageSize(url.searchParams)
+  })
 
-    // Login
-    if (path === '/api/auth/login') {
-      const { email, password } = await request.json()
-      
-      const user = await findUserByEmail(email)
-      if (!user) {
-        return NextResponse.json({ error: 'Invalid credentials' }, { status: 401 })
-      }
-      
-      const isValid = await verifyPassword(password, user.password_hash)
-      if (!isValid) {
-        return NextResponse.json({ error: 'Invalid credentials' }, { status: 401 })
-      }
-      
-      const response = NextResponse.json({ 
-        success: true, 
-        user: { id: user.id, email: user.email, name: user.name, role: user.role } 
-      })
-      response.cookies.set('userId', user.id, { 
-        httpOnly: true, 
-        maxAge: 60 * 60 * 24 * 7,
-        sameSite: 'lax',
-        path: '/'
-      })
-      return response
-    }
+  const body = JSON.stringify({ doctors: items, nextCursor })
+  const etag = `W/"${crypto.createHash('sha1').update(body).digest('base64url')}"`
+  const headers = { ETag: etag, 'Cache-Control': 'public, max-age=60, stale-while-revalidate=300' }
+  if (request.headers.get('if-none-match') === etag) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+  return new NextResponse(body, { headers: { ...headers, 'Content-Type': 'application/json' } })
+})
 
-    // Logout
-    if (path === '/api/auth/logout') {
-      const response = NextResponse.json({ success: true })
-      response.cookies.delete('userId')
-      return response
-    }
+// Update doctor profile
+router.post('/api/doctor/profile', { auth: true, json: true }, async (request, { auth, body }) => {
+  const { specialization, bio, experience } = body
+  
+  const { data, error } = await supabase
+    .from('doctor_profiles')
+    .update({ specialization, bio, experience })
+    .eq('user_id', auth.userId)
+    .select(PROFILE_COLUMNS)
+    .single()
+  
+  if (error) throw error
+  invalidateUser(auth.userId)
+  invalidateDoctorDirectory()
+  return NextResponse.json({ success: true, profile: data })
+})
+
+// Get time slots: ?doctorId=&date=&available=true&from=&to=&days=&fields=&limit=&cursor=
+router.get('/api/time-slots', async (request, { url }) => {
+  const date = url.searchParams.get('date')
+  const { items, nextCursor } = await listTimeSlots({
+    doctorId: url.searchParams.get('doctorId'),
+    date: date && parseDate(date, 'date'),
+    available: url.searchParams.get('available') === 'true',
+    searchParams: url.searchParams,
+    cursor: url.searchParams.get('cursor'),
+    limit: pageSize(url.searchParams),
+    fields: listFields(url.searchParams, TIME_SLOT_FIELDS, SCHEDULE_KEYS)
+  })
+  return NextResponse.json({ slots: items, nextCursor })
+})
 
-    // Create time slot
-    if (path === '/api/time-slots') {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
+// Create time slot
+router.post('/api/time-slots', { auth: true, json: true }, async (request, { auth, body }) => {
+  const { date, startTime, endTime, duration } = body
+  const slotId = newId()
+  
+  const { data, error } = await supabase.from('time_slots').insert([{
+    id: slotId,
+    doctor_id: auth.userId,
+    date,
+    start_time: startTime,
+    end_time: endTime,
+    duration: duration || 30,
+    is_available: true,
+    created_at: new Date().toISOString()
+  }]).select(TIME_SLOT_COLUMNS).single()
+  
+  if (error) throw error
+  return NextResponse.json({ success: true, slot: data })
+})
+
+// Create time slots from a weekly recurrence rule. The body is parsed after
+// the role check, so non-doctors get a 403 whatever they send; a body that is
+// not a JSON object is a 400.
+router.post('/api/time-slots/bulk', { auth: true }, async (request, { auth }) => {
+  if (auth.role !== 'doctor') {
+    return NextResponse.json({ error: 'Only doctors can create time slots' }, { status: 403 })
+  }
 
-      const { date, startTime, endTime, duration } = await request.json()
-      const slotId = `slot_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      
-      const { data, error } = await supabase.from('time_slots').insert([{
-        id: slotId,
-        doctor_id: auth.userId,
-        date,
-        start_time: startTime,
-        end_time: endTime,
-        duration: duration || 30,
-        is_available: true,
-        created_at: new Date().toISOString()
-      }]).select().single()
-      
-      if (error) throw error
-      return NextResponse.json({ success: true, slot: data })
+  let slots
+  try {
+    slots = expandSlotRule(await request.json().catch(() => null))
+  } catch (error) {
+    if (error instanceof SlotRuleError) {
+      return NextResponse.json({ error: error.message }, { status: 400 })
     }
+    throw error
+  }
+  if (slots.length === 0) {
+    return NextResponse.json({ success: true, created: 0, slots: [] })
+  }
 
-    // Book appointment
-    if (path === '/api/appointments') {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
-
-      const { slotId, notes } = await request.json()
-      
-      // Get slot
-      const { data: slot, error: slotError } = await supabase
-        .from('time_slots')
-        .select('*')
-        .eq('id', slotId)
-        .single()
-      
-      if (slotError || !slot) {
-        return NextResponse.json({ error: 'Slot not found' }, { status: 404 })
-      }
-      
-      if (!slot.is_available) {
-        return NextResponse.json({ error: 'Slot not available' }, { status: 400 })
-      }
-      
-      // Create appointment
-      const appointmentId = `appt_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      const videoRoomId = `room_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      
-      const { data: appointment, error: apptError } = await supabase
-        .from('appointments')
-        .insert([{
-          id: appointmentId,
-          doctor_id: slot.doctor_id,
-          patient_id: auth.userId,
-          time_slot_id: slotId,
-          date: slot.date,
-          start_time: slot.start_time,
-          end_time: slot.end_time,
-          status: 'scheduled',
-          notes: notes || '',
-          video_room_id: videoRoomId,
-          created_at: new Date().toISOString()
-        }])
-        .select()
-        .single()
-      
-      if (apptError) throw apptError
-      
-      // Mark slot as unavailable
-      await supabase
-        .from('time_slots')
-        .update({ is_available: false })
-        .eq('id', slotId)
-      
-      // Get doctor and patient info
-      const { data: doctor } = await supabase.from('users').select('*').eq('id', slot.doctor_id).single()
-      const { data: patient } = await supabase.from('users').select('*').eq('id', auth.userId).single()
-      
-      // Send confirmation emails
-      if (doctor && patient) {
-        const emailContent = getAppointmentConfirmationEmail(appointment, doctor, patient)
-        await sendEmail({ to: doctor.email, ...emailContent })
-        await sendEmail({ to: patient.email, ...emailContent })
-      }
-      
-      // Create notifications
-      const doctorNotifId = `notif_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      const patientNotifId = `notif_${Date.now() + 1}_${Math.random().toString(36).substr(2, 9)}`
-      
-      await supabase.from('notifications').insert([
-        {
-          id: doctorNotifId,
-          user_id: slot.doctor_id,
-          message: `New appointment booked with ${patient.name} on ${slot.date} at ${slot.start_time}`,
-          type: 'success',
-          created_at: new Date().toISOString()
-        },
-        {
-          id: patientNotifId,
-          user_id: auth.userId,
-          message: `Appointment confirmed with Dr. ${doctor.name} on ${slot.date} at ${slot.start_time}`,
-          type: 'success',
-          created_at: new Date().toISOString()
-        }
-      ])
-      
-      return NextResponse.json({ success: true, appointment })
+  const { data, error } = await supabase.rpc('create_time_slots', {
+    p_doctor_id: auth.userId,
+    p_slots: slots.map(slot => ({ id: newId(), ...slot }))
+  })
+  
+  if (error) {
+    if (error.code === 'P0001') {
+      return NextResponse.json({ error: error.message }, { status: 409 })
     }
+    throw error
+  }
+  return NextResponse.json({ success: true, created: data.length, slots: data })
+})
+
+// Delete time slot
+router.delete('/api/time-slots/:slotId', { auth: true }, async (request, { auth, params }) => {
+  const { error } = await supabase
+    .from('time_slots')
+    .delete()
+    .eq('id', params.slotId)
+    .eq('doctor_id', auth.userId)
+  
+  if (error) throw error
+  return NextResponse.json({ success: true })
+})
+
+// Earliest open slots across doctors: ?specialization=&from=&to=&days=&fields=&limit=&cursor=
+router.get('/api/availability', async (request, { url }) => {
+  const { items, nextCursor } = await findOpenSlots({
+    specialization: url.searchParams.get('specialization'),
+    cursor: url.searchParams.get('cursor'),
+    limit: pageSize(url.searchParams),
+    searchParams: url.searchParams,
+    fields: listFields(url.searchParams, AVAILABILITY_FIELDS, AVAILABILITY_KEYS)
+  })
+  return NextResponse.json({ slots: items, nextCursor })
+})
+
+// Get appointments: ?from=&to=&days=&fields=&limit=&cursor=
+router.get('/api/appointments', { auth: true }, async (request, { url, auth }) => {
+  const { items, nextCursor } = await listAppointments({
+    userId: auth.userId,
+    role: auth.role,
+    searchParams: url.searchParams,
+    cursor: url.searchParams.get('cursor'),
+    limit: pageSize(url.searchParams),
+    fields: listFields(url.searchParams, APPOINTMENT_FIELDS, SCHEDULE_KEYS)
+  })
+  return NextResponse.json({ appointments: items, nextCursor })
+})
 
-    // Update doctor profile
-    if (path === '/api/doctor/profile') {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
-
-      const { specialization, bio, experience } = await request.json()
-      
-      const { data, error } = await supabase
-        .from('doctor_profiles')
-        .update({ specialization, bio, experience })
-        .eq('user_id', auth.userId)
-        .select()
-        .single()
-      
-      if (error) throw error
-      return NextResponse.json({ success: true, profile: data })
+// Book appointment
+router.post('/api/appointments', { auth: true, json: true }, async (request, { auth, body }) => {
+  const { slotId, notes } = body
+  
+  let booking
+  try {
+    booking = await bookAppointment({
+      slotId,
+      patientId: auth.userId,
+      notes: notes || '',
+      appointmentId: newId(),
+      videoRoomId: newId(),
+      notificationIds: [newId(), newId()]
+    })
+  } catch (error) {
+    if (error.code === 'P0002') {
+      return NextResponse.json({ error: 'Slot not found' }, { status: 404 })
+    }
+    if (error.code === 'P0001') {
+      return NextResponse.json({ error: 'Slot not available' }, { status: 400 })
     }
+    throw error
+  }
+  
+  // contacts holds both email addresses; only the appointment is returned
+  const { appointment, contacts } = booking
+  const { doctor, patient } = appointment
+  await notificationsCreated(booking.notifications || [])
+  
+  // Queue confirmation emails
+  if (doctor && patient && contacts) {
+    const emailContent = getAppointmentConfirmationEmail(appointment, doctor, patient)
+    await enqueueEmails([
+      { to: contacts.doctor, ...emailContent },
+      { to: contacts.patient, ...emailContent }
+    ])
+  }
+  
+  return NextResponse.json({ success: true, appointment })
+})
 
-    // Update appointment status
-    if (path.match(/\/api\/appointments\/.*\/status/)) {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
+// Update appointment status
+router.post('/api/appointments/:appointmentId/status', { auth: true, json: true }, async (request, { params, body }) => {
+  const { status } = body
+  
+  const { data, error } = await supabase
+    .from('appointments')
+    .update({ status })
+    .eq('id', params.appointmentId)
+    .select(APPOINTMENT_COLUMNS)
+    .single()
+  
+  if (error) throw error
+  return NextResponse.json({ success: true, appointment: data })
+})
+
+// Reschedule appointment
+router.post('/api/appointments/:appointmentId/reschedule', { auth: true, json: true }, async (request, { params, body }) => {
+  const { appointmentId } = params
+  const { date, startTime, endTime } = body
+  
+  // Get appointment details
+  const { data: appointment } = await supabase
+    .from('appointments')
+    .select('doctor_id, patient_id')
+    .eq('id', appointmentId)
+    .single()
+  
+  if (!appointment) {
+    return NextResponse.json({ error: 'Appointment not found' }, { status: 404 })
+  }
 
-      const appointmentId = path.split('/')[3]
-      const { status } = await request.json()
-      
-      const { data, error } = await supabase
-        .from('appointments')
-        .update({ status })
-        .eq('id', appointmentId)
-        .select()
-        .single()
-      
-      if (error) throw error
-      return NextResponse.json({ success: true, appointment: data })
-    }
+  // Update appointment
+  const { data: updated, error } = await supabase
+    .from('appointments')
+    .update({ 
+      date,
+      start_time: startTime,
+      end_time: endTime
+    })
+    .eq('id', appointmentId)
+    .select(APPOINTMENT_COLUMNS)
+    .single()
+  
+  if (error) throw error
+
+  // Get patient and doctor info
+  const [patient, doctor] = await Promise.all([
+    findUserById(appointment.patient_id),
+    findUserById(appointment.doctor_id)
+  ])
+
+  // Queue email notification to patient
+  if (patient && doctor) {
+    await enqueueEmail({
+      to: patient.email,
+      subject: 'Appointment Rescheduled',
+      html: `
+        <h2>Your appointment has been rescheduled</h2>
+        <p><strong>Doctor:</strong> Dr. ${doctor.name}</p>
+        <p><strong>New Date:</strong> ${date}</p>
+        <p><strong>New Time:</strong> ${startTime} - ${endTime}</p>
+        <p>Please check your dashboard for details.</p>
+      `
+    })
+  }
 
-    // Reschedule appointment
-    if (path.match(/\/api\/appointments\/.*\/reschedule/)) {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
+  // Create notification for patient
+  await createNotification({
+    userId: appointment.patient_id,
+    message: `Your appointment with Dr. ${doctor.name} has been rescheduled to ${date} at ${startTime}`,
+    type: 'warning'
+  })
 
-      const appointmentId = path.split('/')[3]
-      const { date, startTime, endTime } = await request.json()
-      
-      // Get appointment details
-      const { data: appointment } = await supabase
-        .from('appointments')
-        .select('*')
-        .eq('id', appointmentId)
-        .single()
-      
-      if (!appointment) {
-        return NextResponse.json({ error: 'Appointment not found' }, { status: 404 })
-      }
+  return NextResponse.json({ success: true, appointment: updated })
+})
 
-      // Update appointment
-      const { data: updated, error } = await supabase
-        .from('appointments')
-        .update({ 
-          date,
-          start_time: startTime,
-          end_time: endTime
-        })
-        .eq('id', appointmentId)
-        .select()
-        .single()
-      
-      if (error) throw error
-
-      // Get patient and doctor info
-      const { data: patient } = await supabase.from('users').select('*').eq('id', appointment.patient_id).single()
-      const { data: doctor } = await supabase.from('users').select('*').eq('id', appointment.doctor_id).single()
-
-      // Send email notification to patient
-      if (patient && doctor) {
-        await sendEmail({
-          to: patient.email,
-          subject: 'Appointment Rescheduled',
-          html: `
-            <h2>Your appointment has been rescheduled</h2>
-            <p><strong>Doctor:</strong> Dr. ${doctor.name}</p>
-            <p><strong>New Date:</strong> ${date}</p>
-            <p><strong>New Time:</strong> ${startTime} - ${endTime}</p>
-            <p>Please check your dashboard for details.</p>
-          `
-        })
-      }
+// Cancel/Delete appointment
+router.post('/api/appointments/:appointmentId/cancel', { auth: true }, async (request, { params }) => {
+  const { appointmentId } = params
+  
+  // Get appointment details first
+  const { data: appointment } = await supabase
+    .from('appointments')
+    .select('doctor_id, patient_id, time_slot_id, date, start_time, end_time')
+    .eq('id', appointmentId)
+    .single()
+  
+  if (!appointment) {
+    return NextResponse.json({ error: 'Appointment not found' }, { status: 404 })
+  }
 
-      // Create notification for patient
-      const notifId = `notif_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      await supabase.from('notifications').insert({
-        id: notifId,
-        user_id: appointment.patient_id,
-        message: `Your appointment with Dr. ${doctor.name} has been rescheduled to ${date} at ${startTime}`,
-        type: 'warning',
-        created_at: new Date().toISOString()
-      })
+  // Get patient and doctor info
+  const [patient, doctor] = await Promise.all([
+    findUserById(appointment.patient_id),
+    findUserById(appointment.doctor_id)
+  ])
+
+  // Mark time slot as available again
+  await supabase
+    .from('time_slots')
+    .update({ is_available: true })
+    .eq('id', appointment.time_slot_id)
+
+  // Update appointment status to cancelled
+  const { error } = await supabase
+    .from('appointments')
+    .update({ status: 'cancelled' })
+    .eq('id', appointmentId)
+  
+  if (error) throw error
+
+  // Queue email notification to patient
+  if (patient && doctor) {
+    await enqueueEmail({
+      to: patient.email,
+      subject: 'Appointment Cancelled',
+      html: `
+        <h2>Your appointment has been cancelled</h2>
+        <p><strong>Doctor:</strong> Dr. ${doctor.name}</p>
+        <p><strong>Date:</strong> ${appointment.date}</p>
+        <p><strong>Time:</strong> ${appointment.start_time} - ${appointment.end_time}</p>
+        <p>The doctor had to cancel this appointment. Please book a new slot if needed.</p>
+      `
+    })
+  }
 
-      return NextResponse.json({ success: true, appointment: updated })
-    }
+  // Create notification for patient
+  await createNotification({
+    userId: appointment.patient_id,
+    message: `Your appointment with Dr. ${doctor.name} on ${appointment.date} at ${appointment.start_time} has been cancelled`,
+    type: 'error'
+  })
 
-    // Cancel/Delete appointment
-    if (path.match(/\/api\/appointments\/.*\/cancel/)) {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
+  return NextResponse.json({ success: true })
+})
 
-      const appointmentId = path.split('/')[3]
-      
-      // Get appointment details first
-      const { data: appointment } = await supabase
-        .from('appointments')
-        .select('*')
-        .eq('id', appointmentId)
-        .single()
-      
-      if (!appointment) {
-        return NextResponse.json({ error: 'Appointment not found' }, { status: 404 })
+// Get notifications: ?fields=&limit=&cursor=
+router.get('/api/notifications', { auth: true }, async (request, { url, auth }) => {
+  const { items, nextCursor } = await listNotifications({
+    userId: auth.userId,
+    cursor: url.searchParams.get('cursor'),
+    limit: pageSize(url.searchParams),
+    fields: listFields(url.searchParams, NOTIFICATION_FIELDS, NEWEST_KEYS)
+  })
+  return NextResponse.json({ notifications: items, nextCursor })
+})
+
+// Unread count, served from memory (see lib/notifications.js)
+router.get('/api/notifications/unread', { auth: true }, async (request, { auth }) => {
+  return NextResponse.json({ unread: await unreadCount(auth.userId) })
+})
+
+// Stream new notifications and unread-count changes as Server-Sent Events.
+// Every connection starts with the current count; nothing is replayed, so
+// clients resync (GET /api/sync) after a reconnect.
+router.get('/api/notifications/stream', { auth: true }, async (request, { auth }) => {
+  const unread = await unreadCount(auth.userId)
+  const encoder = new TextEncoder()
+  let close = () => {}
+
+  const stream = new ReadableStream({
+    start(controller) {
+      const write = text => {
+        try {
+          controller.enqueue(encoder.encode(text))
+        } catch {
+          close()
+        }
       }
-
-      // Get patient and doctor info
-      const { data: patient } = await supabase.from('users').select('*').eq('id', appointment.patient_id).single()
-      const { data: doctor } = await supabase.from('users').select('*').eq('id', appointment.doctor_id).single()
-
-      // Mark time slot as available again
-      await supabase
-        .from('time_slots')
-        .update({ is_available: true })
-        .eq('id', appointment.time_slot_id)
-
-      // Update appointment status to cancelled
-      const { error } = await supabase
-        .from('appointments')
-        .update({ status: 'cancelled' })
-        .eq('id', appointmentId)
-      
-      if (error) throw error
-
-      // Send email notification to patient
-      if (patient && doctor) {
-        await sendEmail({
-          to: patient.email,
-          subject: 'Appointment Cancelled',
-          html: `
-            <h2>Your appointment has been cancelled</h2>
-            <p><strong>Doctor:</strong> Dr. ${doctor.name}</p>
-            <p><strong>Date:</strong> ${appointment.date}</p>
-            <p><strong>Time:</strong> ${appointment.start_time} - ${appointment.end_time}</p>
-            <p>The doctor had to cancel this appointment. Please book a new slot if needed.</p>
-          `
-        })
+      const unsubscribe = subscribeNotifications(auth.userId, event => {
+        write(`data: ${JSON.stringify(event)}\n\n`)
+      })
+      // Comment lines keep proxies from timing out an idle stream
+      const heartbeat = setInterval(() => write(': ping\n\n'), 15000)
+      close = () => {
+        clearInterval(heartbeat)
+        unsubscribe()
       }
-
-      // Create notification for patient
-      const notifId = `notif_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      await supabase.from('notifications').insert({
-        id: notifId,
-        user_id: appointment.patient_id,
-        message: `Your appointment with Dr. ${doctor.name} on ${appointment.date} at ${appointment.start_time} has been cancelled`,
-        type: 'error',
-        created_at: new Date().toISOString()
+      request.signal.addEventListener('abort', () => {
+        close()
+        try {
+          controller.close()
+        } catch {}
       })
-
-      return NextResponse.json({ success: true })
+      write(`retry: 2000\n\ndata: ${JSON.stringify({ type: 'unread', unread })}\n\n`)
+    },
+    cancel() {
+      close()
     }
+  })
 
-    // Create signal
-    if (path === '/api/signals') {
-      const { appointmentId, from, type, data } = await request.json()
-      const to = from === 'doctor' ? 'patient' : 'doctor'
-      
-      const signalId = `signal_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      await supabase.from('webrtc_signals').insert([{
-        id: signalId,
-        appointment_id: appointmentId,
-        from_role: from,
-        to_role: to,
-        signal_type: type,
-        signal_data: data,
-        created_at: new Date().toISOString()
-      }])
-
-      return NextResponse.json({ success: true })
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no'
     }
+  })
+})
+
+// Mark several notifications as read in one request:
+// { ids: [...] } for those, or { all: true } for every unread one
+router.post('/api/notifications/read', { auth: true, json: true }, async (request, { auth, body }) => {
+  const { ids, all } = body || {}
+  if (all !== true && (!Array.isArray(ids) || ids.length === 0 || ids.length > MAX_MARK_READ ||
+      ids.some(id => typeof id !== 'string'))) {
+    return NextResponse.json({ error: `Send { all: true } or 1-${MAX_MARK_READ} notification ids` }, { status: 400 })
+  }
 
-    return NextResponse.json({ error: 'Not found' }, { status: 404 })
-  } catch (error) {
-    console.error('API Error:', error)
-    return NextResponse.json({ error: error.message }, { status: 500 })
+  const { updated, unread } = await markRead(auth.userId, all === true ? null : ids)
+  return NextResponse.json({ success: true, updated, unread })
+})
+
+// Mark notification as read
+router.patch('/api/notifications/:notificationId', { auth: true }, async (request, { auth, params }) => {
+  const { unread } = await markRead(auth.userId, [params.notificationId])
+  return NextResponse.json({ success: true, unread })
+})
+
+// Dashboard delta sync
+router.get('/api/sync', { auth: true }, async (request, { url, auth }) => {
+  const changes = await loadDashboardChanges({
+    userId: auth.userId,
+    role: auth.role,
+    since: url.searchParams.get('since')
+  })
+  
+  const body = JSON.stringify(changes)
+  const etag = `W/"${crypto.createHash('sha1').update(body).digest('base64url')}"`
+  const headers = { ETag: etag, 'Cache-Control': 'private, no-cache' }
+  if (request.headers.get('if-none-match') === etag) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+  return new NextResponse(body, { headers: { ...headers, 'Content-Type': 'application/json' } })
+})
+
+// Send signals to the other participant (pushed from memory, see lib/signaling.js).
+// Accepts { type, data } or { signals: [{ type, data }, ...] } so a burst of
+// ICE candidates travels in one request.
+router.post('/api/signals', { auth: true, json: true }, async (request, { auth, body }) => {
+  const { appointmentId, signals, type, data } = body
+  const batch = Array.isArray(signals) ? signals : [{ type, data }]
+  if (batch.length === 0 || batch.length > MAX_SIGNAL_BATCH || batch.some(s => typeof s?.type !== 'string')) {
+    return NextResponse.json({ error: `Send 1-${MAX_SIGNAL_BATCH} signals with a type` }, { status: 400 })
   }
-}
 
-export async function GET(request) {
-  const url = new URL(request.url)
-  const path = url.pathname
+  const from = await roomRole(appointmentId, auth.userId)
+  if (!from) {
+    return NextResponse.json({ error: 'Not a participant in this call' }, { status: 403 })
+  }
 
-  try {
-    // Get current user
-    if (path === '/api/auth/me') {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
-      
-      const user = await findUserById(auth.userId)
-      if (!user) {
-        return NextResponse.json({ error: 'User not found' }, { status: 404 })
+  const cursor = publish(appointmentId, from, batch.map(s => ({ type: s.type, data: s.data })))
+  return NextResponse.json({ success: true, cursor })
+})
+
+// Acknowledge every signal up to a cursor in one call
+router.post('/api/signals/ack', { auth: true, json: true }, async (request, { auth, body }) => {
+  const { appointmentId, cursor } = body
+  const role = await roomRole(appointmentId, auth.userId)
+  if (!role) {
+    return NextResponse.json({ error: 'Not a participant in this call' }, { status: 403 })
+  }
+
+  acknowledge(appointmentId, role, parseInt(cursor, 10) || 0)
+  return NextResponse.json({ success: true })
+})
+
+// Stream signals as Server-Sent Events. EventSource reconnects with
+// Last-Event-ID, so anything not yet acknowledged is replayed.
+router.get('/api/signals/stream', { auth: true }, async (request, { url, auth }) => {
+  const appointmentId = url.searchParams.get('appointmentId')
+  const role = await roomRole(appointmentId, auth.userId)
+  if (!role) {
+    return NextResponse.json({ error: 'Not a participant in this call' }, { status: 403 })
+  }
+
+  const after = parseInt(request.headers.get('last-event-id') || url.searchParams.get('after') || '0', 10) || 0
+  const encoder = new TextEncoder()
+  let close = () => {}
+
+  const stream = new ReadableStream({
+    start(controller) {
+      const write = text => {
+        try {
+          controller.enqueue(encoder.encode(text))
+        } catch {
+          close()
+        }
       }
-      
-      let profile = null
-      if (user.role === 'doctor') {
-        const { data } = await supabase
-          .from('doctor_profiles')
-          .select('*')
-          .eq('user_id', user.id)
-          .single()
-        profile = data
+      const unsubscribe = subscribe(appointmentId, role, after, events => {
+        write(events.map(e => `id: ${e.seq}\ndata: ${JSON.stringify({ id: e.seq, type: e.type, data: e.data })}\n\n`).join(''))
+      })
+      // Comment lines keep proxies from timing out an idle stream
+      const heartbeat = setInterval(() => write(': ping\n\n'), 15000)
+      close = () => {
+        clearInterval(heartbeat)
+        unsubscribe()
       }
-      
-      return NextResponse.json({ 
-        user: { id: user.id, email: user.email, name: user.name, role: user.role, phone: user.phone },
-        profile
+      request.signal.addEventListener('abort', () => {
+        close()
+        try {
+          controller.close()
+        } catch {}
       })
+      write('retry: 1000\n\n')
+    },
+    cancel() {
+      close()
     }
+  })
 
-    // Get all doctors
-    if (path === '/api/doctors') {
-      const { data, error } = await supabase
-        .from('users')
-        .select(`
-          id,
-          name,
-          email,
-          phone,
-          doctor_profiles (
-            specialization,
-            bio,
-            experience
-          )
-        `)
-        .eq('role', 'doctor')
-      
-      if (error) throw error
-      return NextResponse.json({ doctors: data || [] })
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no'
     }
+  })
+})
+
+// Unacknowledged signals after a cursor, for clients that cannot stream
+router.get('/api/signals', { auth: true }, async (request, { url, auth }) => {
+  const appointmentId = url.searchParams.get('appointmentId')
+  const role = await roomRole(appointmentId, auth.userId)
+  if (!role) {
+    return NextResponse.json({ error: 'Not a participant in this call' }, { status: 403 })
+  }
 
-    // Get time slots
-    if (path === '/api/time-slots') {
-      const doctorId = url.searchParams.get('doctorId')
-      const date = url.searchParams.get('date')
-      const available = url.searchParams.get('available')
-      
-      let query = supabase.from('time_slots').select('*')
-      
-      if (doctorId) query = query.eq('doctor_id', doctorId)
-      if (date) query = query.eq('date', date)
-      if (available === 'true') query = query.eq('is_available', true)
-      
-      query = query.order('date', { ascending: true }).order('start_time', { ascending: true })
-      
-      const { data, error } = await query
-      if (error) throw error
-      return NextResponse.json({ slots: data || [] })
-    }
+  const after = parseInt(url.searchParams.get('after') || '0', 10) || 0
+  return NextResponse.json(pending(appointmentId, role, after).map(e => ({
+    id: e.seq,
+    type: e.type,
+    data: e.data
+  })))
+})
+
+// Waiting-room presence (see lib/presence.js). The caller must belong to the
+// appointment behind the room; returns their presence identity or null.
+async function presenceMember(roomId, userId) {
+  const role = await roomRole(roomId, userId)
+  if (!role) return null
+  const user = await findUserById(userId)
+  return { userId, name: user?.name || role, role }
+}
 
-    // Get appointments
-    if (path === '/api/appointments') {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
-      }
+// Join the room and stream the other participant's joins and leaves. The
+// first event lists who is already there; the open stream is the heartbeat.
+router.get('/api/presence/stream', { auth: true }, async (request, { url, auth }) => {
+  const roomId = url.searchParams.get('roomId')
+  const member = await presenceMember(roomId, auth.userId)
+  if (!member) {
+    return NextResponse.json({ error: 'Not a participant in this call' }, { status: 403 })
+  }
 
-      const user = await findUserById(auth.userId)
-      
-      let query = supabase
-        .from('appointments')
-        .select(`
-          *,
-          doctor:doctor_id (id, name, email),
-          patient:patient_id (id, name, email)
-        `)
-      
-      if (user.role === 'doctor') {
-        query = query.eq('doctor_id', auth.userId)
-      } else {
-        query = query.eq('patient_id', auth.userId)
-      }
-      
-      query = query.order('date', { ascending: true }).order('start_time', { ascending: true })
-      
-      const { data, error } = await query
-      if (error) throw error
-      return NextResponse.json({ appointments: data || [] })
-    }
+  const encoder = new TextEncoder()
+  let close = () => {}
 
-    // Get notifications
-    if (path === '/api/notifications') {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+  const stream = new ReadableStream({
+    start(controller) {
+      const write = text => {
+        try {
+          controller.enqueue(encoder.encode(text))
+        } catch {
+          close()
+        }
       }
-
-      const { data, error } = await supabase
-        .from('notifications')
-        .select('*')
-        .eq('user_id', auth.userId)
-        .order('created_at', { ascending: false })
-      
-      if (error) throw error
-      return NextResponse.json({ notifications: data || [] })
+      const unsubscribe = subscribePresence(roomId, auth.userId, event => {
+        write(`data: ${JSON.stringify(event)}\n\n`)
+      })
+      const others = heartbeat(roomId, member)
+      const beat = setInterval(() => {
+        heartbeat(roomId, member)
+        write(': ping\n\n')
+      }, HEARTBEAT_INTERVAL_MS)
+      close = () => {
+        clearInterval(beat)
+        unsubscribe()
+        disconnect(roomId, auth.userId)
+      }
+      request.signal.addEventListener('abort', () => {
+        close()
+        try {
+          controller.close()
+        } catch {}
+      })
+      write(`retry: 1000\n\ndata: ${JSON.stringify({ type: 'snapshot', participants: others })}\n\n`)
+    },
+    cancel() {
+      close()
     }
+  })
 
-    // Get signals
-    if (path === '/api/signals') {
-      const url = new URL(request.url)
-      const appointmentId = url.searchParams.get('appointmentId')
-      const to = url.searchParams.get('to')
-      
-      const { data, error } = await supabase
-        .from('webrtc_signals')
-        .select('*')
-        .eq('appointment_id', appointmentId)
-        .eq('to_role', to)
-        .order('created_at', { ascending: true })
-      
-      if (error) throw error
-      
-      // Return signals with id, type, and data
-      const signals = (data || []).map(s => ({
-        id: s.id,
-        type: s.signal_type,
-        data: s.signal_data
-      }))
-      
-      return NextResponse.json(signals)
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no'
     }
+  })
+})
+
+// Heartbeat for clients that cannot stream: joins or refreshes membership
+// and returns the other participants. Send one every 15 seconds.
+router.post('/api/presence/heartbeat', { auth: true, json: true }, async (request, { auth, body }) => {
+  const member = await presenceMember(body.roomId, auth.userId)
+  if (!member) {
+    return NextResponse.json({ error: 'Not a participant in this call' }, { status: 403 })
+  }
+  return NextResponse.json({ participants: heartbeat(body.roomId, member) })
+})
 
-    return NextResponse.json({ message: 'Video Appointments API' })
-  } catch (error) {
-    console.error('API Error:', error)
-    return NextResponse.json({ error: error.message }, { status: 500 })
+router.post('/api/presence/leave', { auth: true, json: true }, async (request, { auth, body }) => {
+  if (!(await roomRole(body.roomId, auth.userId))) {
+    return NextResponse.json({ error: 'Not a participant in this call' }, { status: 403 })
   }
-}
+  leave(body.roomId, auth.userId)
+  return NextResponse.json({ success: true })
+})
+
+// Prometheus scrape endpoint. Set METRICS_TOKEN to require
+// "Authorization: Bearer <token>".
+router.get('/api/metrics', async request => {
+  const token = process.env.METRICS_TOKEN
+  if (token && request.headers.get('authorization') !== `Bearer ${token}`) {
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+  }
+  return new NextResponse(renderMetrics(), {
+    headers: { 'Content-Type': 'text/plain; version=0.0.4', 'Cache-Control': 'no-store' }
+  })
+})
 
-export async function DELETE(request) {
-  const url = new URL(request.url)
-  const path = url.pathname
+// Metrics cover the whole request; JSON bodies are compressed on the way out
+function serve(method, request, handler) {
+  return measureRequest(method, async () => compressResponse(request, await handler()))
+}
 
-  try {
-    // Delete signal
-    if (path.match(/\/api\/signals\/.+/)) {
-      const signalId = path.split('/').pop()
-      
-      await supabase
-        .from('webrtc_signals')
-        .delete()
-        .eq('id', signalId)
-      
-      return NextResponse.json({ success: true })
+export function POST(request) {
+  return serve('POST', request, async () => {
+    try {
+      return (await router.handle('POST', request)) || NextResponse.json({ error: 'Not found' }, { status: 404 })
+    } catch (error) {
+      if (error instanceof HashPoolBusyError) {
+        return NextResponse.json({ error: error.message }, { status: 503, headers: { 'Retry-After': '1' } })
+      }
+      if (error?.code === INVALID_ID) {
+        return NextResponse.json({ error: 'Invalid id' }, { status: 400 })
+      }
+      console.error('API Error:', error)
+      return NextResponse.json({ error: error.message }, { status: 500 })
     }
+  })
+}
 
-    // Delete time slot
-    if (path.match(/\/api\/time-slots\/.+/)) {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+export function GET(request) {
+  return serve('GET', request, async () => {
+    try {
+      return (await router.handle('GET', request)) || NextResponse.json({ message: 'Video Appointments API' })
+    } catch (error) {
+      if (error instanceof PaginationError) {
+        return NextResponse.json({ error: error.message }, { status: 400 })
       }
-
-      const slotId = path.split('/').pop()
-      
-      const { error } = await supabase
-        .from('time_slots')
-        .delete()
-        .eq('id', slotId)
-        .eq('doctor_id', auth.userId)
-      
-      if (error) throw error
-      return NextResponse.json({ success: true })
+      if (error?.code === INVALID_ID) {
+        return NextResponse.json({ error: 'Invalid id' }, { status: 400 })
+      }
+      console.error('API Error:', error)
+      return NextResponse.json({ error: error.message }, { status: 500 })
     }
-
-    return NextResponse.json({ error: 'Not found' }, { status: 404 })
-  } catch (error) {
-    console.error('API Error:', error)
-    return NextResponse.json({ error: error.message }, { status: 500 })
-  }
+  })
 }
 
-export async function PATCH(request) {
-  const url = new URL(request.url)
-  const path = url.pathname
-
-  try {
-    // Mark notification as read
-    if (path.match(/\/api\/notifications\/.+/)) {
-      const auth = getUserFromRequest(request)
-      if (!auth) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+export function DELETE(request) {
+  return serve('DELETE', request, async () => {
+    try {
+      return (await router.handle('DELETE', request)) || NextResponse.json({ error: 'Not found' }, { status: 404 })
+    } catch (error) {
+      if (error?.code === INVALID_ID) {
+        return NextResponse.json({ error: 'Invalid id' }, { status: 400 })
       }
-
-      const notifId = path.split('/').pop()
-      
-      const { error } = await supabase
-        .from('notifications')
-        .update({ read: true })
-        .eq('id', notifId)
-        .eq('user_id', auth.userId)
-      
-      if (error) throw error
-      return NextResponse.json({ success: true })
+      console.error('API Error:', error)
+      return NextResponse.json({ error: error.message }, { status: 500 })
     }
+  })
+}
 
-    return NextResponse.json({ error: 'Not found' }, { status: 404 })
-  } catch (error) {
-    console.error('API Error:', error)
-    return NextResponse.json({ error: error.message }, { status: 500 })
-  }
+export function PATCH(request) {
+  return serve('PATCH', request, async () => {
+    try {
+      return (await router.handle('PATCH', request)) || NextResponse.json({ error: 'Not found' }, { status: 404 })
+    } catch (error) {
+      if (error?.code === INVALID_ID) {
+        return NextResponse.json({ error: 'Invalid id' }, { status: 400 })
+      }
+      console.error('API Error:', error)
+      return NextResponse.json({ error: error.message }, { status: 500 })
+    }
+  })
 }
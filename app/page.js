@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
@@ -30,26 +30,51 @@ export default function App() {
   const [selectedDoctor, setSelectedDoctor] = useState(null)
   const [availableSlots, setAvailableSlots] = useState([])
   const [myAppointments, setMyAppointments] = useState([])
+  const [nextSlots, setNextSlots] = useState(null)
   
   // Notifications
   const [notifications, setNotifications] = useState([])
+  const [unreadCount, setUnreadCount] = useState(0)
   
   // Video call
   const [activeCall, setActiveCall] = useState(null)
+  
+  // Delta sync cursor and ETag from the last /api/sync response
+  const syncRef = useRef({ cursor: null, etag: null })
+  // List cursors for the rows a full sync left out
+  const [more, setMore] = useState({})
 
   useEffect(() => {
     checkAuth()
   }, [])
 
   useEffect(() => {
+    syncRef.current = { cursor: null, etag: null }
     if (user) {
-      loadNotifications()
-      if (user.role === 'doctor') {
-        loadDoctorData()
-      } else {
-        loadPatientData()
+      syncDashboard()
+    }
+  }, [user])
+
+  // New notifications and unread counts are pushed over one stream. Nothing
+  // is replayed on reconnect, so a reconnect triggers a dashboard sync.
+  useEffect(() => {
+    if (!user) return
+    const events = new EventSource('/api/notifications/stream')
+    let connected = false
+    events.onmessage = (message) => {
+      const event = JSON.parse(message.data)
+      setUnreadCount(event.unread)
+      if (event.type === 'unread') {
+        if (connected) syncDashboard()
+        connected = true
+      } else if (event.type === 'notification') {
+        setNotifications(current => mergeRows(current, [event.notification], [], byNewest))
+      } else if (event.type === 'read') {
+        const ids = new Set(event.ids)
+        setNotifications(current => current.map(n => (ids.has(n.id) ? { ...n, read: true } : n)))
       }
     }
+    return () => events.close()
   }, [user])
 
   const checkAuth = async () => {
@@ -70,45 +95,69 @@ export default function App() {
     }
   }
 
-  const loadNotifications = async () => {
+  // Merge changed rows into a list by id, drop deleted ids and keep it sorted
+  const mergeRows = (current, changed, deletedIds, compare) => {
+    const byId = new Map(current.map(row => [row.id, row]))
+    changed.forEach(row => byId.set(row.id, row))
+    deletedIds.forEach(id => byId.delete(id))
+    const merged = [...byId.values()]
+    return compare ? merged.sort(compare) : merged
+  }
+
+  const bySchedule = (a, b) => a.date.localeCompare(b.date) || a.start_time.localeCompare(b.start_time)
+  const byNewest = (a, b) => b.created_at.localeCompare(a.created_at)
+
+  // Fetch only what changed since the last sync; a 304 means nothing did
+  const syncDashboard = async () => {
     try {
-      const res = await fetch('/api/notifications', {
-        credentials: 'include'
+      const { cursor, etag } = syncRef.current
+      const res = await fetch(`/api/sync${cursor ? `?since=${encodeURIComponent(cursor)}` : ''}`, {
+        credentials: 'include',
+        headers: etag ? { 'If-None-Match': etag } : {}
       })
+      if (res.status === 304 || !res.ok) return
+      
       const data = await res.json()
-      setNotifications(data.notifications || [])
+      syncRef.current = { cursor: data.cursor, etag: res.headers.get('ETag') }
+      const merge = (current, changed, deletedIds = [], compare) =>
+        mergeRows(data.full ? [] : current, changed || [], deletedIds, compare)
+      if (data.full) setMore(data.more || {})
+      
+      setNotifications(current => merge(current, data.notifications, [], byNewest))
+      if (data.timeSlots) {
+        setTimeSlots(current => merge(current, data.timeSlots, data.deleted.timeSlots, bySchedule))
+        setAppointments(current => merge(current, data.appointments, [], bySchedule))
+      } else {
+        setDoctors(current => merge(current, data.doctors))
+        setMyAppointments(current => merge(current, data.appointments, [], bySchedule))
+      }
     } catch (error) {
-      console.error('Failed to load notifications:', error)
+      console.error('Failed to sync dashboard:', error)
     }
   }
 
-  const loadDoctorData = async () => {
+  // Next page of a list the full sync cut short, from its list endpoint
+  const loadMore = async (list) => {
+    const cursor = more[list]
+    if (!cursor) return
     try {
-      const [slotsRes, apptsRes] = await Promise.all([
-        fetch(`/api/time-slots?doctorId=${user.id}`, { credentials: 'include' }),
-        fetch('/api/appointments', { credentials: 'include' })
-      ])
-      const slotsData = await slotsRes.json()
-      const apptsData = await apptsRes.json()
-      setTimeSlots(slotsData.slots || [])
-      setAppointments(apptsData.appointments || [])
-    } catch (error) {
-      console.error('Failed to load doctor data:', error)
-    }
-  }
+      const url = list === 'timeSlots'
+        ? `/api/time-slots?doctorId=${user.id}&cursor=${encodeURIComponent(cursor)}`
+        : `/api/appointments?cursor=${encodeURIComponent(cursor)}`
+      const res = await fetch(url, { credentials: 'include' })
+      if (!res.ok) return
 
-  const loadPatientData = async () => {
-    try {
-      const [doctorsRes, apptsRes] = await Promise.all([
-        fetch('/api/doctors', { credentials: 'include' }),
-        fetch('/api/appointments', { credentials: 'include' })
-      ])
-      const doctorsData = await doctorsRes.json()
-      const apptsData = await apptsRes.json()
-      setDoctors(doctorsData.doctors || [])
-      setMyAppointments(apptsData.appointments || [])
+      const data = await res.json()
+      if (list === 'timeSlots') {
+        setTimeSlots(current => mergeRows(current, data.slots, [], bySchedule))
+      } else if (user.role === 'doctor') {
+        setAppointments(current => mergeRows(current, data.appointments, [], bySchedule))
+      } else {
+        setMyAppointments(current => mergeRows(current, data.appointments, [], bySchedule))
+      }
+      setMore(current => ({ ...current, [list]: data.nextCursor }))
     } catch (error) {
-      console.error('Failed to load patient data:', error)
+      console.error('Failed to load more:', error)
     }
   }
 
@@ -159,7 +208,7 @@ export default function App() {
   const handleLogout = async () => {
     try {
       await fetch('/api/auth/logout', { method: 'POST', credentials: 'include' })
-      Cookies.remove('userId')
+      Cookies.remove('session')
       setUser(null)
       setView('login')
       toast.success('Logged out successfully')
@@ -168,6 +217,24 @@ export default function App() {
     }
   }
 
+  const markAllNotificationsRead = async () => {
+    try {
+      const res = await fetch('/api/notifications/read', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ all: true }),
+        credentials: 'include'
+      })
+      if (res.ok) {
+        const data = await res.json()
+        setUnreadCount(data.unread)
+        setNotifications(current => current.map(n => ({ ...n, read: true })))
+      }
+    } catch (error) {
+      console.error('Failed to mark notifications read:', error)
+    }
+  }
+
   const createTimeSlot = async (e) => {
     e.preventDefault()
     try {
@@ -185,7 +252,7 @@ export default function App() {
       if (res.ok) {
         toast.success('Time slot created!')
         setFormData({})
-        loadDoctorData()
+        syncDashboard()
       } else {
         toast.error('Failed to create time slot')
       }
@@ -202,7 +269,7 @@ export default function App() {
       })
       if (res.ok) {
         toast.success('Time slot deleted')
-        loadDoctorData()
+        syncDashboard()
       }
     } catch (error) {
       toast.error('Failed to delete time slot')
@@ -223,21 +290,32 @@ export default function App() {
 
   const loadAllDoctorSlots = async (doctorId) => {
     try {
-      const res = await fetch(`/api/time-slots?doctorId=${doctorId}&available=true`, {
+      // Only upcoming slots, first page in date order
+      const today = new Date().toISOString().split('T')[0]
+      const res = await fetch(`/api/time-slots?doctorId=${doctorId}&available=true&from=${today}`, {
         credentials: 'include'
       })
       const data = await res.json()
-      // Filter out past dates and sort by date
-      const now = new Date()
-      const today = now.toISOString().split('T')[0]
-      const futureSlots = (data.slots || []).filter(slot => slot.date >= today)
-      setAvailableSlots(futureSlots)
+      setAvailableSlots(data.slots || [])
       setFormData({ ...formData, selectedSlot: null, notes: '' })
     } catch (error) {
       console.error('Failed to load slots:', error)
     }
   }
 
+  // Earliest open slots across every doctor in one request
+  const loadNextAvailable = async () => {
+    try {
+      const res = await fetch('/api/availability?days=14&limit=6', {
+        credentials: 'include'
+      })
+      const data = await res.json()
+      setNextSlots(data.slots || [])
+    } catch (error) {
+      console.error('Failed to load availability:', error)
+    }
+  }
+
   const bookAppointment = async (slotId) => {
     try {
       const res = await fetch('/api/appointments', {
@@ -250,8 +328,9 @@ export default function App() {
         toast.success('Appointment booked successfully!')
         setSelectedDoctor(null)
         setAvailableSlots([])
+        setNextSlots(null)
         setFormData({})
-        loadPatientData()
+        syncDashboard()
       } else {
         const data = await res.json()
         toast.error(data.error || 'Failed to book appointment')
@@ -271,11 +350,7 @@ export default function App() {
       })
       if (res.ok) {
         toast.success(`Appointment ${status}`)
-        if (user.role === 'doctor') {
-          loadDoctorData()
-        } else {
-          loadPatientData()
-        }
+        syncDashboard()
       }
     } catch (error) {
       toast.error('Failed to update appointment')
@@ -294,7 +369,7 @@ export default function App() {
       })
       if (res.ok) {
         toast.success('Appointment cancelled. Patient has been notified.')
-        loadDoctorData()
+        syncDashboard()
       } else {
         toast.error('Failed to cancel appointment')
       }
@@ -314,7 +389,7 @@ export default function App() {
       if (res.ok) {
         toast.success('Appointment rescheduled. Patient has been notified.')
         setFormData({})
-        loadDoctorData()
+        syncDashboard()
       } else {
         toast.error('Failed to reschedule appointment')
       }
@@ -334,11 +409,7 @@ export default function App() {
     toast.success('Left video call')
     // Reload appointments to refresh data
     if (user) {
-      if (user.role === 'doctor') {
-        loadDoctorData()
-      } else {
-        loadPatientData()
-      }
+      syncDashboard()
     }
   }
 
@@ -545,11 +616,17 @@ export default function App() {
         {/* Notifications */}
         {notifications.length > 0 && (
           <Card className="mb-6 border-blue-200 bg-blue-50">
-            <CardHeader>
+            <CardHeader className="flex flex-row items-center justify-between">
               <CardTitle className="flex items-center gap-2 text-blue-900">
                 <Bell className="w-5 h-5" />
-                Notifications ({notifications.filter(n => !n.read).length} unread)
+                Notifications ({unreadCount} unread)
               </CardTitle>
+              {unreadCount > 0 && (
+                <Button onClick={markAllNotificationsRead} variant="outline" size="sm">
+                  <CheckCircle className="w-4 h-4 mr-2" />
+                  Mark all read
+                </Button>
+              )}
             </CardHeader>
             <CardContent>
               <div className="space-y-2">
@@ -667,6 +744,11 @@ export default function App() {
                         ))}
                       </div>
                     )}
+                    {more.timeSlots && (
+                      <Button onClick={() => loadMore('timeSlots')} variant="outline" size="sm" className="w-full mt-4">
+                        Load more
+                      </Button>
+                    )}
                   </CardContent>
                 </Card>
               </TabsContent>
@@ -822,6 +904,11 @@ export default function App() {
                         ))}
                       </div>
                     )}
+                    {more.appointments && (
+                      <Button onClick={() => loadMore('appointments')} variant="outline" size="sm" className="w-full mt-4">
+                        Load more
+                      </Button>
+                    )}
                   </CardContent>
                 </Card>
               </TabsContent>
@@ -839,6 +926,43 @@ export default function App() {
               </TabsList>
               
               <TabsContent value="book" className="space-y-6">
+                {/* Next available across all doctors */}
+                <Card>
+                  <CardHeader>
+                    <CardTitle className="flex items-center gap-2">
+                      <Clock className="w-5 h-5" />
+                      Next Available
+                    </CardTitle>
+                    <CardDescription>The earliest open slots with any doctor in the next two weeks</CardDescription>
+                  </CardHeader>
+                  <CardContent>
+                    {nextSlots === null ? (
+                      <Button variant="outline" onClick={loadNextAvailable}>
+                        Find next available slot
+                      </Button>
+                    ) : nextSlots.length > 0 ? (
+                      <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-3">
+                        {nextSlots.map((slot) => (
+                          <div key={slot.id} className="p-3 rounded-lg border border-gray-200 bg-white">
+                            <p className="font-semibold text-gray-900">Dr. {slot.doctor?.name}</p>
+                            <p className="text-xs text-gray-600">
+                              {slot.doctor?.doctor_profiles?.[0]?.specialization || 'General'}
+                            </p>
+                            <p className="text-sm text-gray-700 mt-1">
+                              {new Date(slot.date + 'T00:00:00').toLocaleDateString()} • {slot.start_time} - {slot.end_time}
+                            </p>
+                            <Button size="sm" className="mt-2" onClick={() => bookAppointment(slot.id)}>
+                              Book
+                            </Button>
+                          </div>
+                        ))}
+                      </div>
+                    ) : (
+                      <p className="text-center text-gray-500 py-4">No open slots in the next two weeks</p>
+                    )}
+                  </CardContent>
+                </Card>
+
                 {/* Select Doctor */}
                 <Card>
                   <CardHeader>
@@ -1067,6 +1191,11 @@ export default function App() {
                         ))}
                       </div>
                     )}
+                    {more.appointments && (
+                      <Button onClick={() => loadMore('appointments')} variant="outline" size="sm" className="w-full mt-4">
+                        Load more
+                      </Button>
+                    )}
                   </CardContent>
                 </Card>
               </TabsContent>
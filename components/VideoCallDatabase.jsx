@@ -6,6 +6,8 @@ import { Card } from '@/components/ui/card'
 import { Video, VideoOff, Mic, MicOff, PhoneOff } from 'lucide-react'
 import toast from 'react-hot-toast'
 
+const ICE_BATCH_MS = 50
+
 export default function VideoCallDatabase({ appointmentId, userRole, onLeave }) {
   const [remoteConnected, setRemoteConnected] = useState(false)
   const [videoEnabled, setVideoEnabled] = useState(true)
@@ -16,7 +18,7 @@ export default function VideoCallDatabase({ appointmentId, userRole, onLeave })
   const remoteVideoRef = useRef(null)
   const pcRef = useRef(null)
   const localStreamRef = useRef(null)
-  const pollIntervalRef = useRef(null)
+  const eventSourceRef = useRef(null)
 
   useEffect(() => {
     let cleanedUp = false
@@ -78,14 +80,17 @@ export default function VideoCallDatabase({ appointmentId, userRole, onLeave })
         }
 
         // ICE
-        pc.onicecandidate = async (e) => {
+        pc.onicecandidate = (e) => {
           if (e.candidate) {
-            console.log('📡 Sending ICE')
-            await sendSignal('ice', {
+            console.log('📡 Queued ICE')
+            sendSignal('ice', {
               candidate: e.candidate.candidate,
               sdpMid: e.candidate.sdpMid,
               sdpMLineIndex: e.candidate.sdpMLineIndex
             })
+          } else {
+            // Gathering finished; send whatever is still queued
+            flushSignals()
           }
         }
 
@@ -101,9 +106,7 @@ export default function VideoCallDatabase({ appointmentId, userRole, onLeave })
         setStatus('Connecting...')
         const isDoctor = userRole === 'doctor'
 
-        if (isDoctor) {
-          // Doctor waits then creates offer
-          await new Promise(r => setTimeout(r, 2000))
+        const createOffer = async () => {
           console.log('👨‍⚕️ Creating offer')
           const offer = await pc.createOffer()
           await pc.setLocalDescription(offer)
@@ -115,37 +118,48 @@ export default function VideoCallDatabase({ appointmentId, userRole, onLeave })
           setStatus('Calling...')
         }
 
-        // Poll for signals
-        pollIntervalRef.current = setInterval(async () => {
-          const signals = await getSignals()
-          
-          for (const signal of signals) {
-            try {
-              if (signal.type === 'offer' && !isDoctor) {
-                console.log('📨 Got offer')
-                await pc.setRemoteDescription(signal.data)
-                const answer = await pc.createAnswer()
-                await pc.setLocalDescription(answer)
-                await sendSignal('answer', {
-                  type: answer.type,
-                  sdp: answer.sdp
-                })
-                console.log('📤 Sent answer')
-                await deleteSignal(signal.id)
-              } else if (signal.type === 'answer' && isDoctor) {
-                console.log('📨 Got answer')
-                await pc.setRemoteDescription(signal.data)
-                await deleteSignal(signal.id)
-              } else if (signal.type === 'ice') {
-                await pc.addIceCandidate(signal.data)
-                await deleteSignal(signal.id)
-              }
-            } catch (err) {
-              console.error('Signal error:', err)
-            }
+        const handleSignal = async (signal) => {
+          if (signal.type === 'ready' && isDoctor) {
+            // Patient's stream is open; the offer reaches them immediately
+            await createOffer()
+          } else if (signal.type === 'offer' && !isDoctor) {
+            console.log('📨 Got offer')
+            await pc.setRemoteDescription(signal.data)
+            const answer = await pc.createAnswer()
+            await pc.setLocalDescription(answer)
+            await sendSignal('answer', {
+              type: answer.type,
+              sdp: answer.sdp
+            })
+            console.log('📤 Sent answer')
+          } else if (signal.type === 'answer' && isDoctor) {
+            console.log('📨 Got answer')
+            await pc.setRemoteDescription(signal.data)
+          } else if (signal.type === 'ice') {
+            await pc.addIceCandidate(signal.data)
           }
-        }, 1000)
+        }
 
+        // Signals are pushed over Server-Sent Events and applied strictly in
+        // order, so ICE candidates never race ahead of their offer/answer
+        let queue = Promise.resolve()
+        const events = new EventSource(`/api/signals/stream?appointmentId=${encodeURIComponent(appointmentId)}`)
+        eventSourceRef.current = events
+        events.onmessage = (e) => {
+          const signal = JSON.parse(e.data)
+          queue = queue
+            .then(() => handleSignal(signal))
+            .catch(err => console.error('Signal error:', err))
+            .then(() => scheduleAck(signal.id))
+        }
+        // EventSource reconnects on its own; announce the patient only once
+        let announced = false
+        events.onopen = () => {
+          if (!isDoctor && !announced) {
+            announced = true
+            sendSignal('ready', {})
+          }
+        }
       } catch (err) {
         console.error('❌ Setup error:', err)
         setStatus('Error: ' + err.message)
@@ -154,29 +168,49 @@ export default function VideoCallDatabase({ appointmentId, userRole, onLeave })
     }
 
     // Helper functions using API
-    const sendSignal = async (type, data) => {
-      await fetch('/api/signals', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          appointmentId,
-          from: userRole,
-          type,
-          data
-        })
-      })
+    // Outgoing signals leave in order, one request per burst: descriptions are
+    // sent at once, ICE candidates are coalesced for ICE_BATCH_MS
+    let outbox = []
+    let flushTimer = null
+    let sending = Promise.resolve()
+
+    const flushSignals = () => {
+      clearTimeout(flushTimer)
+      flushTimer = null
+      if (outbox.length === 0) return sending
+      const signals = outbox
+      outbox = []
+      sending = sending
+        .then(() => fetch('/api/signals', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ appointmentId, signals })
+        }))
+        .catch(err => console.error('Signal send error:', err))
+      return sending
     }
 
-    const getSignals = async () => {
-      const res = await fetch(`/api/signals?appointmentId=${appointmentId}&to=${userRole}`)
-      if (res.ok) {
-        return await res.json()
-      }
-      return []
+    const sendSignal = (type, data) => {
+      outbox.push({ type, data })
+      if (type !== 'ice') return flushSignals()
+      if (!flushTimer) flushTimer = setTimeout(flushSignals, ICE_BATCH_MS)
+      return sending
     }
 
-    const deleteSignal = async (id) => {
-      await fetch(`/api/signals/${id}`, { method: 'DELETE' })
+    // One acknowledgement covers every signal handled in the last burst
+    let ackCursor = 0
+    let ackTimer = null
+    const scheduleAck = (cursor) => {
+      ackCursor = Math.max(ackCursor, cursor)
+      if (ackTimer) return
+      ackTimer = setTimeout(() => {
+        ackTimer = null
+        fetch('/api/signals/ack', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ appointmentId, cursor: ackCursor })
+        }).catch(err => console.error('Ack error:', err))
+      }, 500)
     }
 
     init()
@@ -184,9 +218,11 @@ export default function VideoCallDatabase({ appointmentId, userRole, onLeave })
     return () => {
       cleanedUp = true
       console.log('🧹 Cleanup')
-      if (pollIntervalRef.current) {
-        clearInterval(pollIntervalRef.current)
+      if (eventSourceRef.current) {
+        eventSourceRef.current.close()
       }
+      clearTimeout(ackTimer)
+      clearTimeout(flushTimer)
       if (localStreamRef.current) {
         localStreamRef.current.getTracks().forEach(t => t.stop())
       }
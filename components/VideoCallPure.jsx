@@ -3,7 +3,6 @@
 import { useState, useEffect, useRef } from 'react'
 import { Button } from '@/components/ui/button'
 import { Video, VideoOff, Mic, MicOff, Phone, RefreshCw, Bell } from 'lucide-react'
-import { supabase } from '@/lib/supabase'
 import toast from 'react-hot-toast'
 
 export default function VideoCallPure({ roomId, userId, userName, onLeave }) {
@@ -20,108 +19,82 @@ export default function VideoCallPure({ roomId, userId, userName, onLeave }) {
   const localVideoRef = useRef(null)
   const remoteVideoRef = useRef(null)
   const peerConnectionRef = useRef(null)
-  const pollingIntervalRef = useRef(null)
+  const signalsRef = useRef(null)
+  const signalQueueRef = useRef(Promise.resolve())
+  const ackRef = useRef({ cursor: 0, timer: null })
+  const presenceRef = useRef(null)
+  const otherPresentRef = useRef(false)
   const localStreamRef = useRef(null)
   const iceCandidatesRef = useRef([])
-  const isInitiatorRef = useRef(false)
+  const isInitiatorRef = useRef(null)
   const hasNotifiedRef = useRef(false)
 
   useEffect(() => {
-    checkRoomStatus()
+    openPresence()
     return () => cleanup()
   }, [])
 
-  const checkRoomStatus = async () => {
-    try {
-      console.log('Checking room status for room:', roomId)
-      
-      // Check if other user is already in the room
-      const { data: participants, error } = await supabase
-        .from('room_participants')
-        .select('*')
-        .eq('room_id', roomId)
-        .neq('user_id', userId)
-      
-      console.log('Found participants:', participants?.length || 0)
-      
-      if (error) {
-        console.error('Error querying participants:', error)
+  const showParticipantReady = (message) => {
+    setOtherUserReady(true)
+    setWaitingForOther(false)
+    if (hasNotifiedRef.current) return
+    hasNotifiedRef.current = true
+    toast.success(message, {
+      duration: 6000,
+      style: {
+        background: '#10b981',
+        color: '#fff',
       }
-      
-      if (participants && participants.length > 0) {
-        // Other user is already there
-        console.log('Other participant already in room!')
-        setOtherUserReady(true)
-        setWaitingForOther(false)
-        toast.success('✓ Other participant is ready! Click "Join Video Call Now" to connect.', {
-          duration: 5000,
-          style: {
-            background: '#10b981',
-            color: '#fff',
-          }
-        })
-      } else {
-        // I'm first, wait for other
-        console.log('I am first, starting monitoring...')
+    })
+  }
+
+  // Presence is pushed over one stream (see lib/presence.js): a snapshot of
+  // who is already in the room, then the other participant's joins and leaves.
+  // The open stream is our heartbeat, so nothing is polled.
+  const openPresence = () => {
+    const events = new EventSource(`/api/presence/stream?roomId=${encodeURIComponent(roomId)}`)
+    presenceRef.current = events
+    events.onmessage = (message) => {
+      const event = JSON.parse(message.data)
+      if (event.type === 'snapshot') {
+        // The server orders joins, so exactly one side arrives to an empty room
+        if (isInitiatorRef.current === null) {
+          isInitiatorRef.current = event.participants.length === 0
+        }
+        otherPresentRef.current = event.participants.length > 0
+        if (otherPresentRef.current) {
+          showParticipantReady('✓ Other participant is ready! Click "Join Video Call Now" to connect.')
+        } else {
+          setWaitingForOther(true)
+          setConnectionState('Preparing to join...')
+        }
+      } else if (event.type === 'join') {
+        otherPresentRef.current = true
+        showParticipantReady('🎉 Other participant has joined! Click "Join Video Call Now" to connect.')
+        offerIfReady()
+      } else if (event.type === 'leave') {
+        otherPresentRef.current = false
+        hasNotifiedRef.current = false
+        setOtherUserReady(false)
         setWaitingForOther(true)
-        setConnectionState('Preparing to join...')
-        // Start monitoring for other user
-        startMonitoringForParticipant()
+        toast('The other participant left the room')
+      }
+    }
+    events.onerror = () => {
+      if (events.readyState === EventSource.CLOSED) {
+        setError('Failed to check room status')
       }
-    } catch (err) {
-      console.error('Error checking room:', err)
-      setError('Failed to check room status')
     }
   }
 
-  const startMonitoringForParticipant = () => {
-    console.log('Starting participant monitoring...')
-    
-    const checkForParticipant = async () => {
-      try {
-        const { data: participants } = await supabase
-          .from('room_participants')
-          .select('*')
-          .eq('room_id', roomId)
-          .neq('user_id', userId)
-        
-        console.log('Polling: Found', participants?.length || 0, 'participants')
-        
-        if (participants && participants.length > 0) {
-          console.log('Other participant detected!')
-          
-          // Stop polling
-          if (pollingIntervalRef.current) {
-            clearInterval(pollingIntervalRef.current)
-            pollingIntervalRef.current = null
-          }
-          
-          setOtherUserReady(true)
-          setWaitingForOther(false)
-          
-          // Show notification only once
-          if (!hasNotifiedRef.current) {
-            hasNotifiedRef.current = true
-            toast.success('🎉 Other participant has joined! Click "Join Video Call Now" to connect.', {
-              duration: 6000,
-              style: {
-                background: '#10b981',
-                color: '#fff',
-              }
-            })
-          }
-        }
-      } catch (err) {
-        console.error('Error checking for participant:', err)
-      }
+  // The first to arrive makes the offer once both are in the room
+  const offerIfReady = async () => {
+    const pc = peerConnectionRef.current
+    if (isInitiatorRef.current && otherPresentRef.current && pc && !pc.localDescription) {
+      console.log('Other participant is here, creating offer...')
+      setConnectionState('Participant joined! Connecting...')
+      await createAndSendOffer()
     }
-    
-    // Check immediately
-    checkForParticipant()
-    
-    // Then check every 2 seconds
-    const interval = setInterval(checkForParticipant, 2000)
-    pollingIntervalRef.current = interval
   }
 
   const initializeCall = async () => {
@@ -142,26 +115,18 @@ export default function VideoCallPure({ roomId, userId, userName, onLeave }) {
         localVideoRef.current.srcObject = stream
       }
 
-      // Join room and determine role
-      setConnectionState('Joining room...')
-      const amIFirst = await joinRoom()
-      isInitiatorRef.current = amIFirst
-      
       // Create peer connection
       createPeerConnection(stream)
       
-      if (amIFirst) {
+      if (isInitiatorRef.current) {
         setConnectionState('Ready - waiting for other participant...')
-        setWaitingForOther(true)
-        // Don't notify myself
+        await offerIfReady()
       } else {
+        // The initiator's offer is replayed when our signal stream opens
         setConnectionState('Connecting to participant...')
-        // Non-initiator creates and sends offer immediately
-        setTimeout(() => createAndSendOffer(), 1500)
       }
       
-      // Start polling for signals
-      startPolling()
+      openSignals()
       
     } catch (err) {
       console.error('Failed to initialize:', err)
@@ -171,28 +136,6 @@ export default function VideoCallPure({ roomId, userId, userName, onLeave }) {
     }
   }
 
-  const joinRoom = async () => {
-    // Check if anyone else is in the room
-    const { data: existing } = await supabase
-      .from('room_participants')
-      .select('*')
-      .eq('room_id', roomId)
-      .neq('user_id', userId)
-    
-    // Add myself to the room
-    const participantId = `part_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-    await supabase.from('room_participants').insert({
-      id: participantId,
-      room_id: roomId,
-      user_id: userId,
-      user_name: userName,
-      joined_at: new Date().toISOString(),
-      last_seen: new Date().toISOString()
-    })
-    
-    return !existing || existing.length === 0
-  }
-
   const createPeerConnection = (stream) => {
     const config = {
       iceServers: [
@@ -341,97 +284,60 @@ export default function VideoCallPure({ roomId, userId, userName, onLeave }) {
     }
   }
 
+  // Signals go through the in-memory relay (see lib/signaling.js), keyed by
+  // this call's video room id
   const sendSignal = async (signal) => {
     try {
-      const signalId = `sig_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      await supabase.from('webrtc_signals').insert({
-        id: signalId,
-        room_id: roomId,
-        user_id: userId,
-        signal_type: signal.type,
-        signal_data: signal,
-        created_at: new Date().toISOString()
+      await fetch('/api/signals', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ appointmentId: roomId, type: signal.type, data: signal })
       })
     } catch (err) {
       console.error('Error sending signal:', err)
     }
   }
 
-  const startPolling = () => {
-    console.log('Starting signal polling...')
-    
-    // Clear any existing polling interval
-    if (pollingIntervalRef.current) {
-      clearInterval(pollingIntervalRef.current)
+  const handleSignal = async ({ type, data }) => {
+    if (type === 'offer') {
+      await handleOffer(data.sdp)
+    } else if (type === 'answer') {
+      await handleAnswer(data.sdp)
+    } else if (type === 'ice-candidate') {
+      await handleIceCandidate(data.candidate)
     }
-    
-    // Update presence and check signals
-    const pollInterval = setInterval(async () => {
-      // Update last seen
-      await supabase
-        .from('room_participants')
-        .update({ last_seen: new Date().toISOString() })
-        .eq('room_id', roomId)
-        .eq('user_id', userId)
-      
-      // Check for signals
-      await checkForSignals()
-      
-      // Check if other participant joined (for initiator)
-      if (isInitiatorRef.current && !peerConnectionRef.current?.remoteDescription) {
-        await checkForParticipantInCall()
-      }
-    }, 1000)
-    
-    // Don't overwrite the monitoring interval, use a different reference
-    pollingIntervalRef.current = pollInterval
   }
 
-  const checkForParticipantInCall = async () => {
-    const { data } = await supabase
-      .from('room_participants')
-      .select('*')
-      .eq('room_id', roomId)
-      .neq('user_id', userId)
-    
-    if (data && data.length > 0 && !peerConnectionRef.current?.localDescription) {
-      // Other participant joined, create offer
-      console.log('Other participant joined the call, creating offer...')
-      setConnectionState('Participant joined! Connecting...')
-      await createAndSendOffer()
-    }
+  // One acknowledgement covers every signal handled in the last burst
+  const sendAck = () => {
+    clearTimeout(ackRef.current.timer)
+    ackRef.current.timer = null
+    if (!ackRef.current.cursor) return
+    fetch('/api/signals/ack', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ appointmentId: roomId, cursor: ackRef.current.cursor })
+    }).catch(err => console.error('Ack error:', err))
   }
 
-  const checkForSignals = async () => {
-    try {
-      const { data: signals } = await supabase
-        .from('webrtc_signals')
-        .select('*')
-        .eq('room_id', roomId)
-        .neq('user_id', userId)
-        .order('created_at', { ascending: true })
-      
-      if (!signals || signals.length === 0) return
-      
-      for (const signal of signals) {
-        const signalData = signal.signal_data
-        
-        if (signal.signal_type === 'offer') {
-          await handleOffer(signalData.sdp)
-        } else if (signal.signal_type === 'answer') {
-          await handleAnswer(signalData.sdp)
-        } else if (signal.signal_type === 'ice-candidate') {
-          await handleIceCandidate(signalData.candidate)
-        }
-        
-        // Delete processed signal
-        await supabase
-          .from('webrtc_signals')
-          .delete()
-          .eq('id', signal.id)
-      }
-    } catch (err) {
-      console.error('Error checking signals:', err)
+  const scheduleAck = (cursor) => {
+    ackRef.current.cursor = Math.max(ackRef.current.cursor, cursor)
+    if (!ackRef.current.timer) ackRef.current.timer = setTimeout(sendAck, 500)
+  }
+
+  // Signals are pushed over Server-Sent Events and applied strictly in order,
+  // so ICE candidates never race ahead of their offer or answer. Anything not
+  // yet acknowledged is replayed when the stream (re)connects.
+  const openSignals = () => {
+    if (signalsRef.current) signalsRef.current.close()
+    const events = new EventSource(`/api/signals/stream?appointmentId=${encodeURIComponent(roomId)}`)
+    signalsRef.current = events
+    events.onmessage = (message) => {
+      const signal = JSON.parse(message.data)
+      signalQueueRef.current = signalQueueRef.current
+        .then(() => handleSignal(signal))
+        .catch(err => console.error('Error handling signal:', err))
+        .then(() => scheduleAck(signal.id))
     }
   }
 
@@ -456,20 +362,22 @@ export default function VideoCallPure({ roomId, userId, userName, onLeave }) {
   }
 
   const reconnect = () => {
-    cleanup()
+    // Stay in the room; only the call itself is torn down
+    cleanup({ leaveRoom: false })
     setError(null)
     setConnectionState('Reconnecting...')
     setTimeout(() => initializeCall(), 1000)
   }
 
-  const cleanup = async () => {
+  const cleanup = async ({ leaveRoom = true } = {}) => {
     console.log('Cleaning up video call...')
     
-    // Stop polling
-    if (pollingIntervalRef.current) {
-      clearInterval(pollingIntervalRef.current)
-      pollingIntervalRef.current = null
+    // Stop receiving signals, acknowledging what was already handled
+    if (signalsRef.current) {
+      signalsRef.current.close()
+      signalsRef.current = null
     }
+    sendAck()
     
     // Close peer connection
     if (peerConnectionRef.current) {
@@ -483,20 +391,19 @@ export default function VideoCallPure({ roomId, userId, userName, onLeave }) {
       localStreamRef.current = null
     }
     
-    // Remove from room
+    // Leave the room; the other participant is told straight away
+    if (leaveRoom && presenceRef.current) {
+      presenceRef.current.close()
+      presenceRef.current = null
+    }
     try {
-      await supabase
-        .from('room_participants')
-        .delete()
-        .eq('room_id', roomId)
-        .eq('user_id', userId)
-      
-      // Clean up signals
-      await supabase
-        .from('webrtc_signals')
-        .delete()
-        .eq('room_id', roomId)
-        .eq('user_id', userId)
+      if (leaveRoom) {
+        await fetch('/api/presence/leave', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ roomId })
+        })
+      }
     } catch (err) {
       console.error('Cleanup error:', err)
     }
@@ -3,21 +3,14 @@
 Debug authentication issues
 """
 
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://medmeet-3.preview.emergentagent.com')
-API_BASE = f"{BASE_URL}/api"
+from medmeet_client import API_BASE, new_session
 
 def test_auth_without_cookies():
     """Test auth endpoints without any cookies"""
     print("Testing auth endpoints without cookies...")
     
     # Create a fresh session
-    session = requests.Session()
+    session = new_session()
     
     # Clear any existing cookies
     session.cookies.clear()
@@ -30,12 +23,12 @@ def test_auth_without_cookies():
     print(f"Session cookies: {dict(session.cookies)}")
     
     # Test with explicit empty cookies
-    response2 = requests.get(f"{API_BASE}/auth/me", cookies={})
+    response2 = new_session().get(f"{API_BASE}/auth/me", cookies={})
     print(f"\nGET /api/auth/me (explicit empty cookies): {response2.status_code}")
     print(f"Response: {response2.text[:200]}")
     
     # Test with no session at all
-    response3 = requests.get(f"{API_BASE}/auth/me")
+    response3 = new_session().get(f"{API_BASE}/auth/me")
     print(f"\nGET /api/auth/me (no session): {response3.status_code}")
     print(f"Response: {response3.text[:200]}")
 
@@ -3,13 +3,7 @@
 Debug path handling
 """
 
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://medmeet-3.preview.emergentagent.com')
+from medmeet_client import BASE_URL, new_session
 
 def test_path_handling():
     """Test different path formats"""
@@ -23,10 +17,11 @@ def test_path_handling():
         "/api/nonexistent"
     ]
     
+    session = new_session()
     for path in paths_to_test:
         print(f"\n--- Testing {path} ---")
         try:
-            response = requests.get(f"{BASE_URL}{path}")
+            response = session.get(f"{BASE_URL}{path}")
             print(f"Status: {response.status_code}")
             print(f"Response: {response.text[:200]}")
         except Exception as e:
@@ -3,21 +3,14 @@
 Debug session and cookie handling
 """
 
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://medmeet-3.preview.emergentagent.com')
-API_BASE = f"{BASE_URL}/api"
+from medmeet_client import API_BASE, new_session, run_parallel
 
 def test_session_behavior():
     """Test how session behaves across requests"""
     print("Testing session behavior...")
     
     # Create session and login
-    session = requests.Session()
+    session = new_session()
     
     # Register a test user
     doctor_data = {
@@ -51,27 +44,24 @@ def test_session_behavior():
     
     # Test with a completely new session
     print("\n4. Testing with new session...")
-    new_session = requests.Session()
-    auth_response3 = new_session.get(f"{API_BASE}/auth/me")
+    anonymous = new_session()
+    auth_response3 = anonymous.get(f"{API_BASE}/auth/me")
     print(f"Auth/me with new session: {auth_response3.status_code}")
     
     # Test other endpoints that should require auth
     print("\n5. Testing other protected endpoints...")
     endpoints = [
-        ("GET", "/api/appointments", None),
-        ("GET", "/api/notifications", None),
-        ("POST", "/api/time-slots", {"date": "2025-11-25", "startTime": "09:00", "endTime": "09:30"}),
-        ("DELETE", "/api/time-slots/fake_id", None)
+        ("GET", "/appointments", None),
+        ("GET", "/notifications", None),
+        ("POST", "/time-slots", {"date": "2025-11-25", "startTime": "09:00", "endTime": "09:30"}),
+        ("DELETE", "/time-slots/fake_id", None)
     ]
     
-    for method, endpoint, data in endpoints:
-        if method == "GET":
-            resp = new_session.get(f"{API_BASE}{endpoint}")
-        elif method == "POST":
-            resp = new_session.post(f"{API_BASE}{endpoint}", json=data)
-        elif method == "DELETE":
-            resp = new_session.delete(f"{API_BASE}{endpoint}")
-        
+    responses = run_parallel(
+        lambda method=method, endpoint=endpoint, data=data: anonymous.request(method, f"{API_BASE}{endpoint}", json=data)
+        for method, endpoint, data in endpoints
+    )
+    for (method, endpoint, _), resp in zip(endpoints, responses):
         print(f"{method} {endpoint}: {resp.status_code}")
 
 if __name__ == "__main__":
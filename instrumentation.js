@@ -0,0 +1,14 @@
+export async function register() {
+  // Background workers only run in the Node.js server runtime
+  if (process.env.NEXT_RUNTIME !== 'nodejs') return
+
+  if (process.env.EMAIL_WORKER !== 'off') {
+    const { startEmailWorker } = await import('./lib/email-outbox')
+    startEmailWorker()
+  }
+
+  if (process.env.REMINDER_WORKER !== 'off') {
+    const { startReminderWorker } = await import('./lib/reminders')
+    startReminderWorker()
+  }
+}
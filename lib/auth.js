@@ -1,17 +1,52 @@
 import bcrypt from 'bcryptjs'
 import { supabase } from './supabase'
+import { newId } from './ids'
+import { createLruCache } from './cache'
+import { hashInPool, compareInPool } from './hash-pool'
+
+// User records and doctor profiles change rarely; entries are dropped on update
+// and expire after USER_CACHE_TTL_MS so other instances converge too
+const USER_CACHE_TTL_MS = parseInt(process.env.USER_CACHE_TTL_MS || '300000', 10)
+const userCache = createLruCache({ max: 5000, ttlMs: USER_CACHE_TTL_MS })
+const profileCache = createLruCache({ max: 5000, ttlMs: USER_CACHE_TTL_MS })
+
+// Explicit projections: the password hash is read for login only, never for
+// session lookups or the user cache
+export const USER_COLUMNS = 'id, email, name, role, phone'
+const LOGIN_COLUMNS = 'id, email, name, role, password_hash'
+export const PROFILE_COLUMNS = 'specialization, bio, experience'
+
+// Work factor for new hashes; older hashes are upgraded on the next login
+const BCRYPT_COST = parseInt(process.env.BCRYPT_COST || '10', 10)
 
 export async function hashPassword(password) {
-  return await bcrypt.hash(password, 10)
+  return await hashInPool(password, BCRYPT_COST)
 }
 
 export async function verifyPassword(password, hash) {
-  return await bcrypt.compare(password, hash)
+  return await compareInPool(password, hash)
+}
+
+// After a successful login, rehash with the current cost if the stored hash
+// is weaker. Failures are logged only; the login itself already succeeded.
+export async function upgradePasswordHash(user, password) {
+  if (bcrypt.getRounds(user.password_hash) >= BCRYPT_COST) return
+  try {
+    const { error } = await supabase
+      .from('users')
+      .update({ password_hash: await hashPassword(password) })
+      .eq('id', user.id)
+      .eq('password_hash', user.password_hash)
+    if (error) throw error
+    invalidateUser(user.id)
+  } catch (error) {
+    console.error('Password hash upgrade error:', error)
+  }
 }
 
 export async function createUser(email, password, name, role, phone) {
   const passwordHash = await hashPassword(password)
-  const userId = `user_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
+  const userId = newId()
   
   const { data, error } = await supabase
     .from('users')
@@ -24,17 +59,18 @@ export async function createUser(email, password, name, role, phone) {
       phone,
       created_at: new Date().toISOString()
     }])
-    .select()
+    .select(USER_COLUMNS)
     .single()
   
   if (error) throw error
   return data
 }
 
+// Includes password_hash, for verifyPassword and upgradePasswordHash
 export async function findUserByEmail(email) {
   const { data, error } = await supabase
     .from('users')
-    .select('*')
+    .select(LOGIN_COLUMNS)
     .eq('email', email)
     .single()
   
@@ -43,12 +79,36 @@ export async function findUserByEmail(email) {
 }
 
 export async function findUserById(id) {
+  const cached = userCache.get(id)
+  if (cached) return cached
+  
   const { data, error } = await supabase
     .from('users')
-    .select('*')
+    .select(USER_COLUMNS)
     .eq('id', id)
     .single()
   
   if (error && error.code !== 'PGRST116') throw error
+  if (data) userCache.set(id, data)
+  return data
+}
+
+export async function findDoctorProfile(userId) {
+  const cached = profileCache.get(userId)
+  if (cached) return cached
+  
+  const { data, error } = await supabase
+    .from('doctor_profiles')
+    .select(PROFILE_COLUMNS)
+    .eq('user_id', userId)
+    .single()
+  
+  if (error && error.code !== 'PGRST116') throw error
+  if (data) profileCache.set(userId, data)
   return data
 }
+
+export function invalidateUser(id) {
+  userCache.delete(id)
+  profileCache.delete(id)
+}
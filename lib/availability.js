@@ -0,0 +1,49 @@
+import { supabase } from './supabase'
+import { getDoctorDirectory, listDoctors } from './directory'
+import { dateWindow, fetchPage } from './pagination'
+import { wallClock } from './clock'
+
+export const AVAILABILITY_KEYS = [['date', 'asc'], ['start_time', 'asc'], ['id', 'asc']]
+// doctor is the compact directory entry, attached after the query
+export const AVAILABILITY_FIELDS = ['id', 'doctor_id', 'date', 'start_time', 'end_time', 'duration', 'doctor']
+
+// Earliest open slots across all doctors (or one specialization) inside the
+// requested window. Walks idx_time_slots_open, the partial index on
+// (date, start_time, id) WHERE is_available, so the first page is read
+// straight off the front of the index however many past slots exist.
+export async function findOpenSlots({ specialization, cursor, limit, searchParams, fields = AVAILABILITY_FIELDS }) {
+  const directory = await getDoctorDirectory()
+  const withDoctor = fields.includes('doctor')
+  const columns = fields.filter(field => field !== 'doctor')
+  // The doctor lookup needs doctor_id even when it was not asked for
+  const select = withDoctor && !columns.includes('doctor_id') ? [...columns, 'doctor_id'] : columns
+
+  let query = supabase
+    .from('time_slots')
+    .select(select.join(', '))
+    .eq('is_available', true)
+
+  if (specialization) {
+    const doctorIds = listDoctors(directory, { view: 'compact', specialization }).map(d => d.id)
+    if (doctorIds.length === 0) return { items: [], nextCursor: null }
+    query = query.in('doctor_id', doctorIds)
+  }
+
+  // start_time is the doctor's wall-clock time, so "today" and "now" are
+  // taken in the clinic's zone (lib/clock.js), not UTC
+  const { date: today, time: now } = wallClock()
+  query = dateWindow(query.gte('date', today), 'date', searchParams)
+  // Skip slots that already started today. Later pages start after a cursor
+  // taken from this filtered first page, so they need no extra condition.
+  if (!cursor) query = query.or(`date.gt.${today},start_time.gte."${now}"`)
+
+  const page = await fetchPage(query, { keys: AVAILABILITY_KEYS, cursor, limit })
+  if (withDoctor) {
+    page.items = page.items.map(slot => {
+      const item = { ...slot, doctor: directory.compact.byId.get(slot.doctor_id) || null }
+      if (!columns.includes('doctor_id')) delete item.doctor_id
+      return item
+    })
+  }
+  return page
+}
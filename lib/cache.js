@@ -0,0 +1,40 @@
+// Small in-process LRU with a per-entry TTL. A Map iterates in insertion
+// order, so re-inserting on read keeps the least recently used key first.
+export function createLruCache({ max = 1000, ttlMs = 60 * 1000 } = {}) {
+  const entries = new Map()
+
+  return {
+    get(key) {
+      const entry = entries.get(key)
+      if (!entry) return undefined
+      if (entry.expiresAt <= Date.now()) {
+        entries.delete(key)
+        return undefined
+      }
+      entries.delete(key)
+      entries.set(key, entry)
+      return entry.value
+    },
+
+    set(key, value) {
+      entries.delete(key)
+      entries.set(key, { value, expiresAt: Date.now() + ttlMs })
+      if (entries.size > max) {
+        entries.delete(entries.keys().next().value)
+      }
+      return value
+    },
+
+    delete(key) {
+      entries.delete(key)
+    },
+
+    clear() {
+      entries.clear()
+    },
+
+    get size() {
+      return entries.size
+    }
+  }
+}
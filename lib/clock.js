@@ -0,0 +1,26 @@
+// Slot and appointment dates and times are wall-clock values in the clinic's
+// zone, not UTC. APP_TIMEZONE sets it; REMINDER_TIMEZONE is still honoured
+// as it was the only setting before.
+export const TIMEZONE = process.env.APP_TIMEZONE || process.env.REMINDER_TIMEZONE || 'UTC'
+
+const formatter = new Intl.DateTimeFormat('en-CA', {
+  timeZone: TIMEZONE,
+  year: 'numeric',
+  month: '2-digit',
+  day: '2-digit',
+  hour: '2-digit',
+  minute: '2-digit',
+  hourCycle: 'h23'
+})
+
+// { date: 'YYYY-MM-DD', time: 'HH:MM' } for an instant in the clinic's zone
+export function wallClock(at = new Date()) {
+  const parts = Object.fromEntries(formatter.formatToParts(at).map(({ type, value }) => [type, value]))
+  return { date: `${parts.year}-${parts.month}-${parts.day}`, time: `${parts.hour}:${parts.minute}` }
+}
+
+// The clinic's calendar date `days` after today
+export function localDate(days = 0) {
+  const [year, month, day] = wallClock().date.split('-').map(Number)
+  return new Date(Date.UTC(year, month - 1, day + days)).toISOString().split('T')[0]
+}
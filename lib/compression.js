@@ -0,0 +1,53 @@
+import { promisify } from 'util'
+import { brotliCompress, gzip, constants } from 'zlib'
+
+// Compresses JSON API responses for clients that accept it, preferring
+// brotli over gzip. Responses that are already encoded, streamed (SSE) or
+// smaller than COMPRESS_MIN_BYTES are passed through untouched; Next's own
+// compression skips anything that already has a Content-Encoding.
+const MIN_BYTES = parseInt(process.env.COMPRESS_MIN_BYTES || '1024', 10)
+// Quality 4 is close to gzip's speed with noticeably smaller output; the
+// slow high levels are meant for static assets compressed once
+const BROTLI_QUALITY = parseInt(process.env.COMPRESS_BROTLI_QUALITY || '4', 10)
+
+const brotli = promisify(brotliCompress)
+const gzipAsync = promisify(gzip)
+
+// The best encoding the client accepts (q=0 means refused), or null
+export function chooseEncoding(acceptEncoding) {
+  const accepted = new Set()
+  for (const part of (acceptEncoding || '').toLowerCase().split(',')) {
+    const [name, ...params] = part.trim().split(';')
+    const q = params.map(p => p.trim()).find(p => p.startsWith('q='))
+    if (name && !(q && parseFloat(q.slice(2)) === 0)) accepted.add(name)
+  }
+  if (accepted.has('br')) return 'br'
+  if (accepted.has('gzip') || accepted.has('*')) return 'gzip'
+  return null
+}
+
+export async function compressResponse(request, response) {
+  const type = response.headers.get('content-type') || ''
+  if (!response.body || !type.startsWith('application/json') || response.headers.has('content-encoding')) {
+    return response
+  }
+  response.headers.append('Vary', 'Accept-Encoding')
+  const encoding = chooseEncoding(request.headers.get('accept-encoding'))
+  if (!encoding) return response
+  // Read a copy, so small responses go out as they are (cookies and all)
+  const body = Buffer.from(await response.clone().arrayBuffer())
+  if (body.length < MIN_BYTES) return response
+
+  const compressed = encoding === 'br'
+    ? await brotli(body, {
+      params: {
+        [constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+        [constants.BROTLI_PARAM_SIZE_HINT]: body.length
+      }
+    })
+    : await gzipAsync(body)
+  const headers = new Headers(response.headers)
+  headers.set('Content-Encoding', encoding)
+  headers.set('Content-Length', String(compressed.length))
+  return new Response(compressed, { status: response.status, statusText: response.statusText, headers })
+}
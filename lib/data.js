@@ -0,0 +1,224 @@
+import { supabase } from './supabase'
+import { usePostgres, query } from './db'
+import { dateRange, dateWindow, decodeCursor, encodeCursor, fetchPage } from './pagination'
+
+// The hot API queries (slot and appointment listing, notifications, booking)
+// behind one interface, served by PostgREST or, with DATA_BACKEND=postgres,
+// by prepared statements on the pooled connection in lib/db.js. Both
+// backends return the same JSON: the SQL side builds its rows with json_agg,
+// as PostgREST does, so dates, times and timestamps keep their text form.
+
+// Keyset sort orders; id breaks ties so every row has a unique position
+export const SCHEDULE_KEYS = [['date', 'asc'], ['start_time', 'asc'], ['id', 'asc']]
+export const NEWEST_KEYS = [['created_at', 'desc'], ['id', 'desc']]
+
+// What each listing returns by default and what ?fields= may pick from.
+// Bookkeeping columns (updated_at, reminder leases) are left out; lib/sync.js
+// adds updated_at back for its cursor.
+export const TIME_SLOT_FIELDS = ['id', 'doctor_id', 'date', 'start_time', 'end_time', 'duration', 'is_available']
+export const APPOINTMENT_FIELDS = [
+  'id', 'doctor_id', 'patient_id', 'time_slot_id', 'date', 'start_time', 'end_time',
+  'status', 'notes', 'video_room_id', 'created_at', 'doctor', 'patient'
+]
+export const NOTIFICATION_FIELDS = ['id', 'message', 'type', 'read', 'created_at']
+
+// Embedded parties: just enough to show who the appointment is with
+const APPOINTMENT_EMBEDS = {
+  doctor: { column: 'doctor_id', alias: 'd' },
+  patient: { column: 'patient_id', alias: 'p' }
+}
+
+export const TIME_SLOT_COLUMNS = TIME_SLOT_FIELDS.join(', ')
+export const APPOINTMENT_COLUMNS = APPOINTMENT_FIELDS.filter(field => !APPOINTMENT_EMBEDS[field]).join(', ')
+export const NOTIFICATION_COLUMNS = NOTIFICATION_FIELDS.join(', ')
+
+// PostgREST select string for appointment fields, embeds included
+export function appointmentSelect(fields = APPOINTMENT_FIELDS) {
+  return fields
+    .map(field => APPOINTMENT_EMBEDS[field] ? `${field}:${APPOINTMENT_EMBEDS[field].column} (id, name)` : field)
+    .join(', ')
+}
+
+// Collects positional parameters while a statement is assembled
+function parameters() {
+  const values = []
+  return { values, add: value => `$${values.push(value)}` }
+}
+
+// SQL counterpart of fetchPage: one statement returning limit + 1 rows
+// after the cursor as a JSON array. The keys of one listing all sort the same
+// way, so the cursor condition is a single row comparison that the
+// idx_*_schedule and idx_notifications_user_created indexes can seek to.
+async function selectPage(label, { select, from, where, params, keys, alias = '', cursor, limit }) {
+  const conditions = [...where]
+  const columns = keys.map(([column]) => `${alias}${column}`).join(', ')
+  const descending = keys[0][1] === 'desc'
+  if (cursor) {
+    const values = decodeCursor(cursor, keys).map(params.add).join(', ')
+    conditions.push(`(${columns}) ${descending ? '<' : '>'} (${values})`)
+  }
+  const order = keys.map(([column, direction]) => `${alias}${column} ${direction.toUpperCase()}`).join(', ')
+  const text = `SELECT coalesce(json_agg(page), '[]') AS rows FROM (
+    SELECT ${select} FROM ${from}
+    ${conditions.length ? `WHERE ${conditions.join(' AND ')}` : ''}
+    ORDER BY ${order} LIMIT ${params.add(limit + 1)}
+  ) AS page`
+
+  const { rows: [{ rows }] } = await query(label, text, params.values)
+  const items = rows.slice(0, limit)
+  const nextCursor = rows.length > limit ? encodeCursor(items[items.length - 1], keys) : null
+  return { items, nextCursor }
+}
+
+// GET /api/time-slots: ?doctorId=&date=&available=true plus the date window
+export async function listTimeSlots({ doctorId, date, available, searchParams, cursor, limit, fields = TIME_SLOT_FIELDS }) {
+  if (!usePostgres) {
+    let q = supabase.from('time_slots').select(fields.join(', '))
+    if (doctorId) q = q.eq('doctor_id', doctorId)
+    if (date) q = q.eq('date', date)
+    if (available) q = q.eq('is_available', true)
+    q = dateWindow(q, 'date', searchParams)
+    return fetchPage(q, { keys: SCHEDULE_KEYS, cursor, limit })
+  }
+
+  const params = parameters()
+  const where = []
+  const { from: after, to: before } = dateRange(searchParams)
+  if (doctorId) where.push(`doctor_id = ${params.add(doctorId)}`)
+  if (date) where.push(`date = ${params.add(date)}`)
+  if (available) where.push('is_available')
+  if (after) where.push(`date >= ${params.add(after)}`)
+  if (before) where.push(`date <= ${params.add(before)}`)
+  return selectPage('list_time_slots', {
+    select: fields.join(', '), from: 'time_slots', where, params, keys: SCHEDULE_KEYS, cursor, limit
+  })
+}
+
+// GET /api/appointments: the caller's appointments with both parties embedded
+export async function listAppointments({ userId, role, searchParams, cursor, limit, fields = APPOINTMENT_FIELDS }) {
+  const column = role === 'doctor' ? 'doctor_id' : 'patient_id'
+  if (!usePostgres) {
+    let q = supabase.from('appointments').select(appointmentSelect(fields)).eq(column, userId)
+    q = dateWindow(q, 'date', searchParams)
+    return fetchPage(q, { keys: SCHEDULE_KEYS, cursor, limit })
+  }
+
+  const params = parameters()
+  const where = [`a.${column} = ${params.add(userId)}`]
+  const { from: after, to: before } = dateRange(searchParams)
+  if (after) where.push(`a.date >= ${params.add(after)}`)
+  if (before) where.push(`a.date <= ${params.add(before)}`)
+  const select = []
+  const joins = []
+  for (const field of fields) {
+    const embed = APPOINTMENT_EMBEDS[field]
+    if (!embed) {
+      select.push(`a.${field}`)
+      continue
+    }
+    select.push(`json_build_object('id', ${embed.alias}.id, 'name', ${embed.alias}.name) AS ${field}`)
+    joins.push(`JOIN users ${embed.alias} ON ${embed.alias}.id = a.${embed.column}`)
+  }
+  return selectPage('list_appointments', {
+    select: select.join(', '),
+    from: ['appointments a', ...joins].join(' '),
+    where,
+    params,
+    keys: SCHEDULE_KEYS,
+    alias: 'a.',
+    cursor,
+    limit
+  })
+}
+
+// GET /api/notifications, newest first
+export async function listNotifications({ userId, cursor, limit, fields = NOTIFICATION_FIELDS }) {
+  if (!usePostgres) {
+    const q = supabase.from('notifications').select(fields.join(', ')).eq('user_id', userId)
+    return fetchPage(q, { keys: NEWEST_KEYS, cursor, limit })
+  }
+
+  const params = parameters()
+  return selectPage('list_notifications', {
+    select: fields.join(', '),
+    from: 'notifications',
+    where: [`user_id = ${params.add(userId)}`],
+    params,
+    keys: NEWEST_KEYS,
+    cursor,
+    limit
+  })
+}
+
+export async function countUnreadNotifications(userId) {
+  if (!usePostgres) {
+    const { count, error } = await supabase
+      .from('notifications')
+      .select('id', { count: 'exact', head: true })
+      .eq('user_id', userId)
+      .eq('read', false)
+    if (error) throw error
+    return count || 0
+  }
+
+  const { rows } = await query(
+    'count_unread_notifications',
+    'SELECT count(*)::int AS count FROM notifications WHERE user_id = $1 AND read = false',
+    [userId]
+  )
+  return rows[0].count
+}
+
+// Mark the given notifications, or every unread one when ids is null, as
+// read in a single UPDATE; returns the ids that changed
+export async function markNotificationsRead(userId, ids = null) {
+  if (!usePostgres) {
+    let q = supabase
+      .from('notifications')
+      .update({ read: true })
+      .eq('user_id', userId)
+      .eq('read', false)
+    if (ids) q = q.in('id', ids)
+    const { data, error } = await q.select('id')
+    if (error) throw error
+    return (data || []).map(row => row.id)
+  }
+
+  const { rows } = ids
+    ? await query(
+      'mark_notifications_read',
+      'UPDATE notifications SET read = true WHERE user_id = $1 AND read = false AND id = ANY($2::uuid[]) RETURNING id',
+      [userId, ids]
+    )
+    : await query(
+      'mark_all_notifications_read',
+      'UPDATE notifications SET read = true WHERE user_id = $1 AND read = false RETURNING id',
+      [userId]
+    )
+  return rows.map(row => row.id)
+}
+
+// Claim the slot, create the appointment and both notifications in a single
+// transaction (see BOOKING_FUNCTION.sql). Errors carry the Postgres code
+// either way: P0002 slot not found, P0001 slot taken.
+export async function bookAppointment({ slotId, patientId, notes, appointmentId, videoRoomId, notificationIds }) {
+  if (!usePostgres) {
+    const { data, error } = await supabase.rpc('book_appointment', {
+      p_slot_id: slotId,
+      p_patient_id: patientId,
+      p_notes: notes,
+      p_appointment_id: appointmentId,
+      p_video_room_id: videoRoomId,
+      p_notification_ids: notificationIds
+    })
+    if (error) throw error
+    return data
+  }
+
+  const { rows } = await query(
+    'book_appointment',
+    'SELECT book_appointment($1::uuid, $2::uuid, $3::text, $4::uuid, $5::text, $6::uuid[]) AS booking',
+    [slotId, patientId, notes, appointmentId, videoRoomId, notificationIds]
+  )
+  return rows[0].booking
+}
@@ -0,0 +1,70 @@
+import { createHash } from 'crypto'
+import pg from 'pg'
+
+// Direct Postgres access for the hot API queries (see lib/data.js), used
+// instead of PostgREST when DATA_BACKEND=postgres. Each query is one call on
+// a pooled, already-open connection rather than an HTTPS round-trip, and runs
+// as a named prepared statement, so it is parsed and planned once per
+// connection. Server-only: never import this from a component.
+//
+// DATABASE_URL must be a direct or session-mode pooler connection (Supabase
+// port 5432); transaction-mode poolers do not keep prepared statements
+// between transactions. The connecting role bypasses RLS, so every statement
+// scopes itself to the signed-in user, as the PostgREST queries do.
+export const usePostgres = process.env.DATA_BACKEND === 'postgres'
+
+const POOL_SIZE = parseInt(process.env.DATABASE_POOL_SIZE || '10', 10)
+const STATEMENT_TIMEOUT_MS = parseInt(process.env.DATABASE_STATEMENT_TIMEOUT_MS || '10000', 10)
+
+let pool = null
+// lib/metrics.js times every statement, as it does PostgREST requests
+let recordStatement = null
+
+export function setStatementRecorder(recorder) {
+  recordStatement = recorder
+}
+
+function getPool() {
+  if (!pool) {
+    if (!process.env.DATABASE_URL) {
+      throw new Error('DATA_BACKEND=postgres needs DATABASE_URL')
+    }
+    pool = new pg.Pool({
+      connectionString: process.env.DATABASE_URL,
+      max: POOL_SIZE,
+      idleTimeoutMillis: 30000,
+      statement_timeout: STATEMENT_TIMEOUT_MS,
+      application_name: 'medmeet-api'
+    })
+    // An idle client losing its connection must not crash the process; the
+    // pool drops it and opens a new one on demand
+    pool.on('error', error => console.error('Postgres pool error:', error))
+  }
+  return pool
+}
+
+// Statement names are derived from the SQL text, so each distinct query
+// shape (e.g. a list with or without a cursor) gets its own prepared plan
+const statementNames = new Map()
+
+function statementName(label, text) {
+  let name = statementNames.get(text)
+  if (!name) {
+    name = `${label}_${createHash('sha1').update(text).digest('hex').slice(0, 12)}`
+    statementNames.set(text, name)
+  }
+  return name
+}
+
+// Run `text` as a prepared statement; `label` names it in metrics
+export async function query(label, text, values = []) {
+  const started = performance.now()
+  let ok = false
+  try {
+    const result = await getPool().query({ name: statementName(label, text), text, values })
+    ok = true
+    return result
+  } finally {
+    recordStatement?.(label, performance.now() - started, ok)
+  }
+}
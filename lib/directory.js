@@ -0,0 +1,107 @@
+import { supabase } from './supabase'
+
+// The doctor directory is read on every patient dashboard load but changes
+// only when a doctor registers or edits their profile. It is built once into
+// process memory, rebuilt on invalidateDoctorDirectory() and otherwise every
+// DOCTOR_DIRECTORY_TTL_MS so other instances pick up changes too.
+const DIRECTORY_TTL_MS = parseInt(process.env.DOCTOR_DIRECTORY_TTL_MS || '60000', 10)
+
+export const DIRECTORY_KEYS = [['name', 'asc'], ['id', 'asc']]
+
+const DOCTOR_SELECT = `
+  id,
+  name,
+  email,
+  phone,
+  updated_at,
+  doctor_profiles (
+    specialization,
+    bio,
+    experience,
+    updated_at
+  )
+`
+
+let directory = null
+let building = null
+let generation = 0
+
+const byNameThenId = (a, b) =>
+  a.name < b.name ? -1 : a.name > b.name ? 1 : a.id < b.id ? -1 : a.id > b.id ? 1 : 0
+
+// List projection: enough to render a doctor card, without bio or contact details
+const compact = doctor => ({
+  id: doctor.id,
+  name: doctor.name,
+  doctor_profiles: (doctor.doctor_profiles || []).map(({ specialization, experience }) => ({ specialization, experience }))
+})
+
+function group(doctors) {
+  const groups = new Map()
+  for (const doctor of doctors) {
+    const specialization = (doctor.doctor_profiles?.[0]?.specialization || '').trim().toLowerCase()
+    if (!groups.has(specialization)) groups.set(specialization, [])
+    groups.get(specialization).push(doctor)
+  }
+  return groups
+}
+
+async function build() {
+  // Anything committed after this instant may be missing from the snapshot
+  const builtAt = new Date().toISOString()
+  const { data, error } = await supabase.from('users').select(DOCTOR_SELECT).eq('role', 'doctor')
+  if (error) throw error
+
+  const doctors = (data || []).sort(byNameThenId)
+  const compactDoctors = doctors.map(compact)
+  return {
+    builtAt,
+    expiresAt: Date.now() + DIRECTORY_TTL_MS,
+    full: { all: doctors, bySpecialization: group(doctors) },
+    compact: {
+      all: compactDoctors,
+      bySpecialization: group(compactDoctors),
+      byId: new Map(compactDoctors.map(d => [d.id, d]))
+    }
+  }
+}
+
+function rebuild() {
+  const started = generation
+  const promise = build()
+    .then(result => {
+      if (started === generation) directory = result
+      return result
+    })
+    .finally(() => {
+      if (building === promise) building = null
+    })
+  building = promise
+  return promise
+}
+
+// Current snapshot. An expired snapshot is still served while a rebuild runs
+// in the background; only the very first call (or one after an invalidation)
+// waits for the database.
+export async function getDoctorDirectory() {
+  if (directory && directory.expiresAt > Date.now()) return directory
+  const pending = building || rebuild()
+  if (directory) {
+    pending.catch(error => console.error('Doctor directory rebuild error:', error))
+    return directory
+  }
+  return pending
+}
+
+// Doctors in the requested projection, optionally for one specialization
+export function listDoctors(snapshot, { view = 'full', specialization } = {}) {
+  const projection = view === 'compact' ? snapshot.compact : snapshot.full
+  if (!specialization) return projection.all
+  return projection.bySpecialization.get(specialization.trim().toLowerCase()) || []
+}
+
+export function invalidateDoctorDirectory() {
+  generation++
+  directory = null
+  building = null
+}
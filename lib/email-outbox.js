@@ -0,0 +1,105 @@
+import { supabaseAdmin } from './supabase-admin'
+import { newId } from './ids'
+import { sendEmail } from './email'
+
+const BATCH_SIZE = parseInt(process.env.EMAIL_BATCH_SIZE || '20', 10)
+const POLL_INTERVAL_MS = parseInt(process.env.EMAIL_POLL_INTERVAL_MS || '5000', 10)
+const MAX_ATTEMPTS = parseInt(process.env.EMAIL_MAX_ATTEMPTS || '6', 10)
+const BACKOFF_BASE_MS = 30 * 1000
+const LEASE_SECONDS = 120
+
+// Queue emails for the worker instead of sending them inline
+export async function enqueueEmails(emails) {
+  if (!emails.length) return { success: true }
+  try {
+    const { error } = await supabaseAdmin().from('email_outbox').insert(emails.map(({ to, subject, html }) => ({
+      id: newId(),
+      to_address: to,
+      subject,
+      html
+    })))
+    if (error) throw error
+    return { success: true }
+  } catch (error) {
+    console.error('Email enqueue error:', error)
+    return { success: false, error: error.message }
+  }
+}
+
+export async function enqueueEmail(email) {
+  return enqueueEmails([email])
+}
+
+// Exponential backoff with jitter: 30s, 1m, 2m, 4m, ... capped at 1h
+function nextAttemptAt(attempts) {
+  const delay = Math.min(BACKOFF_BASE_MS * 2 ** (attempts - 1), 60 * 60 * 1000)
+  return new Date(Date.now() + delay * (0.8 + Math.random() * 0.4)).toISOString()
+}
+
+// Claim one batch of due jobs, send them over the pooled transport and record the outcome
+export async function drainEmailOutbox(limit = BATCH_SIZE) {
+  const { data: jobs, error } = await supabaseAdmin().rpc('claim_email_jobs', {
+    p_limit: limit,
+    p_lease_seconds: LEASE_SECONDS
+  })
+  if (error) throw error
+  if (!jobs || jobs.length === 0) return { claimed: 0, sent: 0, failed: 0 }
+
+  const results = await Promise.all(jobs.map(job => sendEmail({
+    to: job.to_address,
+    subject: job.subject,
+    html: job.html
+  })))
+
+  const outcomes = jobs.map((job, i) => ({ job, result: results[i] }))
+  const sentIds = outcomes.filter(({ result }) => result.success).map(({ job }) => job.id)
+  const failed = outcomes.filter(({ result }) => !result.success)
+
+  if (sentIds.length > 0) {
+    await supabaseAdmin()
+      .from('email_outbox')
+      .update({ status: 'sent', sent_at: new Date().toISOString(), locked_until: null, last_error: null })
+      .in('id', sentIds)
+  }
+
+  // Each failure gets its own backoff; jobs out of attempts are parked as dead letters
+  await Promise.all(failed.map(({ job, result }) => {
+    const dead = job.attempts >= MAX_ATTEMPTS
+    return supabaseAdmin()
+      .from('email_outbox')
+      .update({
+        status: dead ? 'dead' : 'pending',
+        last_error: result.error,
+        locked_until: null,
+        ...(dead ? {} : { next_attempt_at: nextAttemptAt(job.attempts) })
+      })
+      .eq('id', job.id)
+  }))
+
+  return { claimed: jobs.length, sent: sentIds.length, failed: failed.length }
+}
+
+let workerTimer = null
+
+// Background loop started from instrumentation.js; keeps draining while batches come back full
+export function startEmailWorker() {
+  if (workerTimer) return
+
+  const tick = async () => {
+    let delay = POLL_INTERVAL_MS
+    try {
+      const { claimed } = await drainEmailOutbox()
+      if (claimed === BATCH_SIZE) delay = 0
+    } catch (error) {
+      console.error('Email worker error:', error)
+    }
+    workerTimer = setTimeout(tick, delay)
+  }
+
+  workerTimer = setTimeout(tick, 0)
+}
+
+export function stopEmailWorker() {
+  clearTimeout(workerTimer)
+  workerTimer = null
+}
@@ -1,7 +1,12 @@
 import nodemailer from 'nodemailer'
+import { timeCall } from './metrics'
 
+// Pooled SMTP connections are reused across sends by the outbox worker
 const transporter = nodemailer.createTransport({
   service: 'gmail',
+  pool: true,
+  maxConnections: 3,
+  maxMessages: 100,
   auth: {
     user: process.env.EMAIL_USER,
     pass: process.env.EMAIL_PASS
@@ -9,18 +14,20 @@ const transporter = nodemailer.createTransport({
 })
 
 export async function sendEmail({ to, subject, html }) {
-  try {
-    const info = await transporter.sendMail({
-      from: `"Video Appointments" <${process.env.EMAIL_USER}>`,
-      to,
-      subject,
-      html
-    })
-    return { success: true, messageId: info.messageId }
-  } catch (error) {
-    console.error('Email error:', error)
-    return { success: false, error: error.message }
-  }
+  return timeCall('email_send_duration_ms', {}, async () => {
+    try {
+      const info = await transporter.sendMail({
+        from: `"Video Appointments" <${process.env.EMAIL_USER}>`,
+        to,
+        subject,
+        html
+      })
+      return { success: true, messageId: info.messageId }
+    } catch (error) {
+      console.error('Email error:', error)
+      return { success: false, error: error.message }
+    }
+  })
 }
 
 export function getAppointmentConfirmationEmail(appointment, doctor, patient) {
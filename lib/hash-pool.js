@@ -0,0 +1,114 @@
+import os from 'os'
+import { Worker } from 'worker_threads'
+import bcrypt from 'bcryptjs'
+
+// bcrypt runs in worker threads so a burst of logins cannot stall the event
+// loop. HASH_POOL_SIZE=0 hashes inline instead (used as the benchmark baseline).
+const POOL_SIZE = parseInt(process.env.HASH_POOL_SIZE || String(Math.max(1, Math.min(4, os.cpus().length - 1))), 10)
+const MAX_QUEUE = parseInt(process.env.HASH_QUEUE_LIMIT || '200', 10)
+
+// Evaluated in each worker; bcryptjs is kept external in next.config.js so
+// this require resolves from node_modules at runtime
+const WORKER_SOURCE = `
+const { parentPort } = require('worker_threads')
+const bcrypt = require('bcryptjs')
+parentPort.on('message', ({ id, op, password, hash, cost }) => {
+  try {
+    const result = op === 'hash' ? bcrypt.hashSync(password, cost) : bcrypt.compareSync(password, hash)
+    parentPort.postMessage({ id, result })
+  } catch (error) {
+    parentPort.postMessage({ id, error: error.message })
+  }
+})
+`
+
+export class HashPoolBusyError extends Error {}
+
+const idle = []
+const queue = []
+const jobs = new Map()
+let workerCount = 0
+let nextJobId = 0
+
+function spawnWorker() {
+  const worker = new Worker(WORKER_SOURCE, { eval: true })
+  worker.currentJob = null
+  workerCount++
+
+  worker.on('message', ({ id, result, error }) => {
+    const job = jobs.get(id)
+    jobs.delete(id)
+    worker.currentJob = null
+    if (error) job.reject(new Error(error))
+    else job.resolve(result)
+    release(worker)
+  })
+
+  // A crashed worker fails its current job and is replaced on demand
+  const fail = error => {
+    const job = jobs.get(worker.currentJob)
+    if (!job) return
+    jobs.delete(worker.currentJob)
+    worker.currentJob = null
+    job.reject(error)
+  }
+  worker.on('error', fail)
+  worker.on('exit', code => {
+    fail(new Error(`Hash worker exited with code ${code}`))
+    workerCount--
+    const index = idle.indexOf(worker)
+    if (index !== -1) idle.splice(index, 1)
+    if (queue.length > 0 && idle.length === 0) dispatch()
+  })
+
+  return worker
+}
+
+// Busy workers keep the process alive; idle ones do not
+function run(worker, job) {
+  worker.ref()
+  worker.currentJob = job.id
+  jobs.set(job.id, job)
+  worker.postMessage(job.message)
+}
+
+function release(worker) {
+  const job = queue.shift()
+  if (job) {
+    run(worker, job)
+  } else {
+    worker.unref()
+    idle.push(worker)
+  }
+}
+
+function dispatch() {
+  const worker = idle.pop() || (workerCount < POOL_SIZE ? spawnWorker() : null)
+  if (worker) run(worker, queue.shift())
+}
+
+function submit(message) {
+  if (POOL_SIZE <= 0) {
+    return message.op === 'hash'
+      ? bcrypt.hash(message.password, message.cost)
+      : bcrypt.compare(message.password, message.hash)
+  }
+  // Back-pressure: beyond this many waiting jobs, callers get a 503 instead of
+  // an ever-growing queue and unbounded login latency
+  if (queue.length >= MAX_QUEUE) {
+    return Promise.reject(new HashPoolBusyError('Too many login attempts in progress, please retry'))
+  }
+  return new Promise((resolve, reject) => {
+    const id = ++nextJobId
+    queue.push({ id, resolve, reject, message: { id, ...message } })
+    dispatch()
+  })
+}
+
+export function hashInPool(password, cost) {
+  return submit({ op: 'hash', password, cost })
+}
+
+export function compareInPool(password, hash) {
+  return submit({ op: 'compare', password, hash })
+}
@@ -0,0 +1,45 @@
+import { randomFillSync } from 'crypto'
+
+// Primary keys are UUIDv7 (RFC 9562): a 48-bit millisecond timestamp, a
+// 12-bit counter and 62 random bits. New rows land at the right-hand edge of
+// the primary-key B-tree instead of on random pages, and the value fits a
+// 16-byte uuid column (see COMPACT_IDS.sql).
+//
+// Ids are strictly increasing within this process: the counter is seeded
+// randomly each millisecond and incremented for every further id in the same
+// millisecond; if it overflows, or the clock steps back, the timestamp is
+// carried forward instead.
+const bytes = new Uint8Array(16)
+let lastMs = 0
+let counter = 0
+
+export function newId() {
+  const now = Date.now()
+  if (now > lastMs) {
+    lastMs = now
+    randomFillSync(bytes, 0, 2)
+    // Leave headroom so a burst within one millisecond rarely overflows
+    counter = ((bytes[0] << 8) | bytes[1]) & 0x7ff
+  } else if (++counter > 0xfff) {
+    lastMs++
+    counter = 0
+  }
+
+  randomFillSync(bytes, 8, 8)
+  let ms = lastMs
+  for (let i = 5; i >= 0; i--) {
+    bytes[i] = ms % 256
+    ms = Math.floor(ms / 256)
+  }
+  bytes[6] = 0x70 | (counter >> 8)
+  bytes[7] = counter & 0xff
+  bytes[8] = 0x80 | (bytes[8] & 0x3f)
+
+  const hex = Buffer.from(bytes).toString('hex')
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`
+}
+
+// Milliseconds since the epoch encoded in a UUIDv7
+export function idTimestamp(id) {
+  return parseInt(id.replace(/-/g, '').slice(0, 12), 16)
+}
@@ -0,0 +1,143 @@
+import { AsyncLocalStorage } from 'async_hooks'
+import { setQueryRecorder } from './supabase'
+import { setStatementRecorder } from './db'
+
+// Prometheus-style counters and histograms held in process memory and served
+// by GET /api/metrics. The registry hangs off globalThis because Next bundles
+// instrumentation.js (the email worker) apart from the API route, and both
+// must report into the same place.
+const registry = globalThis.__medmeetMetrics || (globalThis.__medmeetMetrics = { counters: new Map(), histograms: new Map() })
+
+export const LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+const QUERY_COUNT_BUCKETS = [0, 1, 2, 3, 5, 8, 13, 21]
+
+// Per-request tally of database round-trips, for Server-Timing
+const currentRequest = new AsyncLocalStorage()
+
+const seriesKey = (name, labels) => `${name}${JSON.stringify(labels)}`
+
+export function increment(name, labels = {}, value = 1) {
+  const key = seriesKey(name, labels)
+  const series = registry.counters.get(key)
+  if (series) series.value += value
+  else registry.counters.set(key, { name, labels, value })
+}
+
+export function observe(name, labels, value, buckets = LATENCY_BUCKETS_MS) {
+  const key = seriesKey(name, labels)
+  let series = registry.histograms.get(key)
+  if (!series) {
+    series = { name, labels, buckets, counts: new Array(buckets.length).fill(0), sum: 0, count: 0 }
+    registry.histograms.set(key, series)
+  }
+  const index = buckets.findIndex(le => value <= le)
+  if (index !== -1) series.counts[index]++
+  series.sum += value
+  series.count++
+}
+
+// Supabase talks to PostgREST over fetch, so every query, insert and RPC is
+// one timed round-trip labelled by table or function name
+function recordQuery(input, init, ms, ok) {
+  const path = new URL(typeof input === 'string' ? input : input.url).pathname
+  const target = path.replace(/^\/rest\/v1\//, '') || path
+  const method = init?.method || 'GET'
+  recordDatabaseCall(target, method, ms, ok)
+}
+
+// Prepared statements on the direct connection (lib/db.js), labelled by
+// statement and counted in the same series as PostgREST round-trips
+function recordStatement(name, ms, ok) {
+  recordDatabaseCall(name, 'SQL', ms, ok)
+}
+
+function recordDatabaseCall(target, method, ms, ok) {
+  observe('db_request_duration_ms', { target, method }, ms)
+  if (!ok) increment('db_request_errors_total', { target, method })
+
+  const tally = currentRequest.getStore()
+  if (tally) {
+    tally.queries++
+    tally.dbMs += ms
+  }
+}
+
+setQueryRecorder(recordQuery)
+setStatementRecorder(recordStatement)
+
+// Routes tag the in-flight request with their pattern, which keeps the label
+// set small (no ids in it)
+export function labelRequest(route) {
+  const tally = currentRequest.getStore()
+  if (tally) tally.route = route
+}
+
+// Wraps one API request: counts it, records its latency and database
+// round-trips, and adds a Server-Timing header to the response
+export async function measureRequest(method, handler) {
+  const tally = { route: 'unmatched', queries: 0, dbMs: 0 }
+  const started = performance.now()
+  const response = await currentRequest.run(tally, handler)
+  const totalMs = performance.now() - started
+
+  const labels = { method, route: tally.route }
+  increment('http_requests_total', { ...labels, status: String(response.status) })
+  observe('http_request_duration_ms', labels, totalMs)
+  observe('db_requests_per_request', labels, tally.queries, QUERY_COUNT_BUCKETS)
+
+  response.headers.set('Server-Timing', [
+    `db;dur=${tally.dbMs.toFixed(1)};desc="${tally.queries} queries"`,
+    `app;dur=${Math.max(0, totalMs - tally.dbMs).toFixed(1)}`,
+    `total;dur=${totalMs.toFixed(1)}`
+  ].join(', '))
+  return response
+}
+
+// Times an async call into a histogram; `outcome` labels success or failure
+export async function timeCall(name, labels, fn) {
+  const started = performance.now()
+  let outcome = 'error'
+  try {
+    const result = await fn()
+    outcome = result?.success === false ? 'error' : 'ok'
+    return result
+  } finally {
+    observe(name, { ...labels, outcome }, performance.now() - started)
+  }
+}
+
+const formatLabels = labels => {
+  const pairs = Object.entries(labels).map(([k, v]) => `${k}="${String(v).replace(/\\/g, '\\\\').replace(/"/g, '\\"')}"`)
+  return pairs.length ? `{${pairs.join(',')}}` : ''
+}
+
+// Series of one metric must be contiguous in the output; the sort is stable
+const byName = series => [...series.values()].sort((a, b) => (a.name < b.name ? -1 : a.name > b.name ? 1 : 0))
+
+// Prometheus text exposition format (version 0.0.4)
+export function renderMetrics() {
+  const lines = []
+  const typed = new Set()
+  const header = (name, type) => {
+    if (typed.has(name)) return
+    typed.add(name)
+    lines.push(`# TYPE ${name} ${type}`)
+  }
+
+  for (const { name, labels, value } of byName(registry.counters)) {
+    header(name, 'counter')
+    lines.push(`${name}${formatLabels(labels)} ${value}`)
+  }
+  for (const { name, labels, buckets, counts, sum, count } of byName(registry.histograms)) {
+    header(name, 'histogram')
+    let cumulative = 0
+    buckets.forEach((le, i) => {
+      cumulative += counts[i]
+      lines.push(`${name}_bucket${formatLabels({ ...labels, le: String(le) })} ${cumulative}`)
+    })
+    lines.push(`${name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${count}`)
+    lines.push(`${name}_sum${formatLabels(labels)} ${Number(sum.toFixed(3))}`)
+    lines.push(`${name}_count${formatLabels(labels)} ${count}`)
+  }
+  return lines.join('\n') + '\n'
+}
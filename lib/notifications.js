@@ -0,0 +1,90 @@
+import { supabase } from './supabase'
+import { newId } from './ids'
+import { createLruCache } from './cache'
+import { NOTIFICATION_COLUMNS, countUnreadNotifications, markNotificationsRead } from './data'
+
+// Notifications are pushed to the recipient's open streams as they are
+// created, and the unread count is kept in memory instead of being derived
+// from the full list on every dashboard load. Counts are adjusted in place on
+// create and mark-read, and reloaded (one COUNT on the partial index
+// idx_notifications_unread) when missing or older than
+// NOTIFICATION_UNREAD_TTL_MS, which bounds drift from writes made by other
+// instances. Streams live in this Node process only, as with lib/signaling.js.
+const UNREAD_TTL_MS = parseInt(process.env.NOTIFICATION_UNREAD_TTL_MS || '60000', 10)
+
+export const MAX_MARK_READ = 500
+
+const unreadCounts = createLruCache({ max: 10000, ttlMs: UNREAD_TTL_MS })
+const listeners = new Map()
+
+function emit(userId, event) {
+  const userListeners = listeners.get(userId)
+  if (!userListeners) return
+  for (const listener of userListeners) listener(event)
+}
+
+export async function unreadCount(userId) {
+  const cached = unreadCounts.get(userId)
+  if (cached !== undefined) return cached
+
+  return unreadCounts.set(userId, await countUnreadNotifications(userId))
+}
+
+function adjustUnread(userId, delta) {
+  const cached = unreadCounts.get(userId)
+  if (cached !== undefined) unreadCounts.set(userId, Math.max(0, cached + delta))
+}
+
+// Rows that were just inserted (by the API or the booking RPC): count them
+// as unread and push each one, with the new count, to its recipient
+export async function notificationsCreated(rows) {
+  for (const row of rows) {
+    if (!row.read) adjustUnread(row.user_id, 1)
+  }
+  for (const row of rows) {
+    if (listeners.has(row.user_id)) {
+      emit(row.user_id, { type: 'notification', notification: row, unread: await unreadCount(row.user_id) })
+    }
+  }
+}
+
+export async function createNotification({ userId, message, type }) {
+  const { data, error } = await supabase
+    .from('notifications')
+    .insert({
+      id: newId(),
+      user_id: userId,
+      message,
+      type,
+      created_at: new Date().toISOString()
+    })
+    // user_id routes the push; it is not part of the list shape
+    .select(`${NOTIFICATION_COLUMNS}, user_id`)
+    .single()
+  if (error) throw error
+
+  await notificationsCreated([data])
+  return data
+}
+
+// Mark the given notifications, or every unread one when ids is null, as
+// read in a single UPDATE. Returns the ids that changed and the new count.
+export async function markRead(userId, ids = null) {
+  const updated = await markNotificationsRead(userId, ids)
+  if (ids) adjustUnread(userId, -updated.length)
+  else unreadCounts.set(userId, 0)
+
+  const unread = await unreadCount(userId)
+  if (updated.length > 0) emit(userId, { type: 'read', ids: updated, unread })
+  return { updated, unread }
+}
+
+export function subscribe(userId, listener) {
+  if (!listeners.has(userId)) listeners.set(userId, new Set())
+  listeners.get(userId).add(listener)
+  return () => {
+    const userListeners = listeners.get(userId)
+    userListeners.delete(listener)
+    if (userListeners.size === 0) listeners.delete(userId)
+  }
+}
@@ -0,0 +1,126 @@
+import { localDate } from './clock'
+
+export const DEFAULT_PAGE_SIZE = 50
+export const MAX_PAGE_SIZE = 200
+// ?days= beyond this is clamped rather than turned into a far-future date
+export const MAX_WINDOW_DAYS = 366
+
+const DATE_RE = /^\d{4}-\d{2}-\d{2}$/
+
+export class PaginationError extends Error {}
+
+// Page size from ?limit=, clamped to the server-side cap
+export function pageSize(searchParams) {
+  const limit = parseInt(searchParams.get('limit') || DEFAULT_PAGE_SIZE, 10)
+  if (Number.isNaN(limit) || limit < 1) return DEFAULT_PAGE_SIZE
+  return Math.min(limit, MAX_PAGE_SIZE)
+}
+
+// Columns for ?fields=a,b,c on list endpoints: a subset of `allowed`, in
+// `allowed` order, always including the sort keys cursors are built from
+export function listFields(searchParams, allowed, keys) {
+  const requested = searchParams.get('fields')
+  if (!requested) return allowed
+  const names = requested.split(',').map(name => name.trim()).filter(Boolean)
+  const unknown = names.filter(name => !allowed.includes(name))
+  if (unknown.length > 0) throw new PaginationError(`Unknown fields: ${unknown.join(', ')}`)
+  const keep = new Set([...names, ...keys.map(([column]) => column)])
+  return allowed.filter(name => keep.has(name))
+}
+
+// Cursors are the sort-key values of the last row, opaque to clients
+export function encodeCursor(row, keys) {
+  return Buffer.from(JSON.stringify(keys.map(([column]) => row[column]))).toString('base64url')
+}
+
+export function decodeCursor(cursor, keys) {
+  try {
+    const values = JSON.parse(Buffer.from(cursor, 'base64url').toString())
+    if (Array.isArray(values) && values.length === keys.length) return values
+  } catch {}
+  throw new PaginationError('Invalid cursor')
+}
+
+function compareToCursor(row, keys, values) {
+  for (let i = 0; i < keys.length; i++) {
+    const [column, direction] = keys[i]
+    if (row[column] === values[i]) continue
+    const after = row[column] > values[i]
+    return (direction === 'desc' ? !after : after) ? 1 : -1
+  }
+  return 0
+}
+
+const quote = value => `"${String(value).replace(/"/g, '\\"')}"`
+
+// Restrict `query` to rows strictly after the cursor in (k1, k2, ...) order:
+// k1 > v1 OR (k1 = v1 AND k2 > v2) OR ... using each key's own direction
+export function afterCursor(query, cursor, keys) {
+  if (!cursor) return query
+  const values = decodeCursor(cursor, keys)
+  const branches = keys.map(([column, direction], i) => {
+    const equal = keys.slice(0, i).map(([prev], j) => `${prev}.eq.${quote(values[j])}`)
+    const beyond = `${column}.${direction === 'desc' ? 'lt' : 'gt'}.${quote(values[i])}`
+    return equal.length ? `and(${[...equal, beyond].join(',')})` : beyond
+  })
+  return query.or(branches.join(','))
+}
+
+export function orderByKeys(query, keys) {
+  return keys.reduce((q, [column, direction]) => q.order(column, { ascending: direction !== 'desc' }), query)
+}
+
+// A YYYY-MM-DD query value that is a real calendar date, so a typo is a 400
+// instead of a date cast error from Postgres
+export function parseDate(value, name) {
+  const ms = DATE_RE.test(value) ? Date.parse(`${value}T00:00:00Z`) : NaN
+  if (Number.isNaN(ms) || new Date(ms).toISOString().slice(0, 10) !== value) {
+    throw new PaginationError(`${name} must be a YYYY-MM-DD date`)
+  }
+  return value
+}
+
+// Date window from ?from=YYYY-MM-DD&to=YYYY-MM-DD or ?days=N (today .. today+N,
+// in the clinic's zone)
+export function dateRange(searchParams) {
+  let from = searchParams.get('from')
+  let to = searchParams.get('to')
+  if (from) parseDate(from, 'from')
+  if (to) parseDate(to, 'to')
+  const days = parseInt(searchParams.get('days') || '', 10)
+  if (!Number.isNaN(days) && days > 0) {
+    from = from || localDate()
+    to = to || localDate(Math.min(days, MAX_WINDOW_DAYS))
+  }
+  return { from, to }
+}
+
+export function dateWindow(query, column, searchParams) {
+  const { from, to } = dateRange(searchParams)
+  if (from) query = query.gte(column, from)
+  if (to) query = query.lte(column, to)
+  return query
+}
+
+// Apply cursor, ordering and limit+1, then split off the page and next cursor
+export async function fetchPage(query, { keys, cursor, limit }) {
+  const { data, error } = await orderByKeys(afterCursor(query, cursor, keys), keys).limit(limit + 1)
+  if (error) throw error
+  const rows = data || []
+  const items = rows.slice(0, limit)
+  const nextCursor = rows.length > limit ? encodeCursor(items[items.length - 1], keys) : null
+  return { items, nextCursor }
+}
+
+// Same contract as fetchPage for rows already held in memory, sorted by `keys`
+export function pageRows(rows, { keys, cursor, limit }) {
+  let start = 0
+  if (cursor) {
+    const values = decodeCursor(cursor, keys)
+    start = rows.findIndex(row => compareToCursor(row, keys, values) > 0)
+    if (start === -1) start = rows.length
+  }
+  const items = rows.slice(start, start + limit)
+  const nextCursor = start + limit < rows.length ? encodeCursor(items[items.length - 1], keys) : null
+  return { items, nextCursor }
+}
@@ -0,0 +1,169 @@
+import { supabase } from './supabase'
+
+// Waiting-room presence held in memory, keyed by video room id. Members are
+// kept alive by heartbeats (an open presence stream beats on its own) and
+// joins and leaves are pushed to the other participant straight away. The
+// room_participants table is only a write-behind copy: changes are coalesced
+// and flushed every PRESENCE_FLUSH_MS, so a heartbeat never costs a query.
+// As with lib/signaling.js, the registry lives in this Node process only.
+const HEARTBEAT_TIMEOUT_MS = parseInt(process.env.PRESENCE_TIMEOUT_MS || '30000', 10)
+const FLUSH_INTERVAL_MS = parseInt(process.env.PRESENCE_FLUSH_MS || '10000', 10)
+const SWEEP_INTERVAL_MS = 5000
+// A dropped stream leaves the room this long after, unless it reconnects
+const DISCONNECT_GRACE_MS = 5000
+
+export const HEARTBEAT_INTERVAL_MS = 15000
+
+const rooms = new Map()
+// Pending writes: `${roomId}\n${userId}` -> 'upsert' | 'delete'
+const dirty = new Map()
+let sweeper = null
+let flusher = null
+
+const dirtyKey = (roomId, userId) => `${roomId}\n${userId}`
+
+const publicView = ({ userId, name, role, joinedAt }) => ({ userId, name, role, joinedAt })
+
+function getRoom(roomId) {
+  let room = rooms.get(roomId)
+  if (!room) {
+    room = { members: new Map(), listeners: new Map() }
+    rooms.set(roomId, room)
+    startTimers()
+  }
+  return room
+}
+
+function emit(room, exceptUserId, event) {
+  for (const [userId, userListeners] of room.listeners) {
+    if (userId === exceptUserId) continue
+    for (const listener of userListeners) listener(event)
+  }
+}
+
+// Everyone in the room except `userId`
+export function participants(roomId, userId) {
+  const room = rooms.get(roomId)
+  if (!room) return []
+  return [...room.members.values()].filter(m => m.userId !== userId).map(publicView)
+}
+
+// Join or refresh membership. Joining is a single in-memory step, so two
+// people arriving together both see each other instead of racing on a
+// select-then-insert.
+export function heartbeat(roomId, { userId, name, role }) {
+  const room = getRoom(roomId)
+  const now = Date.now()
+  let member = room.members.get(userId)
+  if (!member) {
+    member = { userId, name, role, joinedAt: new Date(now).toISOString(), lastSeen: now }
+    room.members.set(userId, member)
+    emit(room, userId, { type: 'join', participant: publicView(member) })
+  }
+  member.lastSeen = now
+  dirty.set(dirtyKey(roomId, userId), 'upsert')
+  return participants(roomId, userId)
+}
+
+export function leave(roomId, userId) {
+  const room = rooms.get(roomId)
+  if (!room || !room.members.delete(userId)) return
+  emit(room, userId, { type: 'leave', userId })
+  dirty.set(dirtyKey(roomId, userId), 'delete')
+  if (room.members.size === 0 && room.listeners.size === 0) rooms.delete(roomId)
+}
+
+// Receive join/leave events for the other participants
+export function subscribe(roomId, userId, listener) {
+  const room = getRoom(roomId)
+  if (!room.listeners.has(userId)) room.listeners.set(userId, new Set())
+  room.listeners.get(userId).add(listener)
+  return () => {
+    const userListeners = room.listeners.get(userId)
+    userListeners.delete(listener)
+    if (userListeners.size === 0) room.listeners.delete(userId)
+  }
+}
+
+// The member's last stream closed: expire them after a short grace period
+// rather than at once, so an EventSource reconnect does not flap leave/join
+export function disconnect(roomId, userId) {
+  const room = rooms.get(roomId)
+  const member = room?.members.get(userId)
+  if (!member || room.listeners.has(userId)) return
+  member.lastSeen = Math.min(member.lastSeen, Date.now() - HEARTBEAT_TIMEOUT_MS + DISCONNECT_GRACE_MS)
+}
+
+// Members whose heartbeats stopped (closed tab, lost network) are dropped
+function sweep() {
+  const cutoff = Date.now() - HEARTBEAT_TIMEOUT_MS
+  for (const [roomId, room] of rooms) {
+    for (const member of [...room.members.values()]) {
+      if (member.lastSeen < cutoff) leave(roomId, member.userId)
+    }
+    if (room.members.size === 0 && room.listeners.size === 0) rooms.delete(roomId)
+  }
+}
+
+// Write every change since the last flush: one upsert for all live members,
+// one delete per room for the ones that left
+export async function flushPresence() {
+  if (dirty.size === 0) return { upserted: 0, deleted: 0 }
+  const pending = [...dirty]
+  dirty.clear()
+
+  const upserts = []
+  const deletes = new Map()
+  for (const [key, action] of pending) {
+    const [roomId, userId] = key.split('\n')
+    const member = rooms.get(roomId)?.members.get(userId)
+    if (action === 'upsert' && member) {
+      upserts.push({
+        id: `${roomId}_${userId}`,
+        room_id: roomId,
+        user_id: userId,
+        user_name: member.name,
+        joined_at: member.joinedAt,
+        last_seen: new Date(member.lastSeen).toISOString()
+      })
+    } else if (action === 'delete') {
+      if (!deletes.has(roomId)) deletes.set(roomId, [])
+      deletes.get(roomId).push(userId)
+    }
+  }
+
+  try {
+    if (upserts.length > 0) {
+      const { error } = await supabase.from('room_participants').upsert(upserts, { onConflict: 'room_id,user_id' })
+      if (error) throw error
+    }
+    for (const [roomId, userIds] of deletes) {
+      const { error } = await supabase.from('room_participants').delete().eq('room_id', roomId).in('user_id', userIds)
+      if (error) throw error
+    }
+  } catch (error) {
+    // Keep the writes for the next flush unless something newer replaced them
+    for (const [key, action] of pending) {
+      if (!dirty.has(key)) dirty.set(key, action)
+    }
+    throw error
+  }
+  return { upserted: upserts.length, deleted: [...deletes.values()].reduce((n, ids) => n + ids.length, 0) }
+}
+
+function startTimers() {
+  if (sweeper) return
+  sweeper = setInterval(sweep, SWEEP_INTERVAL_MS)
+  flusher = setInterval(() => {
+    if (rooms.size === 0 && dirty.size === 0) {
+      clearInterval(sweeper)
+      clearInterval(flusher)
+      sweeper = null
+      flusher = null
+      return
+    }
+    flushPresence().catch(error => console.error('Presence flush error:', error))
+  }, FLUSH_INTERVAL_MS)
+  sweeper.unref?.()
+  flusher.unref?.()
+}
@@ -0,0 +1,67 @@
+import { supabaseAdmin } from './supabase-admin'
+import { getAppointmentReminderEmail } from './email'
+import { enqueueEmails } from './email-outbox'
+import { TIMEZONE } from './clock'
+
+const LEAD_MINUTES = parseInt(process.env.REMINDER_LEAD_MINUTES || '15', 10)
+const BATCH_SIZE = parseInt(process.env.REMINDER_BATCH_SIZE || '50', 10)
+const POLL_INTERVAL_MS = parseInt(process.env.REMINDER_POLL_INTERVAL_MS || '30000', 10)
+const LEASE_SECONDS = 120
+
+// Claim one batch of appointments starting soon (see APPOINTMENT_REMINDERS.sql),
+// queue a reminder to both participants and mark them reminded. If queueing
+// fails the claims are left to expire, so the next tick retries them. Runs
+// with the service role: claiming is closed to the anon key.
+export async function sendDueReminders(limit = BATCH_SIZE) {
+  const { data: appointments, error } = await supabaseAdmin().rpc('claim_appointment_reminders', {
+    p_lead_minutes: LEAD_MINUTES,
+    p_limit: limit,
+    p_lease_seconds: LEASE_SECONDS,
+    p_timezone: TIMEZONE
+  })
+  if (error) throw error
+  if (!appointments || appointments.length === 0) return { claimed: 0, queued: 0 }
+
+  const emails = appointments.flatMap(appointment => {
+    const { doctor, patient } = appointment
+    return [['doctor', doctor], ['patient', patient]]
+      .filter(([, person]) => person?.email)
+      .map(([role, person]) => ({ to: person.email, ...getAppointmentReminderEmail(appointment, doctor, patient, role) }))
+  })
+
+  const queued = await enqueueEmails(emails)
+  if (!queued.success) throw new Error(`Reminder enqueue failed: ${queued.error}`)
+
+  const { error: markError } = await supabaseAdmin()
+    .from('appointments')
+    .update({ reminder_sent_at: new Date().toISOString(), reminder_claimed_until: null })
+    .in('id', appointments.map(appointment => appointment.id))
+  if (markError) throw markError
+
+  return { claimed: appointments.length, queued: emails.length }
+}
+
+let workerTimer = null
+
+// Background loop started from instrumentation.js; keeps claiming while batches come back full
+export function startReminderWorker() {
+  if (workerTimer) return
+
+  const tick = async () => {
+    let delay = POLL_INTERVAL_MS
+    try {
+      const { claimed } = await sendDueReminders()
+      if (claimed === BATCH_SIZE) delay = 0
+    } catch (error) {
+      console.error('Reminder worker error:', error)
+    }
+    workerTimer = setTimeout(tick, delay)
+  }
+
+  workerTimer = setTimeout(tick, 0)
+}
+
+export function stopReminderWorker() {
+  clearTimeout(workerTimer)
+  workerTimer = null
+}
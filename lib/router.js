@@ -0,0 +1,104 @@
+import { NextResponse } from 'next/server'
+import { labelRequest } from './metrics'
+
+// Precompiled API router. Routes are registered once at module load into a
+// segment trie per HTTP method, so dispatch walks one node per path segment
+// instead of testing every route in turn. Static segments take precedence
+// over :params, which are URL-decoded into context.params.
+//
+// Per-route options:
+//   auth: true  the session is verified once and a 401 returned without one
+//   json: true  the request body is parsed into context.body first
+// Handlers are called as handler(request, { url, params, auth, body }). The
+// matched pattern labels the request's metrics (lib/metrics.js).
+
+const newNode = () => ({ children: new Map(), param: null, route: null })
+
+const segmentsOf = path => path.split('/').filter(Boolean)
+
+function decode(segment) {
+  try {
+    return decodeURIComponent(segment)
+  } catch {
+    return segment
+  }
+}
+
+function match(node, segments, index, params) {
+  if (index === segments.length) return node.route
+
+  const child = node.children.get(segments[index])
+  if (child) {
+    const route = match(child, segments, index + 1, params)
+    if (route) return route
+  }
+  if (node.param) {
+    const route = match(node.param.node, segments, index + 1, params)
+    if (route) {
+      params[node.param.name] = decode(segments[index])
+      return route
+    }
+  }
+  return null
+}
+
+export function createRouter({ authenticate }) {
+  const trees = new Map()
+
+  function add(method, pattern, options, handler) {
+    if (typeof options === 'function') {
+      handler = options
+      options = {}
+    }
+    if (!trees.has(method)) trees.set(method, newNode())
+
+    let node = trees.get(method)
+    for (const segment of segmentsOf(pattern)) {
+      if (segment.startsWith(':')) {
+        const name = segment.slice(1)
+        if (node.param && node.param.name !== name) {
+          throw new Error(`Conflicting parameter :${name} in ${method} ${pattern}`)
+        }
+        node.param = node.param || { name, node: newNode() }
+        node = node.param.node
+      } else {
+        if (!node.children.has(segment)) node.children.set(segment, newNode())
+        node = node.children.get(segment)
+      }
+    }
+
+    if (node.route) throw new Error(`Duplicate route ${method} ${pattern}`)
+    node.route = { pattern, handler, auth: Boolean(options.auth), json: Boolean(options.json) }
+  }
+
+  // Response from the matching route, or null when none matches
+  async function handle(method, request) {
+    const tree = trees.get(method)
+    if (!tree) return null
+
+    const url = new URL(request.url)
+    const params = {}
+    const route = match(tree, segmentsOf(url.pathname), 0, params)
+    if (!route) return null
+    labelRequest(route.pattern)
+
+    const context = { url, params, auth: null, body: undefined }
+    if (route.auth) {
+      context.auth = authenticate(request)
+      if (!context.auth) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+      }
+    }
+    if (route.json) context.body = await request.json()
+
+    return route.handler(request, context)
+  }
+
+  return {
+    get: (...args) => add('GET', ...args),
+    post: (...args) => add('POST', ...args),
+    patch: (...args) => add('PATCH', ...args),
+    delete: (...args) => add('DELETE', ...args),
+    handle
+  }
+}
@@ -0,0 +1,53 @@
+import crypto from 'crypto'
+
+export const SESSION_COOKIE = 'session'
+export const SESSION_MAX_AGE = 60 * 60 * 24 * 7
+
+let secret = process.env.SESSION_SECRET
+if (!secret) {
+  // Without a configured secret, sessions only survive until the process restarts
+  console.warn('SESSION_SECRET is not set; using a random per-process secret')
+  secret = crypto.randomBytes(32).toString('hex')
+}
+
+function sign(payload) {
+  return crypto.createHmac('sha256', secret).update(payload).digest('base64url')
+}
+
+// Signed token carrying the user id and role, so most requests never need to
+// look the user up just to authorize them
+export function createSessionToken(user) {
+  const payload = Buffer.from(JSON.stringify({
+    sub: user.id,
+    role: user.role,
+    exp: Math.floor(Date.now() / 1000) + SESSION_MAX_AGE
+  })).toString('base64url')
+  return `${payload}.${sign(payload)}`
+}
+
+export function verifySessionToken(token) {
+  if (!token || !token.includes('.')) return null
+
+  const [payload, signature] = token.split('.')
+  const expected = Buffer.from(sign(payload))
+  const actual = Buffer.from(signature || '')
+  if (actual.length !== expected.length || !crypto.timingSafeEqual(actual, expected)) return null
+
+  try {
+    const { sub, role, exp } = JSON.parse(Buffer.from(payload, 'base64url').toString())
+    if (!sub || exp < Date.now() / 1000) return null
+    return { userId: sub, role }
+  } catch {
+    return null
+  }
+}
+
+export function setSessionCookie(response, user) {
+  response.cookies.set(SESSION_COOKIE, createSessionToken(user), {
+    httpOnly: true,
+    maxAge: SESSION_MAX_AGE,
+    sameSite: 'lax',
+    path: '/'
+  })
+  return response
+}
@@ -0,0 +1,112 @@
+import { supabase } from './supabase'
+
+// In-memory signaling rooms keyed by video room id. Offers, answers and ICE
+// candidates are pushed straight to the other participant's open stream and
+// never touch the database. Rooms live in this Node process only; running
+// several instances needs sticky sessions or a pub/sub behind publish().
+const ROOM_IDLE_MS = 10 * 60 * 1000
+const MAX_BUFFERED = 500
+const SWEEP_INTERVAL_MS = 60 * 1000
+
+const rooms = new Map()
+let sweeper = null
+
+const otherRole = role => (role === 'doctor' ? 'patient' : 'doctor')
+
+function getRoom(roomId) {
+  let room = rooms.get(roomId)
+  if (!room) {
+    room = {
+      seq: 0,
+      members: new Map(),
+      buffers: { doctor: [], patient: [] },
+      listeners: { doctor: new Set(), patient: new Set() },
+      touchedAt: Date.now()
+    }
+    rooms.set(roomId, room)
+    startSweeper()
+  }
+  room.touchedAt = Date.now()
+  return room
+}
+
+// Drop rooms nobody is connected to and nobody has written to for a while
+function startSweeper() {
+  if (sweeper) return
+  sweeper = setInterval(() => {
+    const cutoff = Date.now() - ROOM_IDLE_MS
+    for (const [roomId, room] of rooms) {
+      const connected = room.listeners.doctor.size + room.listeners.patient.size
+      if (connected === 0 && room.touchedAt < cutoff) rooms.delete(roomId)
+    }
+    if (rooms.size === 0) {
+      clearInterval(sweeper)
+      sweeper = null
+    }
+  }, SWEEP_INTERVAL_MS)
+  sweeper.unref?.()
+}
+
+// 'doctor' or 'patient' if the user belongs to the appointment behind this
+// room, otherwise null. Looked up once per user and room, then kept in memory.
+// The room itself is only created once someone is known to belong to it, so
+// made-up room ids cost a query but never allocate state.
+export async function roomRole(roomId, userId) {
+  const room = rooms.get(roomId)
+  if (room?.members.has(userId)) {
+    room.touchedAt = Date.now()
+    return room.members.get(userId)
+  }
+
+  const { data, error } = await supabase
+    .from('appointments')
+    .select('doctor_id, patient_id')
+    .eq('video_room_id', roomId)
+    .limit(1)
+  if (error) throw error
+
+  const appointment = data?.[0]
+  const role = !appointment ? null
+    : appointment.doctor_id === userId ? 'doctor'
+      : appointment.patient_id === userId ? 'patient' : null
+  if (role) getRoom(roomId).members.set(userId, role)
+  return role
+}
+
+// Queue messages for the other participant and push them to any open stream.
+// Each message gets a per-room sequence number that doubles as the ack cursor.
+export function publish(roomId, from, messages) {
+  const room = getRoom(roomId)
+  const to = otherRole(from)
+  const events = messages.map(({ type, data }) => ({ seq: ++room.seq, type, data }))
+
+  const buffer = room.buffers[to]
+  buffer.push(...events)
+  if (buffer.length > MAX_BUFFERED) buffer.splice(0, buffer.length - MAX_BUFFERED)
+
+  for (const listener of room.listeners[to]) listener(events)
+  return room.seq
+}
+
+// Messages for `role` after `cursor`, for reconnects and non-streaming clients
+export function pending(roomId, role, cursor = 0) {
+  return getRoom(roomId).buffers[role].filter(event => event.seq > cursor)
+}
+
+// Everything up to and including `cursor` has been applied by the client
+export function acknowledge(roomId, role, cursor) {
+  const room = getRoom(roomId)
+  room.buffers[role] = room.buffers[role].filter(event => event.seq > cursor)
+}
+
+// Replay what is still unacknowledged after `cursor`, then stream new messages
+export function subscribe(roomId, role, cursor, listener) {
+  const room = getRoom(roomId)
+  const backlog = pending(roomId, role, cursor)
+  if (backlog.length > 0) listener(backlog)
+  room.listeners[role].add(listener)
+  return () => {
+    room.listeners[role].delete(listener)
+    room.touchedAt = Date.now()
+  }
+}
@@ -0,0 +1,60 @@
+export const MAX_RULE_DAYS = 92
+export const MAX_BULK_SLOTS = 1000
+
+const DATE_RE = /^\d{4}-\d{2}-\d{2}$/
+const TIME_RE = /^([01]\d|2[0-3]):[0-5]\d$/
+const DAY_MS = 24 * 60 * 60 * 1000
+
+export class SlotRuleError extends Error {}
+
+const toMinutes = time => parseInt(time.slice(0, 2), 10) * 60 + parseInt(time.slice(3, 5), 10)
+const toTime = minutes => `${String(Math.floor(minutes / 60)).padStart(2, '0')}:${String(minutes % 60).padStart(2, '0')}`
+
+function parseDate(value, name) {
+  const ms = DATE_RE.test(value || '') ? Date.parse(`${value}T00:00:00Z`) : NaN
+  if (Number.isNaN(ms)) throw new SlotRuleError(`${name} must be a YYYY-MM-DD date`)
+  return ms
+}
+
+// Expand a weekly recurrence rule into slot rows (without ids):
+// { startDate, endDate, weekdays: [0-6, Sunday = 0], startTime, endTime, duration, exclusions: [dates] }
+export function expandSlotRule(rule) {
+  if (!rule || typeof rule !== 'object' || Array.isArray(rule)) {
+    throw new SlotRuleError('Body must be a JSON object')
+  }
+  const { startDate, endDate, weekdays = [1, 2, 3, 4, 5], startTime, endTime, duration = 30, exclusions = [] } = rule
+  const first = parseDate(startDate, 'startDate')
+  const last = parseDate(endDate, 'endDate')
+  if (last < first) throw new SlotRuleError('endDate must not be before startDate')
+  if ((last - first) / DAY_MS + 1 > MAX_RULE_DAYS) {
+    throw new SlotRuleError(`Date range is limited to ${MAX_RULE_DAYS} days`)
+  }
+  if (!Array.isArray(weekdays) || weekdays.length === 0 || weekdays.some(d => !Number.isInteger(d) || d < 0 || d > 6)) {
+    throw new SlotRuleError('weekdays must be a non-empty list of 0-6 (Sunday = 0)')
+  }
+  if (!TIME_RE.test(startTime || '') || !TIME_RE.test(endTime || '')) {
+    throw new SlotRuleError('startTime and endTime must be HH:MM')
+  }
+  if (!Number.isInteger(duration) || duration < 5 || duration > 240) {
+    throw new SlotRuleError('duration must be between 5 and 240 minutes')
+  }
+  const open = toMinutes(startTime)
+  const close = toMinutes(endTime)
+  if (close - open < duration) throw new SlotRuleError('Working hours are shorter than one slot')
+
+  const days = new Set(weekdays)
+  const skipped = new Set(Array.isArray(exclusions) ? exclusions : [])
+  const slots = []
+  for (let ms = first; ms <= last; ms += DAY_MS) {
+    const day = new Date(ms)
+    const date = day.toISOString().split('T')[0]
+    if (!days.has(day.getUTCDay()) || skipped.has(date)) continue
+    for (let start = open; start + duration <= close; start += duration) {
+      slots.push({ date, start_time: toTime(start), end_time: toTime(start + duration), duration })
+    }
+    if (slots.length > MAX_BULK_SLOTS) {
+      throw new SlotRuleError(`A rule may create at most ${MAX_BULK_SLOTS} slots`)
+    }
+  }
+  return slots
+}
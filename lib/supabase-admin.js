@@ -0,0 +1,22 @@
+import { createClient } from '@supabase/supabase-js'
+import { timedFetch } from './supabase'
+
+// Service-role client for what the anon key cannot reach: email_outbox (see
+// EMAIL_OUTBOX.sql) and the reminder claims (APPOINTMENT_REMINDERS.sql). It
+// bypasses RLS, so it is server-only: never import this from a component.
+// Created on first use so routes that never queue mail do not need the key.
+let admin = null
+
+export function supabaseAdmin() {
+  if (!admin) {
+    const serviceRoleKey = process.env.SUPABASE_SERVICE_ROLE_KEY
+    if (!serviceRoleKey) {
+      throw new Error('SUPABASE_SERVICE_ROLE_KEY is required for the email outbox and reminders')
+    }
+    admin = createClient(process.env.NEXT_PUBLIC_SUPABASE_URL, serviceRoleKey, {
+      auth: { persistSession: false, autoRefreshToken: false },
+      global: { fetch: timedFetch }
+    })
+  }
+  return admin
+}
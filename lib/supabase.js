@@ -3,4 +3,27 @@ import { createClient } from '@supabase/supabase-js'
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL
 const supabaseAnonKey = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
 
-export const supabase = createClient(supabaseUrl, supabaseAnonKey)
+// Server code registers a recorder (lib/metrics.js) that times every
+// PostgREST round-trip; browser bundles never set one
+let recordQuery = null
+
+export function setQueryRecorder(recorder) {
+  recordQuery = recorder
+}
+
+export async function timedFetch(input, init) {
+  if (!recordQuery) return fetch(input, init)
+  const started = performance.now()
+  let ok = false
+  try {
+    const response = await fetch(input, init)
+    ok = response.ok
+    return response
+  } finally {
+    recordQuery(input, init, performance.now() - started, ok)
+  }
+}
+
+export const supabase = createClient(supabaseUrl, supabaseAnonKey, {
+  global: { fetch: timedFetch }
+})
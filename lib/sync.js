@@ -0,0 +1,149 @@
+import { supabase } from './supabase'
+import { getDoctorDirectory } from './directory'
+import { SCHEDULE_KEYS, NEWEST_KEYS, TIME_SLOT_COLUMNS, NOTIFICATION_COLUMNS, appointmentSelect } from './data'
+import { MAX_PAGE_SIZE, fetchPage } from './pagination'
+import { localDate } from './clock'
+
+// Rows committed in the last few seconds before the cursor are re-sent, so a
+// transaction that committed late with an older NOW() is never skipped.
+// Clients merge rows by id, so the overlap is harmless.
+const CURSOR_OVERLAP_MS = 5 * 1000
+const RETENTION_MS = parseInt(process.env.SYNC_RETENTION_DAYS || '30', 10) * 24 * 60 * 60 * 1000
+// Rows per list in one response. A full sync sends the first page of each
+// list and a cursor for the rest, which the client pages through with the
+// list endpoints; a delta with more changes than this becomes a full sync.
+const SYNC_LIMIT = MAX_PAGE_SIZE
+
+// The list endpoints' projections plus updated_at, which the cursor is taken from
+const APPOINTMENT_SELECT = `${appointmentSelect()}, updated_at`
+const NOTIFICATION_SELECT = `${NOTIFICATION_COLUMNS}, updated_at`
+const TIME_SLOT_SELECT = `${TIME_SLOT_COLUMNS}, updated_at`
+
+async function rows(query) {
+  const { data, error } = await query
+  if (error) throw error
+  return data || []
+}
+
+function latest(cursor, records, column) {
+  let max = cursor ? Date.parse(cursor) : 0
+  for (const record of records) {
+    const value = Date.parse(record[column])
+    if (value > max) max = value
+  }
+  return max ? new Date(max).toISOString() : null
+}
+
+// First page of each list: upcoming appointments and slots, newest
+// notifications. `more` holds the list endpoints' cursor for the next page.
+function fullQueries({ userId, role, own }) {
+  const today = localDate()
+  const queries = {
+    appointments: fetchPage(
+      supabase.from('appointments').select(APPOINTMENT_SELECT).eq(own, userId).gte('date', today),
+      { keys: SCHEDULE_KEYS, limit: SYNC_LIMIT }
+    ),
+    notifications: fetchPage(
+      supabase.from('notifications').select(NOTIFICATION_SELECT).eq('user_id', userId),
+      { keys: NEWEST_KEYS, limit: SYNC_LIMIT }
+    )
+  }
+  if (role === 'doctor') {
+    queries.timeSlots = fetchPage(
+      supabase.from('time_slots').select(TIME_SLOT_SELECT).eq('doctor_id', userId).gte('date', today),
+      { keys: SCHEDULE_KEYS, limit: SYNC_LIMIT }
+    )
+  }
+  return queries
+}
+
+// Rows changed after `after`, at most SYNC_LIMIT + 1 per list so an overflow
+// can be detected
+function deltaQueries({ userId, role, own, after }) {
+  const changed = query => rows(query.gt('updated_at', after).order('updated_at', { ascending: true }).limit(SYNC_LIMIT + 1))
+  const queries = {
+    appointments: changed(supabase.from('appointments').select(APPOINTMENT_SELECT).eq(own, userId)),
+    notifications: changed(supabase.from('notifications').select(NOTIFICATION_SELECT).eq('user_id', userId))
+  }
+  if (role === 'doctor') {
+    queries.timeSlots = changed(supabase.from('time_slots').select(TIME_SLOT_SELECT).eq('doctor_id', userId))
+    queries.deletedTimeSlots = rows(supabase
+      .from('sync_deletions')
+      .select('record_id, deleted_at')
+      .eq('table_name', 'time_slots')
+      .eq('scope_id', userId)
+      .gt('deleted_at', after)
+      .limit(SYNC_LIMIT + 1))
+  }
+  return queries
+}
+
+async function settle(queries) {
+  const names = Object.keys(queries)
+  const values = await Promise.all(names.map(name => queries[name]))
+  return Object.fromEntries(values.map((value, i) => [names[i], value]))
+}
+
+// What the dashboard shows for this user that changed after `since`.
+// Without a usable cursor, or when too much changed, the first page of
+// each list is returned with `full: true`.
+export async function loadDashboardChanges({ userId, role, since }) {
+  const sinceMs = since ? Date.parse(since) : NaN
+  let full = Number.isNaN(sinceMs) || Date.now() - sinceMs > RETENTION_MS
+  let after = full ? null : new Date(sinceMs - CURSOR_OVERLAP_MS).toISOString()
+  const own = role === 'doctor' ? 'doctor_id' : 'patient_id'
+  // A full sync covers everything committed before it started
+  const startedAt = new Date().toISOString()
+  const directoryLoad = role === 'doctor' ? null : getDoctorDirectory()
+
+  let results = null
+  let more = {}
+  if (!full) {
+    results = await settle(deltaQueries({ userId, role, own, after }))
+    if (Object.values(results).some(records => records.length > SYNC_LIMIT)) {
+      full = true
+      after = null
+    }
+  }
+  if (full) {
+    const pages = await settle(fullQueries({ userId, role, own }))
+    results = Object.fromEntries(Object.entries(pages).map(([name, page]) => [name, page.items]))
+    more = Object.fromEntries(Object.entries(pages).map(([name, page]) => [name, page.nextCursor]))
+  }
+  const directory = await directoryLoad
+
+  let cursor = full ? startedAt : since
+  if (!full) {
+    cursor = latest(cursor, results.appointments, 'updated_at')
+    cursor = latest(cursor, results.notifications, 'updated_at')
+    if (results.timeSlots) cursor = latest(cursor, results.timeSlots, 'updated_at')
+    if (results.deletedTimeSlots) cursor = latest(cursor, results.deletedTimeSlots, 'deleted_at')
+  }
+
+  if (directory) {
+    // Doctors come from the in-memory directory. A doctor changed if either
+    // the user row or the profile row moved; the cursor never passes the
+    // snapshot time, so changes newer than the snapshot are picked up once
+    // the directory is rebuilt.
+    const afterMs = after ? Date.parse(after) : -Infinity
+    const moved = record => Date.parse(record.updated_at) > afterMs
+    results.doctors = directory.full.all.filter(d => moved(d) || (d.doctor_profiles || []).some(moved))
+    if (Date.parse(cursor) > Date.parse(directory.builtAt)) cursor = directory.builtAt
+  }
+
+  const changes = {
+    full,
+    cursor,
+    appointments: results.appointments,
+    notifications: results.notifications,
+    deleted: {},
+    more
+  }
+  if (role === 'doctor') {
+    changes.timeSlots = results.timeSlots
+    changes.deleted.timeSlots = (results.deletedTimeSlots || []).map(d => d.record_id)
+  } else {
+    changes.doctors = results.doctors
+  }
+  return changes
+}
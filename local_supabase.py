@@ -0,0 +1,898 @@
+#!/usr/bin/env python3
+"""
+Local Supabase/PostgREST stand-in backed by SQLite
+
+Serves the users, doctor_profiles, time_slots, appointments, notifications,
+webrtc_signals and room_participants tables over the subset of the PostgREST
+protocol that supabase-js sends for the queries in route.js, lib/auth.js and
+the video call components: select with embeds, filters (eq/neq/gt/gte/lt/lte/
+like/ilike/is/in/not/or/and), order, limit/offset, single(), insert, upsert,
+update, delete and rpc.
+
+Usage:
+    python local_supabase.py --port 54321
+    NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=local SUPABASE_SERVICE_ROLE_KEY=local yarn dev
+    NEXT_PUBLIC_BASE_URL=http://localhost:3000 python backend_test.py
+
+Or in-process from Python:
+    with LocalSupabase() as db:
+        requests.get(f"{db.url}/rest/v1/users?select=*")
+
+POST /__reset empties every table and GET /__stats returns row and request
+counts so benchmarks can start from the same state on every run.
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from zoneinfo import ZoneInfo
+
+NOW = "(strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))"
+
+# SQLite translation of DATABASE_SCHEMA.sql, CREATE_SIGNALS_TABLE.sql (the
+# appointment_id/from_role/to_role webrtc_signals shape), room_participants from WEBRTC_SIGNALING.sql
+# and the feature tables from the other *.sql files
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS users (
+  id TEXT PRIMARY KEY,
+  email TEXT UNIQUE NOT NULL,
+  password_hash TEXT NOT NULL,
+  name TEXT NOT NULL,
+  role TEXT NOT NULL CHECK (role IN ('doctor', 'patient')),
+  phone TEXT,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS doctor_profiles (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+  specialization TEXT,
+  bio TEXT,
+  experience INTEGER,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS time_slots (
+  id TEXT PRIMARY KEY,
+  doctor_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  date DATE NOT NULL,
+  start_time TEXT NOT NULL,
+  end_time TEXT NOT NULL,
+  is_available BOOLEAN DEFAULT 1,
+  duration INTEGER DEFAULT 30,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS appointments (
+  id TEXT PRIMARY KEY,
+  doctor_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  patient_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  time_slot_id TEXT NOT NULL REFERENCES time_slots(id) ON DELETE CASCADE,
+  date DATE NOT NULL,
+  start_time TEXT NOT NULL,
+  end_time TEXT NOT NULL,
+  status TEXT DEFAULT 'scheduled' CHECK (status IN ('scheduled', 'completed', 'cancelled')),
+  notes TEXT,
+  video_room_id TEXT,
+  reminder_sent_at TIMESTAMPTZ,
+  reminder_claimed_until TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  message TEXT NOT NULL,
+  type TEXT DEFAULT 'info' CHECK (type IN ('info', 'success', 'warning', 'error')),
+  read BOOLEAN DEFAULT 0,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS webrtc_signals (
+  id TEXT PRIMARY KEY,
+  appointment_id TEXT NOT NULL,
+  from_role TEXT NOT NULL,
+  to_role TEXT NOT NULL,
+  signal_type TEXT NOT NULL,
+  signal_data JSONB NOT NULL,
+  created_at TIMESTAMP DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS room_participants (
+  id TEXT PRIMARY KEY,
+  room_id TEXT NOT NULL,
+  user_id TEXT NOT NULL,
+  user_name TEXT NOT NULL,
+  joined_at TIMESTAMPTZ DEFAULT {NOW},
+  last_seen TIMESTAMPTZ DEFAULT {NOW},
+  UNIQUE(room_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+  id TEXT PRIMARY KEY,
+  to_address TEXT NOT NULL,
+  subject TEXT NOT NULL,
+  html TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'dead')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT {NOW},
+  locked_until TIMESTAMPTZ,
+  sent_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT {NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+CREATE INDEX IF NOT EXISTS idx_time_slots_date ON time_slots(date);
+CREATE INDEX IF NOT EXISTS idx_time_slots_doctor_schedule ON time_slots(doctor_id, date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_time_slots_open ON time_slots(date, start_time, id) WHERE is_available;
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_schedule ON appointments(doctor_id, date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_appointments_patient_schedule ON appointments(patient_id, date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_appointments_reminder_due ON appointments(status, date, start_time) WHERE reminder_sent_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications(user_id) WHERE read = 0;
+CREATE INDEX IF NOT EXISTS idx_signals_appointment ON webrtc_signals(appointment_id);
+CREATE INDEX IF NOT EXISTS idx_room_participants_room ON room_participants(room_id);
+CREATE INDEX IF NOT EXISTS idx_room_participants_last_seen ON room_participants(last_seen);
+
+-- SYNC_SCHEMA.sql
+CREATE TABLE IF NOT EXISTS sync_deletions (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  table_name TEXT NOT NULL,
+  record_id TEXT NOT NULL,
+  scope_id TEXT NOT NULL,
+  deleted_at TIMESTAMPTZ DEFAULT {NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_sync_deletions_scope ON sync_deletions(scope_id, deleted_at);
+CREATE TRIGGER IF NOT EXISTS trg_users_updated_at AFTER UPDATE ON users
+  FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+  BEGIN UPDATE users SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+CREATE TRIGGER IF NOT EXISTS trg_doctor_profiles_updated_at AFTER UPDATE ON doctor_profiles
+  FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+  BEGIN UPDATE doctor_profiles SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+CREATE TRIGGER IF NOT EXISTS trg_time_slots_updated_at AFTER UPDATE ON time_slots
+  FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+  BEGIN UPDATE time_slots SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+CREATE TRIGGER IF NOT EXISTS trg_appointments_updated_at AFTER UPDATE ON appointments
+  FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+  BEGIN UPDATE appointments SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+CREATE TRIGGER IF NOT EXISTS trg_notifications_updated_at AFTER UPDATE ON notifications
+  FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+  BEGIN UPDATE notifications SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+CREATE TRIGGER IF NOT EXISTS trg_time_slots_deleted AFTER DELETE ON time_slots
+  FOR EACH ROW
+  BEGIN INSERT INTO sync_deletions (table_name, record_id, scope_id) VALUES ('time_slots', OLD.id, OLD.doctor_id); END;
+
+-- BOOKING_FUNCTION.sql
+CREATE UNIQUE INDEX IF NOT EXISTS idx_appointments_active_slot ON appointments(time_slot_id) WHERE status <> 'cancelled';
+"""
+
+# Database-side functions callable through POST /rest/v1/rpc/<name>
+RPC_FUNCTIONS = {}
+
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'columns', 'on_conflict'}
+OPERATORS = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+def rpc(name):
+    """Register a Python implementation of a Postgres function for /rpc/<name>"""
+    def decorator(fn):
+        RPC_FUNCTIONS[name] = fn
+        return fn
+    return decorator
+
+
+class PostgrestError(Exception):
+    """Error rendered in PostgREST's {code, message, details, hint} shape"""
+
+    def __init__(self, status, code, message, details=None, hint=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {'code': code, 'message': message, 'details': details, 'hint': hint}
+
+
+def split_top_level(text, sep=','):
+    """Split on `sep` outside of parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current or parts:
+        parts.append(''.join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def unquote(value):
+    """Strip PostgREST's optional double quotes (used for values containing , . : ( ))"""
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return value
+
+
+def parse_select(text):
+    """Parse a select string into plain columns and embedded resources"""
+    items = []
+    for part in split_top_level(re.sub(r'\s+', '', text or '*')):
+        if part.endswith(')') and '(' in part:
+            head, inner = part.split('(', 1)
+            alias, _, target = head.rpartition(':')
+            target, _, hint = target.partition('!')
+            inner_flag = hint == 'inner' or hint.endswith('!inner')
+            hint = '' if hint == 'inner' else hint.replace('!inner', '')
+            items.append({
+                'embed': True,
+                'alias': alias or target,
+                'target': target,
+                'hint': hint,
+                'inner': inner_flag,
+                'select': parse_select(inner[:-1]),
+            })
+        else:
+            alias, _, column = part.rpartition(':')
+            column = column.split('::', 1)[0]
+            items.append({'embed': False, 'alias': alias or column, 'column': column})
+    return items
+
+
+class LocalDatabase:
+    """SQLite-backed tables with the PostgREST read/write semantics route.js relies on"""
+
+    def __init__(self, path=':memory:'):
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.lock = threading.RLock()
+        self.requests = defaultdict(int)
+        self.conn.executescript(SCHEMA)
+        self.load_metadata()
+
+    def load_metadata(self):
+        self.columns, self.types, self.foreign_keys = {}, {}, {}
+        tables = [r['name'] for r in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        for table in tables:
+            info = self.conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+            self.columns[table] = [c['name'] for c in info]
+            self.types[table] = {c['name']: (c['type'] or '').upper() for c in info}
+            self.foreign_keys[table] = {
+                fk['from']: fk['table'] for fk in self.conn.execute(f'PRAGMA foreign_key_list("{table}")')
+            }
+
+    def reset(self):
+        """Delete every row, children first so foreign keys stay satisfied"""
+        with self.lock:
+            self.conn.execute('PRAGMA foreign_keys = OFF')
+            for table in self.columns:
+                self.conn.execute(f'DELETE FROM "{table}"')
+            self.conn.execute('PRAGMA foreign_keys = ON')
+            self.requests.clear()
+
+    def stats(self):
+        with self.lock:
+            rows = {t: self.conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in self.columns}
+            return {'rows': rows, 'requests': dict(self.requests)}
+
+    # -- value conversion -------------------------------------------------
+
+    def check_table(self, table):
+        if table not in self.columns:
+            raise PostgrestError(404, '42P01', f'relation "public.{table}" does not exist')
+
+    def check_column(self, table, column):
+        if column not in self.columns[table]:
+            raise PostgrestError(400, '42703', f'column {table}.{column} does not exist')
+
+    def to_db(self, table, column, value):
+        kind = self.types[table].get(column, '')
+        if kind.startswith('JSON'):
+            return None if value is None else json.dumps(value)
+        if kind == 'BOOLEAN' and isinstance(value, str):
+            return {'true': 1, 'false': 0}.get(value.lower(), value)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def from_db(self, table, row):
+        out = {}
+        for column in self.columns[table]:
+            value = row[column]
+            kind = self.types[table][column]
+            if value is not None and kind == 'BOOLEAN':
+                value = bool(value)
+            elif value is not None and kind.startswith('JSON'):
+                value = json.loads(value)
+            out[column] = value
+        return out
+
+    # -- filters ----------------------------------------------------------
+
+    def condition(self, table, column, expr):
+        """Translate `op.value` (optionally prefixed with not.) into SQL"""
+        negate = expr.startswith('not.')
+        if negate:
+            expr = expr[4:]
+        op, _, value = expr.partition('.')
+        self.check_column(table, column)
+        col = f'"{column}"'
+
+        if op in OPERATORS:
+            sql, args = f'{col} {OPERATORS[op]} ?', [self.to_db(table, column, unquote(value))]
+        elif op in ('like', 'ilike'):
+            pattern = value.replace('*', '%')
+            sql = f'{col} LIKE ?' if op == 'ilike' else f'{col} GLOB ?'
+            args = [pattern if op == 'ilike' else value]
+        elif op == 'is':
+            literal = {'null': 'NULL', 'true': '1', 'false': '0'}.get(value.lower())
+            if literal is None:
+                raise PostgrestError(400, 'PGRST100', f'failed to parse filter (is.{value})')
+            sql, args = (f'{col} IS NULL' if literal == 'NULL' else f'{col} = {literal}'), []
+        elif op == 'in':
+            values = [v.strip('"') for v in split_top_level(value.strip('()'))]
+            sql = f'{col} IN ({", ".join("?" for _ in values)})' if values else '0'
+            args = [self.to_db(table, column, v) for v in values]
+        else:
+            raise PostgrestError(400, 'PGRST100', f'failed to parse filter ({op}.{value})')
+
+        return (f'NOT ({sql})', args) if negate else (sql, args)
+
+    def logic(self, table, op, body):
+        """Translate or=(...)/and=(...) trees into SQL"""
+        parts, args = [], []
+        for item in split_top_level(body.strip()[1:-1]):
+            negate = item.startswith('not.')
+            if negate:
+                item = item[4:]
+            if item.startswith(('and(', 'or(')):
+                inner_op, _, inner = item.partition('(')
+                sql, inner_args = self.logic(table, inner_op, '(' + inner)
+            else:
+                column, _, expr = item.partition('.')
+                sql, inner_args = self.condition(table, column, expr)
+            parts.append(f'NOT ({sql})' if negate else sql)
+            args.extend(inner_args)
+        joiner = ' OR ' if op == 'or' else ' AND '
+        return '(' + joiner.join(parts or ['1']) + ')', args
+
+    def where(self, table, params):
+        """Build the WHERE clause for the top-level table, returning embedded filters separately"""
+        clauses, args, embedded = [], [], defaultdict(list)
+        for key, value in params:
+            if key in RESERVED_PARAMS:
+                continue
+            if key in ('or', 'and', 'not.or', 'not.and'):
+                sql, inner_args = self.logic(table, key.rsplit('.', 1)[-1], value)
+                clauses.append(f'NOT {sql}' if key.startswith('not.') else sql)
+                args.extend(inner_args)
+            elif '.' in key:
+                alias, _, column = key.partition('.')
+                embedded[alias].append((column, value))
+            else:
+                sql, inner_args = self.condition(table, key, value)
+                clauses.append(sql)
+                args.extend(inner_args)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), args, embedded
+
+    def order_by(self, table, order):
+        if not order:
+            return ''
+        terms = []
+        for term in order.split(','):
+            column, *modifiers = term.split('.')
+            self.check_column(table, column)
+            direction = 'DESC' if 'desc' in modifiers else 'ASC'
+            nulls = ' NULLS FIRST' if 'nullsfirst' in modifiers else ' NULLS LAST' if 'nullslast' in modifiers else ''
+            terms.append(f'"{column}" {direction}{nulls}')
+        return ' ORDER BY ' + ', '.join(terms)
+
+    # -- embedding --------------------------------------------------------
+
+    def relationship(self, table, embed):
+        """Resolve an embed to (target_table, local_column, remote_column, to_one)"""
+        target, hint = embed['target'], embed['hint']
+        fks = self.foreign_keys[table]
+        # alias:fk_column(...) or target!fk_column(...) - many-to-one through a local column
+        column = hint or (target if target in fks else None)
+        if column and column in fks:
+            return fks[column], column, 'id', True
+        self.check_table(target)
+        local = [c for c, ref in fks.items() if ref == target]
+        if len(local) == 1:
+            return target, local[0], 'id', True
+        remote = [c for c, ref in self.foreign_keys[target].items() if ref == table and (not hint or c == hint)]
+        if len(remote) == 1:
+            return target, 'id', remote[0], False
+        raise PostgrestError(300 if local or len(remote) > 1 else 400, 'PGRST201' if local or remote else 'PGRST200',
+                             f"Could not find a unique relationship between '{table}' and '{target}'")
+
+    def embed_rows(self, table, rows, embed, filters):
+        """Attach the embedded resource to each row under `__embed_<alias>`"""
+        target, local, remote, to_one = self.relationship(table, embed)
+        keys = sorted({r[local] for r in rows if r[local] is not None})
+        children = []
+        if keys:
+            sql = f'SELECT * FROM "{target}" WHERE "{remote}" IN ({", ".join("?" for _ in keys)})'
+            args = list(keys)
+            for column, expr in filters:
+                if column in RESERVED_PARAMS:
+                    continue
+                cond, cond_args = self.condition(target, column, expr)
+                sql += f' AND {cond}'
+                args.extend(cond_args)
+            children = [self.from_db(target, r) for r in self.conn.execute(sql, args)]
+            self.embed_all(target, children, embed['select'], {})
+
+        grouped = defaultdict(list)
+        for child in children:
+            grouped[child[remote]].append(self.project(target, child, embed['select']))
+        key = f'__embed_{embed["alias"]}'
+        for row in rows:
+            matched = grouped.get(row[local], [])
+            row[key] = (matched[0] if matched else None) if to_one else matched
+        if embed['inner']:
+            rows[:] = [r for r in rows if r[key]]
+
+    def embed_all(self, table, rows, select, embedded):
+        for item in select:
+            if item['embed']:
+                self.embed_rows(table, rows, item, embedded.get(item['alias'], []))
+
+    def project(self, table, row, select):
+        out = {}
+        for item in select:
+            if item['embed']:
+                out[item['alias']] = row.get(f'__embed_{item["alias"]}')
+            elif item['column'] == '*':
+                out.update({c: row[c] for c in self.columns[table]})
+            else:
+                self.check_column(table, item['column'])
+                out[item['alias']] = row[item['column']]
+        return out
+
+    # -- operations -------------------------------------------------------
+
+    def select(self, table, params, count=False, rowids=None):
+        self.check_table(table)
+        params = list(params)
+        opts = dict(params)
+        select = parse_select(opts.get('select', '*'))
+        where, args, embedded = self.where(table, params)
+        if rowids is not None:
+            keyed = f'rowid IN ({", ".join("?" for _ in rowids)})'
+            where = f'{where} AND {keyed}' if where else f' WHERE {keyed}'
+            args = args + list(rowids)
+        with self.lock:
+            total = self.conn.execute(f'SELECT COUNT(*) FROM "{table}"{where}', args).fetchone()[0] if count else None
+            sql = f'SELECT * FROM "{table}"{where}{self.order_by(table, opts.get("order"))}'
+            if 'limit' in opts or 'offset' in opts:
+                sql += f' LIMIT {int(opts.get("limit", -1))} OFFSET {int(opts.get("offset", 0))}'
+            rows = [self.from_db(table, r) for r in self.conn.execute(sql, args)]
+            self.embed_all(table, rows, select, embedded)
+        return [self.project(table, r, select) for r in rows], total
+
+    def insert(self, table, records, params, upsert=False, ignore=False):
+        self.check_table(table)
+        conflict = dict(params).get('on_conflict', 'id').split(',')
+        rowids = []
+        with self.lock, self.transaction():
+            for record in records:
+                columns = list(record)
+                for column in columns:
+                    self.check_column(table, column)
+                values = [self.to_db(table, c, record[c]) for c in columns]
+                quoted = ', '.join(f'"{c}"' for c in columns)
+                sql = f'INSERT INTO "{table}" ({quoted}) VALUES ({", ".join("?" for _ in columns)})'
+                if upsert or ignore:
+                    updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c not in conflict)
+                    action = f'DO UPDATE SET {updates}' if upsert and updates else 'DO NOTHING'
+                    sql += f' ON CONFLICT ({", ".join(conflict)}) {action}'
+                rowids.extend(r[0] for r in self.conn.execute(sql + ' RETURNING rowid', values))
+            return self.refetch(table, rowids, params)
+
+    def update(self, table, patch, params):
+        self.check_table(table)
+        where, args, _ = self.where(table, params)
+        with self.lock, self.transaction():
+            rowids = []
+            if patch:
+                for column in patch:
+                    self.check_column(table, column)
+                assignments = ', '.join(f'"{c}" = ?' for c in patch)
+                values = [self.to_db(table, c, v) for c, v in patch.items()]
+                sql = f'UPDATE "{table}" SET {assignments}{where} RETURNING rowid'
+                rowids = [r[0] for r in self.conn.execute(sql, values + args)]
+            return self.refetch(table, rowids, params)
+
+    def delete(self, table, params):
+        self.check_table(table)
+        select = parse_select(dict(params).get('select', '*'))
+        where, args, _ = self.where(table, params)
+        with self.lock, self.transaction():
+            rows = [self.from_db(table, r) for r in self.conn.execute(f'SELECT * FROM "{table}"{where}', args)]
+            self.conn.execute(f'DELETE FROM "{table}"{where}', args)
+        return [self.project(table, r, select) for r in rows]
+
+    def refetch(self, table, rowids, params):
+        """Re-read written rows so `.select()` after a write returns embeds too"""
+        if not rowids:
+            return []
+        select = [p for p in params if p[0] == 'select']
+        rows, _ = self.select(table, select, rowids=rowids)
+        return rows
+
+    def call(self, name, args):
+        fn = RPC_FUNCTIONS.get(name)
+        if not fn:
+            raise PostgrestError(404, 'PGRST202', f'Could not find the function public.{name} in the schema cache')
+        with self.lock, self.transaction():
+            return fn(self, **args)
+
+    def transaction(self):
+        return Transaction(self.conn)
+
+
+class Transaction:
+    """BEGIN IMMEDIATE/COMMIT around a write, nesting-safe for rpc functions"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.owner = False
+
+    def __enter__(self):
+        if not self.conn.in_transaction:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.owner = True
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.owner:
+            self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+@rpc('book_appointment')
+def book_appointment(db, p_slot_id, p_patient_id, p_notes, p_appointment_id, p_video_room_id, p_notification_ids):
+    """Mirror of book_appointment() in BOOKING_FUNCTION.sql"""
+    slot = db.conn.execute(
+        'UPDATE time_slots SET is_available = 0 WHERE id = ? AND is_available = 1 RETURNING *', [p_slot_id]
+    ).fetchone()
+    if not slot:
+        if db.conn.execute('SELECT 1 FROM time_slots WHERE id = ?', [p_slot_id]).fetchone():
+            raise PostgrestError(400, 'P0001', 'Slot not available')
+        raise PostgrestError(404, 'P0002', 'Slot not found')
+
+    doctor = db.conn.execute('SELECT * FROM users WHERE id = ?', [slot['doctor_id']]).fetchone()
+    patient = db.conn.execute('SELECT * FROM users WHERE id = ?', [p_patient_id]).fetchone()
+    if not patient:
+        raise PostgrestError(409, '23503', 'insert or update on table "appointments" violates foreign key constraint')
+
+    db.conn.execute(
+        'INSERT INTO appointments (id, doctor_id, patient_id, time_slot_id, date, start_time, end_time, '
+        'status, notes, video_room_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [p_appointment_id, slot['doctor_id'], p_patient_id, slot['id'], slot['date'], slot['start_time'],
+         slot['end_time'], 'scheduled', p_notes or '', p_video_room_id]
+    )
+    when = f"on {slot['date']} at {slot['start_time']}"
+    db.conn.executemany('INSERT INTO notifications (id, user_id, message, type) VALUES (?, ?, ?, ?)', [
+        (p_notification_ids[0], slot['doctor_id'], f"New appointment booked with {patient['name']} {when}", 'success'),
+        (p_notification_ids[1], p_patient_id, f"Appointment confirmed with Dr. {doctor['name']} {when}", 'success'),
+    ])
+
+    rows, _ = db.select('appointments', [
+        ('select', 'id,doctor_id,patient_id,time_slot_id,date,start_time,end_time,status,notes,video_room_id,'
+                   'created_at,doctor:doctor_id(id,name),patient:patient_id(id,name)'),
+        ('id', f'eq.{p_appointment_id}'),
+    ])
+    notifications, _ = db.select('notifications', [
+        ('id', f'in.({p_notification_ids[0]},{p_notification_ids[1]})'),
+        ('order', 'id'),
+    ])
+    return {
+        'appointment': rows[0],
+        'contacts': {'doctor': doctor['email'], 'patient': patient['email']},
+        'notifications': notifications,
+    }
+
+
+@rpc('claim_email_jobs')
+def claim_email_jobs(db, p_limit, p_lease_seconds=60):
+    """Mirror of claim_email_jobs() in EMAIL_OUTBOX.sql"""
+    rows = db.conn.execute(
+        f"""UPDATE email_outbox
+               SET status = 'sending', attempts = attempts + 1,
+                   locked_until = strftime('%Y-%m-%dT%H:%M:%fZ', 'now', ? || ' seconds')
+             WHERE id IN (
+               SELECT id FROM email_outbox
+                WHERE (status = 'pending' AND next_attempt_at <= {NOW})
+                   OR (status = 'sending' AND locked_until < {NOW})
+                ORDER BY next_attempt_at
+                LIMIT ?)
+         RETURNING *""", [f'+{int(p_lease_seconds)}', int(p_limit)]
+    ).fetchall()
+    return [db.from_db('email_outbox', r) for r in rows]
+
+
+@rpc('claim_appointment_reminders')
+def claim_appointment_reminders(db, p_lead_minutes=15, p_limit=50, p_lease_seconds=120, p_timezone='UTC'):
+    """Mirror of claim_appointment_reminders() in APPOINTMENT_REMINDERS.sql"""
+    now = datetime.now(ZoneInfo(p_timezone))
+    until = now + timedelta(minutes=int(p_lead_minutes))
+    rows = db.conn.execute(
+        f"""UPDATE appointments
+               SET reminder_claimed_until = strftime('%Y-%m-%dT%H:%M:%fZ', 'now', ? || ' seconds')
+             WHERE id IN (
+               SELECT id FROM appointments
+                WHERE status = 'scheduled'
+                  AND reminder_sent_at IS NULL
+                  AND (date, start_time) >= (?, ?)
+                  AND (date, start_time) <= (?, ?)
+                  AND (reminder_claimed_until IS NULL OR reminder_claimed_until < {NOW})
+                ORDER BY date, start_time
+                LIMIT ?)
+         RETURNING id""", [f'+{int(p_lease_seconds)}', now.strftime('%Y-%m-%d'), now.strftime('%H:%M'),
+                            until.strftime('%Y-%m-%d'), until.strftime('%H:%M'), int(p_limit)]
+    ).fetchall()
+    if not rows:
+        return []
+    claimed, _ = db.select('appointments', [
+        ('select', '*,doctor:doctor_id(id,name,email),patient:patient_id(id,name,email)'),
+        ('id', f"in.({','.join(r['id'] for r in rows)})"),
+        ('order', 'date,start_time'),
+    ])
+    return claimed
+
+
+@rpc('create_time_slots')
+def create_time_slots(db, p_doctor_id, p_slots):
+    """Mirror of create_time_slots() in BULK_SLOTS.sql"""
+    for slot in p_slots:
+        conflict = db.conn.execute(
+            'SELECT 1 FROM time_slots WHERE doctor_id = ? AND date = ? AND start_time < ? AND end_time > ? LIMIT 1',
+            [p_doctor_id, slot['date'], slot['end_time'], slot['start_time']]
+        ).fetchone()
+        if conflict:
+            raise PostgrestError(400, 'P0001', f"Overlaps an existing slot on {slot['date']} at {slot['start_time']}")
+
+    db.conn.executemany(
+        'INSERT INTO time_slots (id, doctor_id, date, start_time, end_time, duration, is_available) '
+        'VALUES (?, ?, ?, ?, ?, ?, 1)',
+        [(s['id'], p_doctor_id, s['date'], s['start_time'], s['end_time'], s['duration']) for s in p_slots]
+    )
+    ids = [s['id'] for s in p_slots]
+    rows = db.conn.execute(
+        f'SELECT * FROM time_slots WHERE id IN ({", ".join("?" for _ in ids)}) ORDER BY date, start_time', ids
+    ).fetchall()
+    return [db.from_db('time_slots', r) for r in rows]
+
+
+@rpc('purge_signaling')
+def purge_signaling(db, p_signal_ttl_minutes=10, p_participant_ttl_minutes=5, p_batch_size=5000):
+    """Mirror of purge_signaling() in SIGNALING_RETENTION.sql (without batching)"""
+    cutoff = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now', ?)"
+    signals = db.conn.execute(
+        f'DELETE FROM webrtc_signals WHERE created_at < {cutoff}', [f'-{int(p_signal_ttl_minutes)} minutes']
+    ).rowcount
+    participants = db.conn.execute(
+        f'DELETE FROM room_participants WHERE last_seen < {cutoff}', [f'-{int(p_participant_ttl_minutes)} minutes']
+    ).rowcount
+    return {'signals_deleted': signals, 'participants_deleted': participants}
+
+
+@rpc('signaling_table_stats')
+def signaling_table_stats(db):
+    """Mirror of signaling_table_stats(); SQLite has no dead tuples or autovacuum"""
+    stats = []
+    for table in ('room_participants', 'webrtc_signals'):
+        try:
+            size = db.conn.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = ?', [table]).fetchone()[0]
+        except sqlite3.OperationalError:
+            size = None
+        stats.append({
+            'table_name': table,
+            'live_rows': db.conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0],
+            'dead_rows': 0,
+            'total_bytes': size,
+            'last_autovacuum': None,
+        })
+    return stats
+
+
+def integrity_error(error):
+    message = str(error)
+    if 'UNIQUE' in message:
+        return PostgrestError(409, '23505', 'duplicate key value violates unique constraint', message)
+    if 'FOREIGN KEY' in message:
+        return PostgrestError(409, '23503', 'insert or update on table violates foreign key constraint', message)
+    if 'NOT NULL' in message:
+        return PostgrestError(400, '23502', 'null value violates not-null constraint', message)
+    return PostgrestError(400, '23514', 'new row violates check constraint', message)
+
+
+class PostgrestHandler(BaseHTTPRequestHandler):
+    """Maps /rest/v1/<table> and /rest/v1/rpc/<fn> requests onto LocalDatabase"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'LocalPostgREST/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @property
+    def db(self):
+        return self.server.db
+
+    def do_OPTIONS(self):
+        self.send_json(204, None)
+
+    def do_HEAD(self):
+        self.handle_request('HEAD')
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PATCH(self):
+        self.handle_request('PATCH')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            raise PostgrestError(400, 'PGRST102', 'Empty or invalid json')
+
+    def handle_request(self, method):
+        parts = urlsplit(self.path)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        prefer = self.headers.get('Prefer', '')
+        single = 'vnd.pgrst.object' in self.headers.get('Accept', '')
+        try:
+            if parts.path == '/__reset' and method == 'POST':
+                self.db.reset()
+                return self.send_json(200, {'success': True})
+            if parts.path == '/__stats':
+                return self.send_json(200, self.db.stats())
+            if not parts.path.startswith('/rest/v1/'):
+                raise PostgrestError(404, 'PGRST125', f'Invalid path {parts.path}')
+
+            resource = parts.path[len('/rest/v1/'):].strip('/')
+            self.db.requests[f'{method} {resource}'] += 1
+            if resource.startswith('rpc/'):
+                result = self.db.call(resource[4:], self.read_body() if method == 'POST' else dict(params))
+                return self.send_json(200, result)
+
+            count = 'count=' in prefer
+            total = None
+            if method in ('GET', 'HEAD'):
+                rows, total = self.db.select(resource, params, count=count)
+                status = 200
+            elif method == 'POST':
+                body = self.read_body()
+                records = body if isinstance(body, list) else [body]
+                rows = self.db.insert(resource, records, params,
+                                      upsert='merge-duplicates' in prefer,
+                                      ignore='ignore-duplicates' in prefer)
+                status = 201
+            elif method == 'PATCH':
+                rows = self.db.update(resource, self.read_body(), params)
+                status = 200
+            else:
+                rows = self.db.delete(resource, params)
+                status = 200
+
+            if method not in ('GET', 'HEAD') and 'return=representation' not in prefer:
+                return self.send_json(201 if method == 'POST' else 204, None)
+            if single:
+                if len(rows) != 1:
+                    raise PostgrestError(406, 'PGRST116', 'JSON object requested, multiple (or no) rows returned',
+                                         f'The result contains {len(rows)} rows')
+                rows = rows[0]
+            headers = {}
+            if method in ('GET', 'HEAD'):
+                offset = int(dict(params).get('offset', 0))
+                size = 1 if single else len(rows)
+                span = f'{offset}-{offset + size - 1}' if size else '*'
+                headers['Content-Range'] = f'{span}/{total if total is not None else "*"}'
+            self.send_json(status, None if method == 'HEAD' else rows, headers)
+        except PostgrestError as error:
+            self.send_json(error.status, error.body)
+        except sqlite3.IntegrityError as error:
+            failure = integrity_error(error)
+            self.send_json(failure.status, failure.body)
+        except (sqlite3.Error, ValueError, TypeError) as error:
+            self.send_json(400, {'code': 'PGRST000', 'message': str(error), 'details': None, 'hint': None})
+
+    def send_json(self, status, payload, headers=None):
+        body = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PATCH, DELETE, HEAD, OPTIONS')
+        self.send_header('Access-Control-Expose-Headers', 'Content-Range')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class LocalSupabase:
+    """Runs the stand-in on a background thread; usable as a context manager"""
+
+    def __init__(self, host='127.0.0.1', port=0, database=':memory:', verbose=False):
+        self.db = LocalDatabase(database)
+        self.server = ThreadingHTTPServer((host, port), PostgrestHandler)
+        self.server.daemon_threads = True
+        self.server.db = self.db
+        self.server.verbose = verbose
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase/PostgREST stand-in backed by SQLite")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--db', default=':memory:', help="SQLite file to persist to (default: in-memory)")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    stand_in = LocalSupabase(args.host, args.port, args.db, args.verbose)
+    print(f"🗄️  Local Supabase stand-in listening on {stand_in.url}")
+    print(f"   NEXT_PUBLIC_SUPABASE_URL={stand_in.url} NEXT_PUBLIC_SUPABASE_ANON_KEY=local")
+    try:
+        stand_in.server.serve_forever()
+    except KeyboardInterrupt:
+        stand_in.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+MedMeet login-storm benchmark
+Fires a burst of concurrent logins and measures how long an unrelated cheap
+request (GET /api) takes meanwhile - a proxy for event-loop stalls.
+
+Compare the inline and pooled hashing paths by running it twice:
+    HASH_POOL_SIZE=0 yarn start   ->  python login_storm.py --label inline
+    yarn start                    ->  python login_storm.py --label pool
+
+Every thread sends through one keep-alive session, so a login costs its hash
+and not a new TCP/TLS handshake. Keep --concurrency at or below
+MEDMEET_HTTP_POOL_SIZE, or the extra connections are opened per request.
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from backend_test import percentile
+from medmeet_client import API_BASE, BASE_URL, new_session
+from medmeet_client.config import POOL_SIZE
+
+PASSWORD = "StormPass123!"
+
+
+def register_users(count):
+    stamp = int(datetime.now().timestamp())
+    emails = []
+    session = new_session()
+    for i in range(count):
+        email = f"storm.{stamp}.{i}@test.com"
+        response = session.post(f"{API_BASE}/auth/register", json={
+            "email": email, "password": PASSWORD, "name": f"Storm Patient {i}", "role": "patient",
+        }, timeout=60)
+        response.raise_for_status()
+        emails.append(email)
+    return emails
+
+
+def probe(stop, interval, latencies):
+    """Time GET /api until `stop` is set; it does no I/O, so delay is queueing"""
+    session = new_session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            session.get(API_BASE, timeout=30)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except requests.RequestException:
+            latencies.append(30000.0)
+        time.sleep(interval)
+
+
+def measure_idle(seconds, interval):
+    stop, latencies = threading.Event(), []
+    thread = threading.Thread(target=probe, args=(stop, interval, latencies))
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    return sorted(latencies)
+
+
+def storm(emails, logins, concurrency, interval):
+    stop, probe_latencies = threading.Event(), []
+    thread = threading.Thread(target=probe, args=(stop, interval, probe_latencies))
+    login_latencies, statuses = [], {}
+    lock = threading.Lock()
+    sessions = threading.local()
+
+    def login(n):
+        if not hasattr(sessions, 'session'):
+            sessions.session = new_session()
+        start = time.perf_counter()
+        try:
+            status = sessions.session.post(f"{API_BASE}/auth/login", json={
+                "email": emails[n % len(emails)], "password": PASSWORD,
+            }, timeout=120).status_code
+        except requests.RequestException:
+            status = 'error'
+        with lock:
+            login_latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    thread.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(logins)))
+    wall = time.perf_counter() - started
+    stop.set()
+    thread.join()
+    return sorted(probe_latencies), sorted(login_latencies), statuses, wall
+
+
+def summary(values):
+    return f"p50 {percentile(values, 50):8.1f} ms   p95 {percentile(values, 95):8.1f} ms   " \
+           f"p99 {percentile(values, 99):8.1f} ms   max {max(values, default=0):8.1f} ms"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure event-loop latency during a login burst')
+    parser.add_argument('--users', type=int, default=20, help='accounts to register and log in with')
+    parser.add_argument('--logins', type=int, default=300, help='total logins in the storm')
+    parser.add_argument('--concurrency', type=int, default=50, help='logins in flight at once')
+    parser.add_argument('--probe-interval', type=float, default=0.05, help='seconds between probe requests')
+    parser.add_argument('--idle-seconds', type=float, default=3.0, help='baseline probe duration')
+    parser.add_argument('--label', default='run', help='name printed with the results')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"🌩️  Login storm against {BASE_URL} [{args.label}]")
+    print(f"   {args.logins} logins, {args.concurrency} concurrent, {args.users} accounts")
+    if args.concurrency > POOL_SIZE:
+        print(f"   ⚠️  --concurrency is above MEDMEET_HTTP_POOL_SIZE={POOL_SIZE}; "
+              f"the extra logins open a connection each")
+
+    emails = register_users(args.users)
+    idle = measure_idle(args.idle_seconds, args.probe_interval)
+    busy, logins, statuses, wall = storm(emails, args.logins, args.concurrency, args.probe_interval)
+
+    print(f"\n⏱️  Probe latency (GET /api)")
+    print(f"   idle   {summary(idle)}")
+    print(f"   storm  {summary(busy)}")
+    print(f"\n🔐 Logins: {args.logins / wall:.1f}/s   {summary(logins)}")
+    print(f"   status codes: {statuses}")
+    if statuses.get(503):
+        print("   503s are hash-pool back-pressure (HASH_QUEUE_LIMIT)")
+
+
+if __name__ == "__main__":
+    main()
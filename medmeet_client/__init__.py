@@ -0,0 +1,20 @@
+"""
+Shared HTTP client for the MedMeet Python tooling: the API base URL, pooled
+keep-alive sessions with retries, cached role logins and a parallel runner
+"""
+
+from .config import API_BASE, BASE_URL
+from .session import PooledSession, new_session
+from .accounts import Account, AccountPool, accounts
+from .parallel import run_parallel
+
+__all__ = [
+    'API_BASE',
+    'BASE_URL',
+    'PooledSession',
+    'new_session',
+    'Account',
+    'AccountPool',
+    'accounts',
+    'run_parallel',
+]
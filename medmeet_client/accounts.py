@@ -0,0 +1,86 @@
+import threading
+import time
+import uuid
+
+from .config import API_BASE
+from .session import new_session
+
+PASSWORD = "SecurePass123!"
+
+PROFILES = {
+    'doctor': {
+        "name": "Dr. Pool Doctor",
+        "phone": "+1234567890",
+        "specialization": "Cardiology",
+        "bio": "Shared test doctor",
+        "experience": 5,
+    },
+    'patient': {
+        "name": "Pool Patient",
+        "phone": "+1987654321",
+    },
+}
+
+
+class Account:
+    """A registered user and a session that is logged in as them"""
+
+    def __init__(self, role, email, password, user, session):
+        self.role = role
+        self.email = email
+        self.password = password
+        self.user = user
+        self.session = session
+
+    @property
+    def id(self):
+        return self.user['id']
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def __repr__(self):
+        return f"Account({self.role}, {self.email})"
+
+
+class AccountPool:
+    """Registers one account per (role, key) on first use and hands it out afterwards"""
+
+    def __init__(self, prefix='pool'):
+        self.prefix = prefix
+        self.accounts = {}
+        self.lock = threading.Lock()
+
+    def register(self, role, **profile):
+        """A brand-new account, logged in through its registration cookie"""
+        email = f"{self.prefix}.{role}.{int(time.time())}.{uuid.uuid4().hex[:8]}@medmeet.com"
+        session = new_session()
+        response = session.post(f"{API_BASE}/auth/register", json={
+            **PROFILES.get(role, {}),
+            **profile,
+            "email": email,
+            "password": PASSWORD,
+            "role": role,
+        })
+        response.raise_for_status()
+        return Account(role, email, PASSWORD, response.json()['user'], session)
+
+    def get(self, role, key='default', **profile):
+        """The cached account for (role, key), registering it the first time"""
+        with self.lock:
+            account = self.accounts.get((role, key))
+            if account is None:
+                account = self.accounts[(role, key)] = self.register(role, **profile)
+            return account
+
+    def login(self, account):
+        """A second, independently logged-in session for an existing account"""
+        session = new_session()
+        response = session.post(f"{API_BASE}/auth/login", json={"email": account.email, "password": account.password})
+        response.raise_for_status()
+        return session
+
+
+# Process-wide pool shared by the scripts and test suites
+accounts = AccountPool()
@@ -0,0 +1,22 @@
+from .config import SUPABASE_KEY, SUPABASE_URL
+from .session import new_session
+
+
+def purge_accounts(prefix, supabase_url=SUPABASE_URL, key=SUPABASE_KEY):
+    """Delete users whose email starts with `prefix.`, and their queued emails.
+
+    Profiles, slots, appointments and notifications go with the user through
+    ON DELETE CASCADE. Returns the number of rows deleted per table.
+    """
+    session = new_session()
+    headers = {'apikey': key, 'Authorization': f'Bearer {key}', 'Prefer': 'return=representation'}
+    deleted = {}
+    for table, column in (('email_outbox', 'to_address'), ('users', 'email')):
+        response = session.delete(
+            f"{supabase_url}/rest/v1/{table}",
+            params={column: f"like.{prefix}.*", 'select': 'id'},
+            headers=headers,
+        )
+        response.raise_for_status()
+        deleted[table] = len(response.json())
+    return deleted
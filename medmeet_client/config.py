@@ -0,0 +1,17 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://medmeet-3.preview.emergentagent.com')
+API_BASE = f"{BASE_URL}/api"
+
+# PostgREST access for test teardown (see cleanup.py)
+SUPABASE_URL = os.getenv('NEXT_PUBLIC_SUPABASE_URL', 'http://127.0.0.1:54321')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY', 'local')
+
+# Connections kept alive per host across every session, and the default
+# per-request timeout in seconds
+POOL_SIZE = int(os.getenv('MEDMEET_HTTP_POOL_SIZE', '32'))
+TIMEOUT = float(os.getenv('MEDMEET_HTTP_TIMEOUT', '30'))
@@ -0,0 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_parallel(calls, workers=8):
+    """Run zero-argument callables concurrently; results come back in input order"""
+    calls = list(calls)
+    if not calls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(calls))) as pool:
+        futures = [pool.submit(call) for call in calls]
+        return [future.result() for future in futures]
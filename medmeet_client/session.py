@@ -0,0 +1,57 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import POOL_SIZE, TIMEOUT
+
+# Connection failures and gateway errors are retried with backoff. Only
+# idempotent methods are retried on a status code; a POST is only retried
+# when the connection failed before the request was sent.
+RETRY = Retry(
+    total=3,
+    connect=3,
+    read=0,
+    backoff_factor=0.3,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def shared_adapter():
+    """One HTTPAdapter, and so one keep-alive pool per host, for every session"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=RETRY)
+        return _adapter
+
+
+class PooledSession(requests.Session):
+    """requests.Session with its own cookie jar on the shared connection pool"""
+
+    def __init__(self, timeout=TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        adapter = shared_adapter()
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+    def close(self):
+        # The adapter is shared; closing it here would drop every session's connections
+        self.adapters.clear()
+
+
+def new_session(timeout=TIMEOUT):
+    """Fresh cookie jar, reusing already-open connections"""
+    return PooledSession(timeout=timeout)
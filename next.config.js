@@ -5,7 +5,11 @@ const nextConfig = {
   },
   experimental: {
     // Remove if not using Server Components
-    serverComponentsExternalPackages: ['mongodb'],
+    // bcryptjs stays in node_modules so the hashing workers (lib/hash-pool.js) can require it;
+    // pg is loaded by Node rather than bundled (lib/db.js)
+    serverComponentsExternalPackages: ['mongodb', 'bcryptjs', 'pg'],
+    // Runs instrumentation.js on server start (email outbox worker)
+    instrumentationHook: true,
   },
   webpack(config, { dev }) {
     if (dev) {
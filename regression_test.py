@@ -4,11 +4,10 @@ MedMeet Backend API Regression Test
 Quick regression test for critical endpoints after PeerJS implementation
 """
 
-import requests
 import json
 from datetime import datetime, timedelta
 
-BASE_URL = "https://medmeet-3.preview.emergentagent.com/api"
+from medmeet_client import API_BASE, new_session
 
 def test_critical_endpoints():
     """Test critical backend endpoints for regression"""
@@ -40,11 +39,11 @@ def test_critical_endpoints():
         "phone": "+1987654321"
     }
     
-    session = requests.Session()
+    session = new_session()
     
     # Test doctor registration
     try:
-        response = session.post(f"{BASE_URL}/auth/register", json=doctor_data)
+        response = session.post(f"{API_BASE}/auth/register", json=doctor_data)
         if response.status_code == 200 and response.json().get('success'):
             print("✅ Doctor registration: WORKING")
             doctor_cookies = response.cookies
@@ -60,7 +59,7 @@ def test_critical_endpoints():
     
     # Test patient registration
     try:
-        response = session.post(f"{BASE_URL}/auth/register", json=patient_data)
+        response = session.post(f"{API_BASE}/auth/register", json=patient_data)
         if response.status_code == 200 and response.json().get('success'):
             print("✅ Patient registration: WORKING")
             patient_cookies = response.cookies
@@ -76,7 +75,7 @@ def test_critical_endpoints():
     
     # Test login
     try:
-        login_response = session.post(f"{BASE_URL}/auth/login", json={
+        login_response = session.post(f"{API_BASE}/auth/login", json={
             "email": doctor_data["email"],
             "password": doctor_data["password"]
         })
@@ -93,7 +92,7 @@ def test_critical_endpoints():
     
     # Test session check
     try:
-        me_response = session.get(f"{BASE_URL}/auth/me", cookies=doctor_cookies)
+        me_response = session.get(f"{API_BASE}/auth/me", cookies=doctor_cookies)
         if me_response.status_code == 200 and me_response.json().get('user'):
             print("✅ Session check: WORKING")
             results.append(("Session Check", True))
@@ -116,7 +115,7 @@ def test_critical_endpoints():
     }
     
     try:
-        slot_response = session.post(f"{BASE_URL}/time-slots", json=slot_data, cookies=doctor_cookies)
+        slot_response = session.post(f"{API_BASE}/time-slots", json=slot_data, cookies=doctor_cookies)
         if slot_response.status_code == 200 and slot_response.json().get('success'):
             print("✅ Create time slot: WORKING")
             slot_id = slot_response.json()['slot']['id']
@@ -130,25 +129,25 @@ def test_critical_endpoints():
         results.append(("Create Time Slot", False))
         slot_id = None
     
-    # Test get time slots
+    # Test availability search (earliest open slots across all doctors)
     try:
-        get_slots_response = session.get(f"{BASE_URL}/time-slots?available=true")
+        get_slots_response = session.get(f"{API_BASE}/availability?days=14&limit=20")
         if get_slots_response.status_code == 200 and 'slots' in get_slots_response.json():
-            print("✅ Get time slots: WORKING")
-            results.append(("Get Time Slots", True))
+            print("✅ Availability search: WORKING")
+            results.append(("Availability Search", True))
         else:
-            print(f"❌ Get time slots: FAILED - {get_slots_response.status_code}")
-            results.append(("Get Time Slots", False))
+            print(f"❌ Availability search: FAILED - {get_slots_response.status_code}")
+            results.append(("Availability Search", False))
     except Exception as e:
-        print(f"❌ Get time slots: ERROR - {e}")
-        results.append(("Get Time Slots", False))
+        print(f"❌ Availability search: ERROR - {e}")
+        results.append(("Availability Search", False))
     
     # Test 3: Appointment management
     print("\n📅 Testing Appointment Management...")
     
     # Login as patient for booking
     try:
-        patient_login = session.post(f"{BASE_URL}/auth/login", json={
+        patient_login = session.post(f"{API_BASE}/auth/login", json={
             "email": patient_data["email"],
             "password": patient_data["password"]
         })
@@ -162,7 +161,7 @@ def test_critical_endpoints():
                     "notes": "Regression test appointment"
                 }
                 
-                book_response = session.post(f"{BASE_URL}/appointments", json=booking_data, cookies=patient_cookies)
+                book_response = session.post(f"{API_BASE}/appointments", json=booking_data, cookies=patient_cookies)
                 if book_response.status_code == 200 and book_response.json().get('success'):
                     print("✅ Book appointment: WORKING")
                     results.append(("Book Appointment", True))
@@ -186,7 +185,7 @@ def test_critical_endpoints():
     
     # Test get appointments
     try:
-        appointments_response = session.get(f"{BASE_URL}/appointments", cookies=patient_cookies)
+        appointments_response = session.get(f"{API_BASE}/appointments", cookies=patient_cookies)
         if appointments_response.status_code == 200 and 'appointments' in appointments_response.json():
             print("✅ Get appointments: WORKING")
             results.append(("Get Appointments", True))
@@ -202,7 +201,7 @@ def test_critical_endpoints():
     
     # Test get doctors
     try:
-        doctors_response = session.get(f"{BASE_URL}/doctors")
+        doctors_response = session.get(f"{API_BASE}/doctors")
         if doctors_response.status_code == 200 and 'doctors' in doctors_response.json():
             print("✅ Get doctors list: WORKING")
             results.append(("Get Doctors", True))
@@ -215,7 +214,7 @@ def test_critical_endpoints():
     
     # Test logout
     try:
-        logout_response = session.post(f"{BASE_URL}/auth/logout")
+        logout_response = session.post(f"{API_BASE}/auth/logout")
         if logout_response.status_code == 200 and logout_response.json().get('success'):
             print("✅ Logout: WORKING")
             results.append(("Logout", True))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+MedMeet signaling table maintenance
+Purges expired webrtc_signals / room_participants rows and reports table
+bloat before and after (see SIGNALING_RETENTION.sql)
+"""
+
+import argparse
+
+from medmeet_client import new_session
+from medmeet_client.config import SUPABASE_KEY, SUPABASE_URL
+
+session = new_session()
+
+
+def rpc(name, **args):
+    response = session.post(
+        f"{SUPABASE_URL}/rest/v1/rpc/{name}",
+        json=args,
+        headers={'apikey': SUPABASE_KEY, 'Authorization': f'Bearer {SUPABASE_KEY}'},
+        timeout=60,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def format_bytes(size):
+    if size is None:
+        return 'n/a'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def print_stats(title, stats):
+    print(f"\n📊 {title}")
+    print(f"  {'table':<20}{'live':>10}{'dead':>10}{'bloat':>8}{'size':>12}")
+    for row in stats:
+        total = row['live_rows'] + row['dead_rows']
+        bloat = f"{100 * row['dead_rows'] / total:.0f}%" if total else '0%'
+        print(f"  {row['table_name']:<20}{row['live_rows']:>10}{row['dead_rows']:>10}{bloat:>8}"
+              f"{format_bytes(row['total_bytes']):>12}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Purge expired signaling rows and report table bloat')
+    parser.add_argument('--signal-ttl', type=int, default=10, help='delete signals older than N minutes')
+    parser.add_argument('--participant-ttl', type=int, default=5, help='delete participants not seen for N minutes')
+    parser.add_argument('--report-only', action='store_true', help='show table stats without purging')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"🧹 Signaling maintenance against {SUPABASE_URL}")
+
+    print_stats('Before', rpc('signaling_table_stats'))
+    if args.report_only:
+        return
+
+    result = rpc('purge_signaling',
+                 p_signal_ttl_minutes=args.signal_ttl,
+                 p_participant_ttl_minutes=args.participant_ttl)
+    print(f"\n✅ Deleted {result['signals_deleted']} signals and {result['participants_deleted']} participants")
+
+    # Dead tuples only drop once (auto)vacuum has run; pg_stat counters can also lag a moment
+    print_stats('After', rpc('signaling_table_stats'))
+
+
+if __name__ == "__main__":
+    main()
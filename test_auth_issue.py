@@ -3,20 +3,13 @@
 Debug the authentication issue more carefully
 """
 
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://medmeet-3.preview.emergentagent.com')
-API_BASE = f"{BASE_URL}/api"
+from medmeet_client import API_BASE, new_session, run_parallel
 
 def test_auth_carefully():
     """Test authentication more carefully"""
     
     print("=== Step 1: Test with completely fresh session ===")
-    fresh_session = requests.Session()
+    fresh_session = new_session()
     response = fresh_session.get(f"{API_BASE}/auth/me")
     print(f"Fresh session /auth/me: {response.status_code}")
     print(f"Response: {response.text}")
@@ -43,10 +36,10 @@ def test_auth_carefully():
     print(f"Auth/me with cookies: {auth_response.status_code}")
     
     print("\n=== Step 3: Test with new session (no cookies) ===")
-    new_session = requests.Session()
+    anonymous = new_session()
     
     # Make sure no cookies are set
-    print(f"New session cookies before request: {dict(new_session.cookies)}")
+    print(f"New session cookies before request: {dict(anonymous.cookies)}")
     
     # Test various endpoints
     endpoints = [
@@ -56,9 +49,9 @@ def test_auth_carefully():
     ]
     
     for endpoint in endpoints:
-        response = new_session.get(f"{API_BASE}{endpoint}")
+        response = anonymous.get(f"{API_BASE}{endpoint}")
         print(f"GET {endpoint}: {response.status_code} - {response.text[:100]}")
-        print(f"Cookies after request: {dict(new_session.cookies)}")
+        print(f"Cookies after request: {dict(anonymous.cookies)}")
     
     print("\n=== Step 4: Test POST endpoints ===")
     post_endpoints = [
@@ -67,13 +60,16 @@ def test_auth_carefully():
     ]
     
     for endpoint, data in post_endpoints:
-        response = new_session.post(f"{API_BASE}{endpoint}", json=data)
+        response = anonymous.post(f"{API_BASE}{endpoint}", json=data)
         print(f"POST {endpoint}: {response.status_code} - {response.text[:100]}")
     
-    print("\n=== Step 5: Test with requests (no session) ===")
-    for endpoint in endpoints:
-        response = requests.get(f"{API_BASE}{endpoint}")
-        print(f"No session GET {endpoint}: {response.status_code} - {response.text[:100]}")
+    print("\n=== Step 5: Test with a fresh session per request, in parallel ===")
+    responses = run_parallel(
+        lambda endpoint=endpoint: new_session().get(f"{API_BASE}{endpoint}")
+        for endpoint in endpoints
+    )
+    for endpoint, response in zip(endpoints, responses):
+        print(f"Fresh session GET {endpoint}: {response.status_code} - {response.text[:100]}")
 
 if __name__ == "__main__":
     test_auth_carefully()
\ No newline at end of file
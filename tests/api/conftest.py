@@ -0,0 +1,116 @@
+"""
+Fixtures for the live API suite (the former APITester in backend_test.py).
+
+Each pytest-xdist worker registers its own doctor and patient under a
+per-worker email prefix, so workers never see each other's rows, and deletes
+everything under that prefix when it finishes (medmeet_client.cleanup).
+
+    MEDMEET_API_TESTS=1 NEXT_PUBLIC_BASE_URL=http://localhost:3000 pytest tests/api -n auto
+
+Teardown talks to PostgREST at NEXT_PUBLIC_SUPABASE_URL with
+SUPABASE_SERVICE_ROLE_KEY. The anon key also works, but it cannot see
+email_outbox, so queued emails are left behind.
+"""
+
+import itertools
+import json
+import os
+import uuid
+import warnings
+from datetime import datetime, timedelta
+
+import pytest
+
+from medmeet_client import API_BASE, AccountPool, new_session
+from medmeet_client.cleanup import purge_accounts
+
+ENABLED = os.getenv('MEDMEET_API_TESTS') == '1'
+
+
+# Session-scoped so it runs, and skips, before any account is registered
+@pytest.fixture(scope="session", autouse=True)
+def live_api():
+    if not ENABLED:
+        pytest.skip("set MEDMEET_API_TESTS=1 to run against a live API")
+
+
+@pytest.fixture(scope="session")
+def prefix():
+    """pytest.<run>.<worker>: shared by every account this worker registers"""
+    run = os.getenv('PYTEST_XDIST_TESTRUNUID', uuid.uuid4().hex)[:8]
+    worker = os.getenv('PYTEST_XDIST_WORKER', 'main')
+    return f"pytest.{run}.{worker}"
+
+
+@pytest.fixture(scope="session")
+def accounts(live_api, prefix):
+    yield AccountPool(prefix)
+    try:
+        purge_accounts(prefix)
+    except Exception as e:
+        warnings.warn(f"Could not delete test accounts under {prefix}: {e}")
+
+
+@pytest.fixture(scope="session")
+def specialization(prefix):
+    """Unique to this worker, so directory and availability filters only match its doctor"""
+    return f"Cardiology {prefix}"
+
+
+@pytest.fixture(scope="session")
+def doctor(accounts, specialization):
+    return accounts.get('doctor', specialization=specialization)
+
+
+@pytest.fixture(scope="session")
+def patient(accounts):
+    return accounts.get('patient')
+
+
+@pytest.fixture
+def anonymous():
+    """No cookies, so every protected route must answer 401"""
+    return new_session()
+
+
+@pytest.fixture(scope="session")
+def make_slot(doctor):
+    """Creates a slot at the next free half hour of this worker's doctor"""
+    counter = itertools.count()
+
+    def make():
+        n = next(counter)
+        day = (datetime.now() + timedelta(days=1 + n // 16)).strftime('%Y-%m-%d')
+        start = datetime(2000, 1, 1, 8) + timedelta(minutes=30 * (n % 16))
+        response = doctor.session.post(f"{API_BASE}/time-slots", json={
+            "date": day,
+            "startTime": start.strftime('%H:%M'),
+            "endTime": (start + timedelta(minutes=30)).strftime('%H:%M'),
+            "duration": 30,
+        })
+        assert response.status_code == 200, response.text
+        return response.json()['slot']
+
+    return make
+
+
+@pytest.fixture
+def appointment(make_slot, patient):
+    """A fresh booking of a fresh slot"""
+    response = patient.session.post(f"{API_BASE}/appointments", json={
+        "slotId": make_slot()['id'],
+        "notes": "Regular checkup appointment",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()['appointment']
+
+
+@pytest.fixture
+def sse_events():
+    """Parses a streamed Server-Sent Events response into its JSON data payloads"""
+    def parse(stream):
+        for line in stream.iter_lines(decode_unicode=True):
+            if line and line.startswith('data: '):
+                yield json.loads(line[len('data: '):])
+
+    return parse
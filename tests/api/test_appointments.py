@@ -0,0 +1,49 @@
+from medmeet_client import API_BASE
+
+
+def test_book_appointment(appointment, doctor, patient, anonymous):
+    assert appointment['doctor_id'] == doctor.id
+    assert appointment['patient_id'] == patient.id
+    # The parties' email addresses are only used for the confirmation emails
+    assert appointment['doctor'] == {'id': doctor.id, 'name': doctor.user['name']}
+    assert appointment['patient'] == {'id': patient.id, 'name': patient.user['name']}
+    # Same columns as the listing, bookkeeping ones left out
+    listed = patient.session.get(f"{API_BASE}/appointments", params={"limit": 200}).json()['appointments']
+    assert set(appointment) == set(next(a for a in listed if a['id'] == appointment['id']))
+
+    slot = anonymous.get(f"{API_BASE}/time-slots", params={"doctorId": doctor.id, "date": appointment['date']}).json()
+    booked = [s for s in slot['slots'] if s['id'] == appointment['time_slot_id']]
+    assert booked and not booked[0]['is_available']
+
+
+def test_book_taken_slot(appointment, accounts):
+    other = accounts.get('patient', key='second')
+    response = other.session.post(f"{API_BASE}/appointments", json={"slotId": appointment['time_slot_id']})
+    assert response.status_code == 400
+
+
+def test_book_appointment_unauthorized(anonymous):
+    response = anonymous.post(f"{API_BASE}/appointments", json={"slotId": "fake_slot_id", "notes": "Test appointment"})
+    assert response.status_code == 401
+
+
+def test_get_appointments(appointment, doctor, patient):
+    for account in (doctor, patient):
+        response = account.session.get(f"{API_BASE}/appointments", params={"limit": 200})
+        assert response.status_code == 200
+        assert appointment['id'] in {a['id'] for a in response.json()['appointments']}
+
+
+def test_get_appointments_unauthorized(anonymous):
+    assert anonymous.get(f"{API_BASE}/appointments").status_code == 401
+
+
+def test_update_appointment_status(appointment, doctor):
+    response = doctor.session.post(f"{API_BASE}/appointments/{appointment['id']}/status", json={"status": "completed"})
+    assert response.status_code == 200
+    assert response.json()['appointment']['status'] == 'completed'
+
+
+def test_appointments_invalid_date_window(patient):
+    response = patient.session.get(f"{API_BASE}/appointments", params={"to": "2024-13-45"})
+    assert response.status_code == 400
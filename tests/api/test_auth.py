@@ -0,0 +1,58 @@
+from medmeet_client import API_BASE
+
+
+def test_register_doctor(accounts, specialization):
+    doctor = accounts.register('doctor', specialization=specialization)
+    assert doctor.user['role'] == 'doctor'
+    assert doctor.session.get(f"{API_BASE}/auth/me").json()['profile']
+
+
+def test_register_patient(accounts):
+    patient = accounts.register('patient')
+    assert patient.user['role'] == 'patient'
+
+
+def test_duplicate_registration(doctor, anonymous):
+    response = anonymous.post(f"{API_BASE}/auth/register", json={
+        "email": doctor.email,
+        "password": "AnotherPass123!",
+        "name": "Another Doctor",
+        "role": "doctor",
+        "phone": "+1111111111"
+    })
+    assert response.status_code == 400
+    assert 'already registered' in response.json()['error'].lower()
+
+
+def test_login(accounts, doctor, patient):
+    for account in (doctor, patient):
+        session = accounts.login(account)
+        me = session.get(f"{API_BASE}/auth/me").json()
+        assert me['user']['id'] == account.id
+
+
+def test_invalid_login(anonymous):
+    response = anonymous.post(f"{API_BASE}/auth/login", json={
+        "email": "nonexistent@medmeet.com",
+        "password": "wrongpassword"
+    })
+    assert response.status_code == 401
+    assert 'invalid credentials' in response.json()['error'].lower()
+
+
+def test_auth_me(doctor):
+    response = doctor.session.get(f"{API_BASE}/auth/me")
+    assert response.status_code == 200
+    assert response.json()['user']['role'] == 'doctor'
+
+
+def test_auth_me_unauthorized(anonymous):
+    assert anonymous.get(f"{API_BASE}/auth/me").status_code == 401
+
+
+def test_logout(accounts, patient):
+    session = accounts.login(patient)
+    response = session.post(f"{API_BASE}/auth/logout")
+    assert response.status_code == 200
+    assert response.json()['success']
+    assert session.get(f"{API_BASE}/auth/me").status_code == 401
@@ -0,0 +1,36 @@
+from medmeet_client import API_BASE
+
+
+def test_get_doctors_list(doctor, specialization, anonymous):
+    response = anonymous.get(f"{API_BASE}/doctors", params={"specialization": specialization})
+    assert response.status_code == 200
+    assert [d['id'] for d in response.json()['doctors']] == [doctor.id]
+
+
+def test_update_doctor_profile(accounts, prefix):
+    # A doctor of its own, so the shared one keeps its specialization
+    doctor = accounts.get('doctor', key='profile')
+    updated = f"Interventional Cardiology {prefix}"
+    response = doctor.session.post(f"{API_BASE}/doctor/profile", json={
+        "specialization": updated,
+        "bio": "Updated bio: Specialized in interventional cardiology with 15+ years experience",
+        "experience": 16
+    })
+    assert response.status_code == 200
+    assert response.json()['profile']['specialization'] == updated
+
+    # The directory is invalidated on update, so the change is visible at once
+    doctors = doctor.session.get(f"{API_BASE}/doctors", params={"specialization": updated}).json()['doctors']
+    assert [d['id'] for d in doctors] == [doctor.id]
+
+
+def test_doctor_directory(doctor, specialization, anonymous):
+    params = {"view": "compact", "specialization": specialization}
+    response = anonymous.get(f"{API_BASE}/doctors", params=params)
+    assert response.status_code == 200
+    doctors = response.json()['doctors']
+    assert any(d['id'] == doctor.id for d in doctors)
+    assert not any('bio' in p or 'email' in d for d in doctors for p in d.get('doctor_profiles', []))
+
+    cached = anonymous.get(f"{API_BASE}/doctors", params=params, headers={'If-None-Match': response.headers.get('ETag', '')})
+    assert cached.status_code == 304
@@ -0,0 +1,21 @@
+import os
+
+from backend_test import metric_value, parse_metrics, parse_server_timing
+from medmeet_client import API_BASE
+
+
+def test_server_timing(doctor):
+    response = doctor.session.get(f"{API_BASE}/appointments")
+    timing = parse_server_timing(response.headers.get('Server-Timing'))
+    assert {'db', 'total'} <= set(timing)
+
+
+def test_metrics_endpoint(doctor, anonymous):
+    doctor.session.get(f"{API_BASE}/appointments")
+    token = os.getenv('METRICS_TOKEN')
+    scrape = anonymous.get(f"{API_BASE}/metrics", headers={'Authorization': f"Bearer {token}"} if token else {})
+    assert scrape.status_code == 200
+
+    metrics = parse_metrics(scrape.text)
+    assert metric_value(metrics, 'http_requests_total', method='GET', route='/api/appointments') >= 1
+    assert metric_value(metrics, 'db_requests_per_request_count', method='GET', route='/api/appointments') >= 1
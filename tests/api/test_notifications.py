@@ -0,0 +1,81 @@
+import uuid
+
+from medmeet_client import API_BASE
+
+
+def test_get_notifications(appointment, doctor, patient):
+    # Booking notifies both sides
+    for account in (doctor, patient):
+        response = account.session.get(f"{API_BASE}/notifications")
+        assert response.status_code == 200
+        assert response.json()['notifications']
+
+
+def test_get_notifications_unauthorized(anonymous):
+    assert anonymous.get(f"{API_BASE}/notifications").status_code == 401
+
+
+def test_mark_notification_read(appointment, patient):
+    notification = patient.session.get(f"{API_BASE}/notifications").json()['notifications'][0]
+    response = patient.session.patch(f"{API_BASE}/notifications/{notification['id']}")
+    assert response.status_code == 200
+    assert response.json()['success']
+
+    notifications = patient.session.get(f"{API_BASE}/notifications").json()['notifications']
+    assert next(n for n in notifications if n['id'] == notification['id'])['read']
+
+
+def test_unread_count(appointment, patient):
+    unread = patient.session.get(f"{API_BASE}/notifications/unread")
+    assert unread.status_code == 200
+    assert unread.json()['unread'] >= 1
+
+    # The cached count follows single mark-reads too
+    newest = patient.session.get(f"{API_BASE}/notifications", params={"limit": 1}).json()['notifications'][0]
+    assert not newest['read']
+    marked = patient.session.patch(f"{API_BASE}/notifications/{newest['id']}").json()
+    assert marked['unread'] == unread.json()['unread'] - 1
+    assert patient.session.get(f"{API_BASE}/notifications/unread").json()['unread'] == marked['unread']
+
+
+def test_mark_read_in_bulk(make_slot, patient):
+    for _ in range(2):
+        booked = patient.session.post(f"{API_BASE}/appointments", json={"slotId": make_slot()['id']})
+        assert booked.status_code == 200, booked.text
+    before = patient.session.get(f"{API_BASE}/notifications/unread").json()['unread']
+    newest = patient.session.get(f"{API_BASE}/notifications", params={"limit": 2}).json()['notifications']
+
+    ids = [n['id'] for n in newest]
+    marked = patient.session.post(f"{API_BASE}/notifications/read", json={"ids": ids + [str(uuid.uuid4())]})
+    assert marked.status_code == 200, marked.text
+    assert sorted(marked.json()['updated']) == sorted(ids)
+    assert marked.json()['unread'] == before - 2
+
+    # Already read, so nothing changes the second time
+    again = patient.session.post(f"{API_BASE}/notifications/read", json={"ids": ids}).json()
+    assert again['updated'] == [] and again['unread'] == before - 2
+
+    everything = patient.session.post(f"{API_BASE}/notifications/read", json={"all": True}).json()
+    assert everything['unread'] == 0
+    assert patient.session.get(f"{API_BASE}/notifications/unread").json()['unread'] == 0
+
+
+def test_mark_read_validation(patient):
+    for body in ({}, {"ids": []}, {"ids": "notif_1"}, {"all": "yes"}):
+        assert patient.session.post(f"{API_BASE}/notifications/read", json=body).status_code == 400
+
+
+def test_notification_stream(make_slot, doctor, patient, sse_events):
+    slot = make_slot()
+    with doctor.session.get(f"{API_BASE}/notifications/stream", stream=True, timeout=10) as stream:
+        received = sse_events(stream)
+        first = next(received)
+        assert first['type'] == 'unread'
+
+        booked = patient.session.post(f"{API_BASE}/appointments", json={"slotId": slot['id']})
+        assert booked.status_code == 200, booked.text
+        pushed = next(received)
+
+    assert pushed['type'] == 'notification'
+    assert pushed['notification']['user_id'] == doctor.id
+    assert pushed['unread'] == first['unread'] + 1
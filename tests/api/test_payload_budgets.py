@@ -0,0 +1,87 @@
+"""
+Response-size budgets: bytes per row (or per response) of decoded JSON for
+each endpoint the dashboard loads, so new columns or embeds cannot make
+payloads creep up unnoticed. Raise a budget deliberately, in the same change
+that needs the bytes.
+"""
+
+import json
+
+import pytest
+
+from medmeet_client import API_BASE
+
+# Decoded JSON bytes per list item
+ROW_BUDGETS = {
+    'time-slots': ('slots', 240),
+    'availability': ('slots', 420),
+    'appointments': ('appointments', 700),
+    'notifications': ('notifications', 360),
+    'doctors?view=compact': ('doctors', 260),
+}
+
+# Decoded JSON bytes for the whole response
+RESPONSE_BUDGETS = {
+    'auth/me': 500,
+}
+
+
+@pytest.fixture
+def dashboard(make_slot, appointment, doctor, specialization):
+    """A doctor with open and booked slots, so every listing has rows"""
+    for _ in range(3):
+        make_slot()
+    return {
+        'time-slots': {'doctorId': doctor.id},
+        'availability': {'specialization': specialization},
+        'appointments': {},
+        'notifications': {},
+        'doctors?view=compact': {'specialization': specialization},
+    }
+
+
+@pytest.mark.parametrize('endpoint', ROW_BUDGETS)
+def test_row_budget(endpoint, dashboard, patient):
+    key, budget = ROW_BUDGETS[endpoint]
+    response = patient.session.get(f"{API_BASE}/{endpoint}", params={**dashboard[endpoint], 'limit': 200})
+    assert response.status_code == 200, response.text
+    rows = response.json()[key]
+    assert rows, f"{endpoint} returned no {key}"
+    per_row = max(len(json.dumps(row, separators=(',', ':'))) for row in rows)
+    assert per_row <= budget, f"{endpoint}: {per_row} bytes per row, budget {budget}"
+
+
+@pytest.mark.parametrize('endpoint', RESPONSE_BUDGETS)
+def test_response_budget(endpoint, doctor):
+    response = doctor.session.get(f"{API_BASE}/{endpoint}")
+    assert response.status_code == 200, response.text
+    assert len(response.content) <= RESPONSE_BUDGETS[endpoint], response.text
+
+
+def test_me_omits_password_hash(doctor):
+    assert 'password_hash' not in doctor.session.get(f"{API_BASE}/auth/me").text
+
+
+def test_fields_projection(make_slot, doctor, anonymous):
+    make_slot()
+    response = anonymous.get(f"{API_BASE}/time-slots", params={"doctorId": doctor.id, "fields": "end_time"})
+    assert response.status_code == 200
+    # The sort keys stay, since the cursor is built from them
+    assert {tuple(sorted(slot)) for slot in response.json()['slots']} == {('date', 'end_time', 'id', 'start_time')}
+
+
+def test_fields_rejects_unknown_columns(anonymous):
+    response = anonymous.get(f"{API_BASE}/time-slots", params={"fields": "id,password_hash"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('encoding', ['br', 'gzip'])
+def test_json_is_compressed(encoding, make_slot, doctor, anonymous):
+    for _ in range(8):
+        make_slot()
+    response = anonymous.get(f"{API_BASE}/time-slots", params={"doctorId": doctor.id, "limit": 200},
+                             headers={'Accept-Encoding': encoding}, stream=True)
+    with response:
+        assert response.status_code == 200
+        assert response.headers.get('Content-Encoding') == encoding
+        assert 'Accept-Encoding' in response.headers.get('Vary', '')
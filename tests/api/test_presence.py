@@ -0,0 +1,27 @@
+from medmeet_client import API_BASE
+
+
+def test_presence_join_and_leave_are_pushed(appointment, doctor, patient, sse_events):
+    room = appointment['video_room_id']
+    joined = patient.session.post(f"{API_BASE}/presence/heartbeat", json={"roomId": room})
+    assert joined.status_code == 200, joined.text
+    assert joined.json()['participants'] == []
+
+    with doctor.session.get(f"{API_BASE}/presence/stream", params={"roomId": room}, stream=True, timeout=10) as stream:
+        received = sse_events(stream)
+        snapshot = next(received)
+        assert snapshot['type'] == 'snapshot'
+        assert [p['userId'] for p in snapshot['participants']] == [patient.id]
+
+        # Heartbeats from someone already present are not news
+        again = patient.session.post(f"{API_BASE}/presence/heartbeat", json={"roomId": room}).json()
+        assert [p['userId'] for p in again['participants']] == [doctor.id]
+        assert patient.session.post(f"{API_BASE}/presence/leave", json={"roomId": room}).status_code == 200
+        assert next(received) == {'type': 'leave', 'userId': patient.id}
+
+
+def test_presence_requires_participant(appointment, accounts):
+    outsider = accounts.get('patient', key='outsider')
+    room = appointment['video_room_id']
+    assert outsider.session.post(f"{API_BASE}/presence/heartbeat", json={"roomId": room}).status_code == 403
+    assert outsider.session.get(f"{API_BASE}/presence/stream", params={"roomId": room}).status_code == 403
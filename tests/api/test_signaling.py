@@ -0,0 +1,37 @@
+from medmeet_client import API_BASE
+
+
+def test_signaling_stream(appointment, doctor, patient, sse_events):
+    room = appointment['video_room_id']
+    sent = patient.session.post(f"{API_BASE}/signals", json={"appointmentId": room, "type": "ready", "data": {}})
+    assert sent.status_code == 200, sent.text
+
+    # Unacknowledged signals are replayed as soon as the stream opens
+    with doctor.session.get(f"{API_BASE}/signals/stream", params={"appointmentId": room}, stream=True, timeout=10) as stream:
+        signal = next(sse_events(stream), {})
+    assert signal.get('type') == 'ready'
+
+    doctor.session.post(f"{API_BASE}/signals/ack", json={"appointmentId": room, "cursor": signal['id']})
+    assert doctor.session.get(f"{API_BASE}/signals", params={"appointmentId": room}).json() == []
+
+
+def test_signal_batching(appointment, doctor, patient):
+    room = appointment['video_room_id']
+    candidates = [{"type": "ice", "data": {"candidate": f"candidate:{i}", "sdpMid": "0", "sdpMLineIndex": 0}}
+                  for i in range(5)]
+    sent = patient.session.post(f"{API_BASE}/signals", json={"appointmentId": room, "signals": candidates})
+    assert sent.status_code == 200, sent.text
+
+    waiting = doctor.session.get(f"{API_BASE}/signals", params={"appointmentId": room}).json()
+    assert [s['data']['candidate'] for s in waiting] == [c['data']['candidate'] for c in candidates]
+
+    doctor.session.post(f"{API_BASE}/signals/ack", json={"appointmentId": room, "cursor": sent.json()['cursor']})
+    assert doctor.session.get(f"{API_BASE}/signals", params={"appointmentId": room}).json() == []
+
+
+def test_signals_require_participant(appointment, accounts):
+    outsider = accounts.get('patient', key='outsider')
+    response = outsider.session.post(f"{API_BASE}/signals", json={
+        "appointmentId": appointment['video_room_id'], "type": "ready", "data": {}
+    })
+    assert response.status_code == 403
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from medmeet_client import API_BASE
+
+
+def test_dashboard_sync(make_slot, doctor):
+    make_slot()
+    full = doctor.session.get(f"{API_BASE}/sync")
+    assert full.status_code == 200
+    data = full.json()
+    assert data['full'] and 'timeSlots' in data and data['cursor']
+
+    delta = doctor.session.get(f"{API_BASE}/sync", params={"since": data['cursor']})
+    assert delta.status_code == 200
+    assert not delta.json()['full']
+
+    revalidate = doctor.session.get(
+        f"{API_BASE}/sync",
+        params={"since": data['cursor']},
+        headers={"If-None-Match": delta.headers.get('ETag', '')}
+    )
+    assert revalidate.status_code == 304
+
+
+def test_full_sync_is_bounded(accounts):
+    doctor = accounts.get('doctor', key='sync')
+    start = datetime.now() + timedelta(days=60)
+    created = doctor.session.post(f"{API_BASE}/time-slots/bulk", json={
+        "startDate": start.strftime('%Y-%m-%d'),
+        "endDate": (start + timedelta(days=13)).strftime('%Y-%m-%d'),
+        "weekdays": [0, 1, 2, 3, 4, 5, 6],
+        "startTime": "08:00",
+        "endTime": "20:00",
+        "duration": 30,
+    })
+    assert created.status_code == 200, created.text
+    total = created.json()['created']
+
+    data = doctor.session.get(f"{API_BASE}/sync").json()
+    assert data['full'] and 0 < len(data['timeSlots']) < total
+    cursor = data['more']['timeSlots']
+    assert cursor
+
+    # The rest is paged through the list endpoint from the sync's cursor
+    seen = {s['id'] for s in data['timeSlots']}
+    while cursor:
+        page = doctor.session.get(f"{API_BASE}/time-slots", params={
+            "doctorId": doctor.id, "limit": 200, "cursor": cursor
+        }).json()
+        assert not seen & {s['id'] for s in page['slots']}
+        seen |= {s['id'] for s in page['slots']}
+        cursor = page['nextCursor']
+    assert len(seen) == total
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from medmeet_client import API_BASE
+
+
+def test_create_time_slot(make_slot, doctor):
+    slot = make_slot()
+    assert slot['doctor_id'] == doctor.id
+    assert slot['is_available']
+
+
+def test_create_time_slot_unauthorized(anonymous):
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+    response = anonymous.post(f"{API_BASE}/time-slots", json={
+        "date": tomorrow, "startTime": "11:00", "endTime": "11:30", "duration": 30
+    })
+    assert response.status_code == 401
+
+
+def test_bulk_create_time_slots(doctor):
+    start = datetime.now() + timedelta(days=30)
+    rule = {
+        "startDate": start.strftime('%Y-%m-%d'),
+        "endDate": (start + timedelta(days=6)).strftime('%Y-%m-%d'),
+        "weekdays": [0, 1, 2, 3, 4, 5, 6],
+        "startTime": "09:00",
+        "endTime": "11:00",
+        "duration": 30,
+        "exclusions": [(start + timedelta(days=3)).strftime('%Y-%m-%d')],
+    }
+    response = doctor.session.post(f"{API_BASE}/time-slots/bulk", json=rule)
+    assert response.status_code == 200, response.text
+    assert response.json()['created'] == 24
+
+    again = doctor.session.post(f"{API_BASE}/time-slots/bulk", json=rule)
+    assert again.status_code == 409
+
+
+@pytest.mark.parametrize('body', ['null', '[]', '"weekly"', '42', '{not json'])
+def test_bulk_create_rejects_non_object_body(body, doctor):
+    response = doctor.session.post(f"{API_BASE}/time-slots/bulk", data=body,
+                                   headers={'Content-Type': 'application/json'})
+    assert response.status_code == 400, response.text
+
+
+def test_bulk_create_requires_doctor(patient):
+    response = patient.session.post(f"{API_BASE}/time-slots/bulk", json={})
+    assert response.status_code == 403
+
+
+def test_get_doctor_time_slots(make_slot, doctor, anonymous):
+    slot = make_slot()
+    response = anonymous.get(f"{API_BASE}/time-slots", params={"doctorId": doctor.id, "limit": 200})
+    assert response.status_code == 200
+    assert slot['id'] in {s['id'] for s in response.json()['slots']}
+
+
+def test_time_slot_pagination(make_slot, doctor, anonymous):
+    for _ in range(3):
+        make_slot()
+    url = f"{API_BASE}/time-slots"
+    page = anonymous.get(url, params={"doctorId": doctor.id, "limit": 2}).json()
+    assert len(page['slots']) == 2 and page['nextCursor']
+
+    second = anonymous.get(url, params={"doctorId": doctor.id, "limit": 2, "cursor": page['nextCursor']}).json()
+    seen = {s['id'] for s in page['slots']}
+    assert second['slots'] and not any(s['id'] in seen for s in second['slots'])
+
+    bad = anonymous.get(url, params={"doctorId": doctor.id, "cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_get_available_slots(make_slot, doctor, anonymous):
+    slot = make_slot()
+    response = anonymous.get(f"{API_BASE}/time-slots", params={
+        "doctorId": doctor.id, "date": slot['date'], "available": "true"
+    })
+    slots = response.json()['slots']
+    assert slot['id'] in {s['id'] for s in slots}
+    assert all(s['is_available'] for s in slots)
+
+
+def test_availability_search(make_slot, doctor, specialization, anonymous):
+    slot = make_slot()
+    response = anonymous.get(f"{API_BASE}/availability", params={
+        "specialization": specialization, "days": 14, "limit": 200
+    })
+    assert response.status_code == 200
+    slots = response.json()['slots']
+    keys = [(s['date'], s['start_time'], s['id']) for s in slots]
+    assert keys == sorted(keys)
+    assert any(s['id'] == slot['id'] and s['doctor']['id'] == doctor.id for s in slots)
+
+
+def test_delete_time_slot(make_slot, doctor, anonymous):
+    slot = make_slot()
+    response = doctor.session.delete(f"{API_BASE}/time-slots/{slot['id']}")
+    assert response.status_code == 200
+    assert response.json()['success']
+
+    remaining = anonymous.get(f"{API_BASE}/time-slots", params={"doctorId": doctor.id, "date": slot['date']}).json()
+    assert slot['id'] not in {s['id'] for s in remaining['slots']}
+
+
+def test_delete_time_slot_unauthorized(anonymous):
+    assert anonymous.delete(f"{API_BASE}/time-slots/fake_slot_id").status_code == 401
+
+
+@pytest.mark.parametrize('endpoint', ['time-slots', 'availability'])
+@pytest.mark.parametrize('params', [{"from": "foo"}, {"to": "2024-13-45"}, {"from": "2024-02-30"}])
+def test_invalid_date_window(endpoint, params, anonymous):
+    response = anonymous.get(f"{API_BASE}/{endpoint}", params=params)
+    assert response.status_code == 400
+    assert 'YYYY-MM-DD' in response.json()['error']
+
+
+def test_invalid_date_filter(anonymous):
+    assert anonymous.get(f"{API_BASE}/time-slots", params={"date": "tomorrow"}).status_code == 400
+
+
+def test_huge_days_window_is_clamped(anonymous):
+    response = anonymous.get(f"{API_BASE}/availability", params={"days": 100000000, "limit": 1})
+    assert response.status_code == 200
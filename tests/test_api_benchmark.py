@@ -0,0 +1,51 @@
+"""
+Tests for the baseline comparison in api_benchmark.py
+"""
+
+import requests
+
+from api_benchmark import compare, db_queries
+
+BASELINE = {
+    'login': {'count': 30, 'p50_ms': 60.0, 'p95_ms': 80.0, 'db_calls': 1.0},
+    'book': {'count': 30, 'p50_ms': 20.0, 'p95_ms': 30.0, 'db_calls': 2.0},
+    'auth_me': {'count': 30, 'p50_ms': 1.0, 'p95_ms': 2.0, 'db_calls': 0.0},
+}
+
+
+def result(p95, db):
+    return {'count': 30, 'p50_ms': p95 / 2, 'p95_ms': p95, 'db_calls': db}
+
+
+def test_within_tolerance_passes():
+    current = {'login': result(99.0, 1.0), 'book': result(25.0, 2.0), 'auth_me': result(3.5, 0.0)}
+    assert compare(BASELINE, current) == []
+
+
+def test_p95_regression_beyond_tolerance_fails():
+    current = {'login': result(101.0, 1.0), 'book': result(30.0, 2.0), 'auth_me': result(4.5, 0.0)}
+    problems = compare(BASELINE, current)
+    assert len(problems) == 2
+    assert problems[0].startswith('auth_me: p95 4.5 ms > 4.0 ms')
+    assert problems[1].startswith('login: p95 101.0 ms > 100.0 ms')
+
+
+def test_extra_database_call_fails():
+    current = {'login': result(80.0, 1.0), 'book': result(30.0, 3.0), 'auth_me': result(2.0, 0.0)}
+    assert compare(BASELINE, current) == ['book: 3 db calls per request (baseline 2)']
+    assert compare(BASELINE, current, db_tolerance=1.0) == []
+
+
+def test_missing_and_new_steps_are_reported():
+    current = {'login': result(80.0, 1.0), 'book': result(30.0, 2.0), 'signal_round_trip': result(5.0, 0.0)}
+    assert compare(BASELINE, current) == [
+        'auth_me: missing from this run',
+        'signal_round_trip: not in the baseline, re-record it with --save',
+    ]
+
+
+def test_db_queries_reads_server_timing():
+    response = requests.Response()
+    response.headers['Server-Timing'] = 'db;dur=15.0;desc="2 queries", app;dur=35.2, total;dur=50.2'
+    assert db_queries(response) == 2
+    assert db_queries(requests.Response()) is None
@@ -0,0 +1,37 @@
+"""
+Tests for the id generators and the SQLite run in id_benchmark.py
+"""
+
+import re
+
+from id_benchmark import UuidV7, legacy_id, run
+
+
+def test_uuid7_is_monotonic_and_well_formed():
+    new_id = UuidV7()
+    ids = [new_id() for _ in range(20000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(i.version == 7 and i.variant == 'specified in RFC 4122' for i in ids[:100])
+
+
+def test_uuid7_carries_the_timestamp_forward_when_the_counter_overflows():
+    new_id = UuidV7()
+    first = new_id()
+    new_id.counter = 0xfff
+    new_id.last_ms += 1000
+    after = new_id()
+    assert after > first
+    assert int.from_bytes(after.bytes[:6], 'big') == new_id.last_ms
+
+
+def test_legacy_id_shape():
+    assert re.fullmatch(r'appt_\d{13}_[0-9a-z]{9}', legacy_id())
+
+
+def test_sqlite_run_reports_throughput_and_sizes(tmp_path):
+    results = run(['legacy', 'uuidv7'], rows=2000, batch=500, path=str(tmp_path / 'ids.db'))
+    assert set(results) == {'legacy', 'uuidv7'}
+    assert all(r['rows'] == 2000 and r['seconds'] > 0 for r in results.values())
+    if results['legacy']['index_bytes'] is not None:
+        assert results['uuidv7']['index_bytes'] < results['legacy']['index_bytes']
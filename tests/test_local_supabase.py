@@ -0,0 +1,344 @@
+"""
+Tests for the local Supabase/PostgREST stand-in, using the request shapes
+supabase-js produces for the queries in route.js and lib/auth.js
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from local_supabase import LocalSupabase
+from medmeet_client.cleanup import purge_accounts
+
+OBJECT = {'Accept': 'application/vnd.pgrst.object+json'}
+RETURN = {'Prefer': 'return=representation'}
+
+
+@pytest.fixture(scope="module")
+def server():
+    with LocalSupabase() as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def rest(server):
+    requests.post(f"{server.url}/__reset")
+    return f"{server.url}/rest/v1"
+
+
+def seed(rest):
+    requests.post(f"{rest}/users", json=[
+        {"id": "doc", "email": "doc@medmeet.com", "password_hash": "x", "name": "Dr. House", "role": "doctor"},
+        {"id": "pat", "email": "pat@medmeet.com", "password_hash": "x", "name": "Jane Doe", "role": "patient"},
+    ])
+    requests.post(f"{rest}/doctor_profiles", json=[
+        {"id": "profile", "user_id": "doc", "specialization": "Cardiology", "bio": "", "experience": 10},
+    ])
+    requests.post(f"{rest}/time_slots", json=[
+        {"id": "s2", "doctor_id": "doc", "date": "2030-01-02", "start_time": "09:00", "end_time": "09:30"},
+        {"id": "s1", "doctor_id": "doc", "date": "2030-01-01", "start_time": "10:00", "end_time": "10:30"},
+        {"id": "s0", "doctor_id": "doc", "date": "2030-01-01", "start_time": "09:00", "end_time": "09:30",
+         "is_available": False},
+    ])
+
+
+def test_single_returns_object_or_pgrst116(rest):
+    seed(rest)
+    found = requests.get(f"{rest}/users", params={"select": "*", "email": "eq.doc@medmeet.com"}, headers=OBJECT)
+    assert found.status_code == 200
+    assert found.json()['id'] == 'doc'
+
+    missing = requests.get(f"{rest}/users", params={"select": "*", "email": "eq.nobody@medmeet.com"}, headers=OBJECT)
+    assert missing.status_code == 406
+    assert missing.json()['code'] == 'PGRST116'
+
+
+def test_insert_returns_representation_with_defaults(rest):
+    response = requests.post(f"{rest}/users", params={"select": "*"}, headers={**OBJECT, **RETURN}, json=[
+        {"id": "u1", "email": "u1@medmeet.com", "password_hash": "x", "name": "U1", "role": "patient"},
+    ])
+    assert response.status_code == 201
+    assert response.json()['created_at'].endswith('Z')
+
+    duplicate = requests.post(f"{rest}/users", json=[
+        {"id": "u2", "email": "u1@medmeet.com", "password_hash": "x", "name": "U2", "role": "patient"},
+    ])
+    assert duplicate.status_code == 409
+    assert duplicate.json()['code'] == '23505'
+
+
+def test_filters_and_ordering(rest):
+    seed(rest)
+    slots = requests.get(f"{rest}/time_slots", params={
+        "select": "*", "doctor_id": "eq.doc", "is_available": "eq.true", "order": "date.asc,start_time.asc",
+    }).json()
+    assert [s['id'] for s in slots] == ['s1', 's2']
+    assert slots[0]['is_available'] is True
+
+    window = requests.get(f"{rest}/time_slots", params={
+        "select": "id", "or": "(date.gt.2030-01-01,and(date.eq.2030-01-01,start_time.gt.09:00))",
+        "order": "date.asc,start_time.asc", "limit": "1",
+    }).json()
+    assert window == [{'id': 's1'}]
+
+    picked = requests.get(f"{rest}/time_slots", params={"select": "id", "id": "in.(s0,s2)", "order": "id"}).json()
+    assert picked == [{'id': 's0'}, {'id': 's2'}]
+
+
+def test_embeds_follow_foreign_keys(rest):
+    seed(rest)
+    doctors = requests.get(f"{rest}/users", params={
+        "select": "id, name, doctor_profiles ( specialization, experience )", "role": "eq.doctor",
+    }).json()
+    assert doctors == [{'id': 'doc', 'name': 'Dr. House',
+                        'doctor_profiles': [{'specialization': 'Cardiology', 'experience': 10}]}]
+
+    requests.post(f"{rest}/appointments", json={
+        "id": "a1", "doctor_id": "doc", "patient_id": "pat", "time_slot_id": "s1",
+        "date": "2030-01-01", "start_time": "10:00", "end_time": "10:30",
+    })
+    appointments = requests.get(f"{rest}/appointments", params={
+        "select": "id,doctor:doctor_id(id,name),patient:patient_id(name)", "patient_id": "eq.pat",
+    }).json()
+    assert appointments == [{'id': 'a1', 'doctor': {'id': 'doc', 'name': 'Dr. House'}, 'patient': {'name': 'Jane Doe'}}]
+
+
+def test_update_and_delete(rest):
+    seed(rest)
+    updated = requests.patch(f"{rest}/time_slots", params={"id": "eq.s1", "select": "*"},
+                             headers={**OBJECT, **RETURN}, json={"is_available": False})
+    assert updated.json()['is_available'] is False
+
+    minimal = requests.patch(f"{rest}/notifications", params={"id": "eq.none"}, json={"read": True})
+    assert minimal.status_code == 204
+
+    requests.delete(f"{rest}/time_slots", params={"id": "eq.s2", "doctor_id": "eq.doc"})
+    remaining = requests.get(f"{rest}/time_slots", params={"select": "id", "order": "id"}).json()
+    assert remaining == [{'id': 's0'}, {'id': 's1'}]
+
+
+def test_upsert_and_json_columns(rest):
+    participant = {"id": "room_doc", "room_id": "room", "user_id": "doc", "user_name": "Dr. House"}
+    requests.post(f"{rest}/room_participants", json=participant,
+                  headers={'Prefer': 'resolution=merge-duplicates'})
+    requests.post(f"{rest}/room_participants", json={**participant, "user_name": "Greg"},
+                  headers={'Prefer': 'resolution=merge-duplicates'})
+    rows = requests.get(f"{rest}/room_participants", params={"select": "user_name"}).json()
+    assert rows == [{'user_name': 'Greg'}]
+
+    requests.post(f"{rest}/webrtc_signals", json={
+        "id": "sig", "appointment_id": "a1", "from_role": "doctor", "to_role": "patient",
+        "signal_type": "offer", "signal_data": {"type": "offer", "sdp": "v=0"},
+    })
+    signal = requests.get(f"{rest}/webrtc_signals", params={"select": "signal_data"}, headers=OBJECT).json()
+    assert signal == {'signal_data': {'type': 'offer', 'sdp': 'v=0'}}
+
+    # lib/presence.js upserts on the (room_id, user_id) key over rows made with other ids
+    requests.post(f"{rest}/room_participants", params={"on_conflict": "room_id,user_id"},
+                  headers={'Prefer': 'resolution=merge-duplicates'},
+                  json=[{**participant, "id": "room_doc_2", "last_seen": "2030-01-01T00:00:00Z"}])
+    rows = requests.get(f"{rest}/room_participants", params={"select": "id,last_seen"}).json()
+    assert rows == [{'id': 'room_doc_2', 'last_seen': '2030-01-01T00:00:00Z'}]
+
+
+def test_count_and_stats(server, rest):
+    seed(rest)
+    response = requests.get(f"{rest}/time_slots", params={"select": "id", "limit": "1"},
+                            headers={'Prefer': 'count=exact'})
+    assert response.headers['Content-Range'] == '0-0/3'
+
+    stats = requests.get(f"{server.url}/__stats").json()
+    assert stats['rows']['time_slots'] == 3
+    assert stats['requests']['GET time_slots'] == 1
+
+
+def test_book_appointment_rpc_is_atomic(rest):
+    seed(rest)
+    args = {"p_slot_id": "s1", "p_patient_id": "pat", "p_notes": "", "p_appointment_id": "a1",
+            "p_video_room_id": "room_a1", "p_notification_ids": ["n1", "n2"]}
+    booked = requests.post(f"{rest}/rpc/book_appointment", json=args)
+    assert booked.status_code == 200
+    appointment = booked.json()['appointment']
+    assert appointment['doctor'] == {'id': 'doc', 'name': 'Dr. House'}
+    assert appointment['patient'] == {'id': 'pat', 'name': 'Jane Doe'}
+    assert booked.json()['contacts']['doctor'] == 'doc@medmeet.com'
+    assert not {'updated_at', 'reminder_sent_at', 'reminder_claimed_until'} & set(appointment)
+    created = booked.json()['notifications']
+    assert [(n['id'], n['user_id'], n['read']) for n in created] == [('n1', 'doc', False), ('n2', 'pat', False)]
+
+    again = requests.post(f"{rest}/rpc/book_appointment",
+                          json={**args, "p_appointment_id": "a2", "p_notification_ids": ["n3", "n4"]})
+    assert again.json()['code'] == 'P0001'
+    missing = requests.post(f"{rest}/rpc/book_appointment", json={**args, "p_slot_id": "nope"})
+    assert missing.json()['code'] == 'P0002'
+
+    notifications = requests.get(f"{rest}/notifications", params={"select": "id", "order": "id"}).json()
+    assert notifications == [{'id': 'n1'}, {'id': 'n2'}]
+
+
+def test_unread_count_and_bulk_mark_read(rest):
+    seed(rest)
+    requests.post(f"{rest}/notifications", json=[
+        {"id": f"n{i}", "user_id": "pat", "message": f"Update {i}", "type": "info"} for i in range(3)
+    ])
+
+    def unread():
+        response = requests.head(f"{rest}/notifications", params={"select": "id", "user_id": "eq.pat", "read": "eq.false"},
+                                 headers={'Prefer': 'count=exact'})
+        return int(response.headers['Content-Range'].split('/')[1])
+
+    assert unread() == 3
+    marked = requests.patch(f"{rest}/notifications", params={
+        "user_id": "eq.pat", "read": "eq.false", "id": "in.(n0,n1,missing)", "select": "id",
+    }, headers=RETURN, json={"read": True})
+    assert sorted(row['id'] for row in marked.json()) == ['n0', 'n1']
+    assert unread() == 1
+
+
+def test_create_time_slots_rpc_rejects_overlaps(rest):
+    seed(rest)
+    batch = [
+        {"id": "b1", "date": "2030-01-03", "start_time": "09:00", "end_time": "09:30", "duration": 30},
+        {"id": "b2", "date": "2030-01-03", "start_time": "09:30", "end_time": "10:00", "duration": 30},
+    ]
+    created = requests.post(f"{rest}/rpc/create_time_slots", json={"p_doctor_id": "doc", "p_slots": batch})
+    assert [s['id'] for s in created.json()] == ['b1', 'b2']
+
+    # s1 is 2030-01-01 10:00-10:30; nothing from a rejected batch is inserted
+    overlapping = [
+        {"id": "b3", "date": "2030-01-04", "start_time": "09:00", "end_time": "09:30", "duration": 30},
+        {"id": "b4", "date": "2030-01-01", "start_time": "10:15", "end_time": "10:45", "duration": 30},
+    ]
+    rejected = requests.post(f"{rest}/rpc/create_time_slots", json={"p_doctor_id": "doc", "p_slots": overlapping})
+    assert rejected.json()['code'] == 'P0001'
+    assert requests.get(f"{rest}/time_slots", params={"id": "eq.b3"}).json() == []
+
+
+def test_claim_email_jobs_hands_each_job_out_once(rest):
+    requests.post(f"{rest}/email_outbox", json=[
+        {"id": f"e{i}", "to_address": "pat@medmeet.com", "subject": "Hi", "html": "<p>Hi</p>"} for i in range(3)
+    ])
+    first = requests.post(f"{rest}/rpc/claim_email_jobs", json={"p_limit": 2, "p_lease_seconds": 60}).json()
+    second = requests.post(f"{rest}/rpc/claim_email_jobs", json={"p_limit": 2, "p_lease_seconds": 60}).json()
+    assert len(first) == 2 and len(second) == 1
+    assert {j['id'] for j in first}.isdisjoint(j['id'] for j in second)
+    assert all(j['status'] == 'sending' and j['attempts'] == 1 for j in first + second)
+    assert requests.post(f"{rest}/rpc/claim_email_jobs", json={"p_limit": 2}).json() == []
+
+
+def test_claim_appointment_reminders_hands_each_appointment_out_once(rest):
+    seed(rest)
+    now = datetime.now(timezone.utc)
+
+    def appointment(id, minutes, status='scheduled'):
+        start = now + timedelta(minutes=minutes)
+        requests.post(f"{rest}/time_slots", json={"id": f"slot_{id}", "doctor_id": "doc", "date": "2030-01-01",
+                                                  "start_time": "09:00", "end_time": "09:30"})
+        return {"id": id, "doctor_id": "doc", "patient_id": "pat", "time_slot_id": f"slot_{id}", "status": status,
+                "date": start.strftime('%Y-%m-%d'), "start_time": start.strftime('%H:%M'), "end_time": "23:59"}
+
+    requests.post(f"{rest}/appointments", json=[
+        appointment("soon", 5), appointment("sooner", 2), appointment("later", 60),
+        appointment("started", -5), appointment("cancelled", 5, status='cancelled'),
+    ])
+    claim = {"p_lead_minutes": 15, "p_limit": 10, "p_lease_seconds": 60, "p_timezone": "UTC"}
+    first = requests.post(f"{rest}/rpc/claim_appointment_reminders", json=claim).json()
+    assert [a['id'] for a in first] == ['sooner', 'soon']
+    assert first[0]['doctor']['email'] == 'doc@medmeet.com' and first[0]['patient']['name'] == 'Jane Doe'
+
+    # Leased to the first caller; a reminded one is done, an expired lease is claimable again
+    assert requests.post(f"{rest}/rpc/claim_appointment_reminders", json=claim).json() == []
+    requests.patch(f"{rest}/appointments", params={"id": "eq.sooner"},
+                   json={"reminder_sent_at": now.isoformat(), "reminder_claimed_until": None})
+    requests.patch(f"{rest}/appointments", params={"id": "eq.soon"},
+                   json={"reminder_claimed_until": (now - timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S.000Z')})
+    again = requests.post(f"{rest}/rpc/claim_appointment_reminders", json=claim).json()
+    assert [a['id'] for a in again] == ['soon']
+
+
+def test_updates_bump_updated_at_and_deletes_leave_tombstones(rest):
+    seed(rest)
+    before = requests.get(f"{rest}/time_slots", params={"select": "updated_at", "id": "eq.s1"}, headers=OBJECT).json()
+    time.sleep(0.01)
+    requests.patch(f"{rest}/time_slots", params={"id": "eq.s1"}, json={"is_available": False})
+    after = requests.get(f"{rest}/time_slots", params={"select": "updated_at", "id": "eq.s1"}, headers=OBJECT).json()
+    assert after['updated_at'] > before['updated_at']
+
+    requests.delete(f"{rest}/time_slots", params={"id": "eq.s2"})
+    tombstones = requests.get(f"{rest}/sync_deletions", params={"select": "record_id,scope_id"}).json()
+    assert tombstones == [{'record_id': 's2', 'scope_id': 'doc'}]
+
+
+def test_keyset_page_with_quoted_cursor_values(rest):
+    seed(rest)
+    # Same shape lib/pagination.js sends for a (date, start_time, id) cursor at s0
+    after_s0 = ('(date.gt."2030-01-01",and(date.eq."2030-01-01",start_time.gt."09:00"),'
+                'and(date.eq."2030-01-01",start_time.eq."09:00",id.gt."s0"))')
+    page = requests.get(f"{rest}/time_slots", params={
+        "select": "id", "doctor_id": "eq.doc", "or": after_s0,
+        "order": "date.asc,start_time.asc,id.asc", "limit": "2",
+    }).json()
+    assert page == [{'id': 's1'}, {'id': 's2'}]
+
+
+def test_purge_signaling_drops_only_expired_rows(rest):
+    signal = {"appointment_id": "room", "from_role": "doctor", "to_role": "patient",
+              "signal_type": "ice", "signal_data": {}}
+    requests.post(f"{rest}/webrtc_signals", json=[
+        {**signal, "id": "old", "created_at": "2020-01-01T00:00:00.000Z"},
+        {**signal, "id": "new"},
+    ])
+    requests.post(f"{rest}/room_participants", json=[
+        {"id": "gone", "room_id": "room", "user_id": "doc", "user_name": "Dr. House",
+         "last_seen": "2020-01-01T00:00:00.000Z"},
+        {"id": "here", "room_id": "room", "user_id": "pat", "user_name": "Jane Doe"},
+    ])
+
+    purged = requests.post(f"{rest}/rpc/purge_signaling", json={"p_signal_ttl_minutes": 10}).json()
+    assert purged == {'signals_deleted': 1, 'participants_deleted': 1}
+
+    stats = requests.post(f"{rest}/rpc/signaling_table_stats", json={}).json()
+    assert [(s['table_name'], s['live_rows']) for s in stats] == [('room_participants', 1), ('webrtc_signals', 1)]
+
+
+def test_availability_search_uses_open_slot_index(server, rest):
+    seed(rest)
+    # Query shape lib/availability.js sends for the first page
+    slots = requests.get(f"{rest}/time_slots", params=[
+        ("select", "id,doctor_id,date,start_time"), ("is_available", "eq.true"),
+        ("date", "gte.2030-01-01"), ("date", "lte.2030-01-14"),
+        ("or", '(date.gt.2030-01-01,start_time.gte."09:30")'),
+        ("order", "date.asc,start_time.asc,id.asc"), ("limit", "6"),
+    ]).json()
+    assert [s['id'] for s in slots] == ['s1', 's2']
+
+    plan = server.db.conn.execute(
+        'EXPLAIN QUERY PLAN SELECT id FROM time_slots WHERE is_available AND date >= ? '
+        'ORDER BY date, start_time, id LIMIT 6', ['2030-01-01']
+    ).fetchall()
+    assert any('idx_time_slots_open' in row[-1] for row in plan)
+
+
+def test_purge_accounts_removes_only_the_prefix(server, rest):
+    seed(rest)
+    requests.post(f"{rest}/users", json=[
+        {"id": "gw0d", "email": "pytest.run1.gw0.doctor.1.ab@medmeet.com", "password_hash": "x", "name": "D", "role": "doctor"},
+        {"id": "gw0p", "email": "pytest.run1.gw0.patient.1.cd@medmeet.com", "password_hash": "x", "name": "P", "role": "patient"},
+        {"id": "gw1p", "email": "pytest.run1.gw1.patient.1.ef@medmeet.com", "password_hash": "x", "name": "P", "role": "patient"},
+    ])
+    requests.post(f"{rest}/time_slots", json=[
+        {"id": "t1", "doctor_id": "gw0d", "date": "2030-01-03", "start_time": "09:00", "end_time": "09:30"},
+    ])
+    requests.post(f"{rest}/email_outbox", json=[
+        {"id": "e1", "to_address": "pytest.run1.gw0.patient.1.cd@medmeet.com", "subject": "s", "html": "h"},
+        {"id": "e2", "to_address": "pat@medmeet.com", "subject": "s", "html": "h"},
+    ])
+
+    deleted = purge_accounts('pytest.run1.gw0', supabase_url=server.url, key='local')
+    assert deleted == {'email_outbox': 1, 'users': 2}
+
+    users = requests.get(f"{rest}/users", params={"select": "id", "order": "id.asc"}).json()
+    assert [u['id'] for u in users] == ['doc', 'gw1p', 'pat']
+    assert requests.get(f"{rest}/time_slots", params={"id": "eq.t1"}).json() == []
@@ -0,0 +1,45 @@
+"""
+Tests for the metrics helpers in backend_test.py, against the output format
+of lib/metrics.js
+"""
+
+from backend_test import metric_value, parse_metrics, parse_server_timing
+
+SCRAPE = '''# TYPE http_requests_total counter
+http_requests_total{method="GET",route="/api/appointments",status="200"} 3
+http_requests_total{method="GET",route="/api/appointments",status="401"} 1
+http_requests_total{method="POST",route="/api/auth/login",status="200"} 2
+# TYPE db_requests_per_request histogram
+db_requests_per_request_bucket{method="GET",route="/api/appointments",le="1"} 3
+db_requests_per_request_bucket{method="GET",route="/api/appointments",le="+Inf"} 4
+db_requests_per_request_sum{method="GET",route="/api/appointments"} 3
+db_requests_per_request_count{method="GET",route="/api/appointments"} 4
+email_send_duration_ms_count{outcome="ok"} 5
+'''
+
+
+def test_parse_metrics_groups_series_by_name():
+    metrics = parse_metrics(SCRAPE)
+    assert len(metrics['http_requests_total']) == 3
+    assert metrics['db_requests_per_request_bucket'][1] == (
+        {'method': 'GET', 'route': '/api/appointments', 'le': '+Inf'}, 4.0)
+    assert metrics['email_send_duration_ms_count'] == [({'outcome': 'ok'}, 5.0)]
+
+
+def test_metric_value_sums_matching_series():
+    metrics = parse_metrics(SCRAPE)
+    assert metric_value(metrics, 'http_requests_total', route='/api/appointments') == 4
+    assert metric_value(metrics, 'http_requests_total', status='200') == 5
+    assert metric_value(metrics, 'http_requests_total', method='DELETE') == 0
+    assert metric_value(metrics, 'missing_metric') == 0
+
+
+def test_parse_metrics_unescapes_label_values():
+    metrics = parse_metrics('x_total{path="a\\"b\\\\c"} 1\n')
+    assert metrics['x_total'] == [({'path': 'a"b\\c'}, 1.0)]
+
+
+def test_parse_server_timing():
+    header = 'db;dur=15.0;desc="2 queries", app;dur=35.2, total;dur=50.2'
+    assert parse_server_timing(header) == {'db': 15.0, 'app': 35.2, 'total': 50.2}
+    assert parse_server_timing(None) == {}